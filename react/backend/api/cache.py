@@ -0,0 +1,113 @@
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Iterable, Optional
+
+CACHE_MAX_ENTRIES = int(os.getenv("QUERY_CACHE_MAX_ENTRIES", "512"))
+CACHE_TTL_S = float(os.getenv("QUERY_CACHE_TTL_S", "300"))
+
+_WHITESPACE = re.compile(r"\s+")
+
+def normalize_sql(sql: str) -> str:
+    return _WHITESPACE.sub(" ", sql).strip()
+
+def cache_key(kind: str, sql: str, params: Optional[Iterable] = None) -> tuple:
+    return (kind, normalize_sql(sql), tuple(params or ()))
+
+class QueryCache:
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, ttl_s: float = CACHE_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        # Bumped on every invalidation; results loaded under an older version are not stored
+        self.version = 1
+        self._entries: OrderedDict[tuple, tuple[float, object]] = OrderedDict()
+        self._inflight: dict[tuple, asyncio.Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: tuple):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if time.monotonic() >= expires_at:
+            del self._entries[key]
+            self._stats["expired"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: tuple, value, ttl_s: Optional[float] = None):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic() + (self.ttl_s if ttl_s is None else ttl_s), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    async def get_or_load(self, key: tuple, loader: Callable[[], Awaitable], ttl_s: Optional[float] = None):
+        value = self.get(key)
+        if value is not None:
+            self._stats["hits"] += 1
+            return value
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # The request that owned the load went away; load again for this one
+                if inflight.cancelled():
+                    return await self.get_or_load(key, loader, ttl_s)
+                raise
+
+        self._stats["misses"] += 1
+        version = self.version
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so an exception nobody else awaited is not logged
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+            if version == self.version:
+                self.put(key, value, ttl_s)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, tables: Optional[Iterable[str]] = None) -> int:
+        if tables:
+            names = [re.compile(rf"\b{re.escape(t.upper())}\b") for t in tables]
+            keys = [k for k in self._entries if any(n.search(k[1].upper()) for n in names)]
+        else:
+            keys = list(self._entries)
+        for key in keys:
+            del self._entries[key]
+        # In-flight loads started before this point are returned but not cached
+        self._inflight.clear()
+        self.version += 1
+        return len(keys)
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl_s,
+            "inflight": len(self._inflight),
+            **self._stats,
+        }
+
+query_cache = QueryCache()
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from cache import query_cache, CACHE_TTL_S
+from graph import get_graph
+from snapshot import get_snapshot
+
+# Reference routes whose bodies only change with the data version
+ETAG_PATHS = {
+    "/api/assets",
+    "/api/assets/edges/all",
+    "/api/predictions",
+    "/api/predictions/link-discoveries",
+    "/api/predictions/anomalies",
+    "/api/telemetry/kpis",
+    "/api/network/edges",
+}
+ETAG_MAX_ENTRIES = int(os.getenv("ETAG_MAX_ENTRIES", "1024"))
+# Without an explicit invalidation, a remembered ETag is trusted for as long as a cached result would be
+ETAG_TTL_S = float(os.getenv("ETAG_TTL_S", str(CACHE_TTL_S)))
+
+def data_version() -> tuple:
+    snapshot = get_snapshot()
+    graph = get_graph()
+    return (
+        query_cache.version,
+        snapshot.loaded_at if snapshot is not None else None,
+        graph.fingerprint if graph is not None else None,
+    )
+
+def content_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    # Weak comparison: a W/ tag from the compression layer matches its strong original
+    tags = [_opaque(t) for t in if_none_match.split(",")]
+    return "*" in tags or _opaque(etag) in tags
+
+class ETagIndex:
+    def __init__(self, max_entries: int = ETAG_MAX_ENTRIES, ttl_s: float = ETAG_TTL_S):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict[tuple, tuple[tuple, str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, version: tuple) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry_version, etag, stored_at = entry
+            if entry_version != version or time.monotonic() - stored_at > self.ttl_s:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return etag
+
+    def put(self, key: tuple, version: tuple, etag: str):
+        with self._lock:
+            self._entries[key] = (version, etag, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+etag_index = ETagIndex()
+
+def _header(scope, name: bytes) -> str:
+    for k, v in scope["headers"]:
+        if k == name:
+            return v.decode("latin-1")
+    return ""
+
+class ETagMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or scope["path"] not in ETAG_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        key = (scope["method"], scope["path"], scope["query_string"], _header(scope, b"accept"))
+        version = data_version()
+        if_none_match = _header(scope, b"if-none-match")
+        known = etag_index.get(key, version)
+        if if_none_match and known and etag_matches(if_none_match, known):
+            # Same data version as when this representation was served: skip the endpoint entirely
+            scope["route_label"] = scope["path"]
+            await self._not_modified(send, known, [])
+            return
+
+        start = None
+        chunks = []
+        streaming = False
+
+        async def buffer(message):
+            nonlocal start, streaming
+            if streaming:
+                await send(message)
+            elif message["type"] == "http.response.start":
+                start = message
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    # Streaming bodies are passed through untouched
+                    streaming = True
+                    await send(start)
+                    await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": True})
+
+        await self.app(scope, receive, buffer)
+        if streaming:
+            return
+
+        body = b"".join(chunks)
+        if start is None or start["status"] != 200:
+            if start is not None:
+                await send(start)
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        etag = content_etag(body)
+        etag_index.put(key, version, etag)
+        headers = [(k, v) for k, v in start.get("headers", []) if k not in (b"etag", b"cache-control")]
+        if if_none_match and etag_matches(if_none_match, etag):
+            await self._not_modified(send, etag, headers)
+            return
+        headers += [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    async def _not_modified(self, send, etag: str, headers: list):
+        headers = [(k, v) for k, v in headers if k not in (b"content-length", b"content-type")]
+        if not any(k == b"vary" for k, _ in headers):
+            headers.append((b"vary", b"Accept, Accept-Encoding"))
+        headers += [(b"etag", etag.encode()), (b"cache-control", b"no-cache")]
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
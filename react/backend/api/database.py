@@ -1,45 +1,492 @@
+import asyncio
+import contextvars
+import functools
+import itertools
 import os
-import snowflake.connector
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import pyarrow as pa
 from typing import Optional
-
-_connection: Optional[snowflake.connector.SnowflakeConnection] = None
+from cache import query_cache, cache_key
+from deadlines import remaining
+from metrics import increment, query_name, record_pool_wait, record_query
 
 DATABASE = "AUTOGL_YIELD_OPTIMIZATION"
 SCHEMA = "AUTOGL_YIELD_OPTIMIZATION"
 WAREHOUSE = "AUTOGL_YIELD_OPTIMIZATION_WH"
 
-def get_connection() -> snowflake.connector.SnowflakeConnection:
-    global _connection
-    if _connection is None or _connection.is_closed():
+# snowflake: live account via SNOWFLAKE_CONNECTION_NAME; duckdb: local data/synthetic files
+DATA_ENGINE = os.getenv("DATA_ENGINE", "snowflake")
+
+POOL_SIZE = int(os.getenv("SNOWFLAKE_POOL_SIZE", "8"))
+POOL_MIN_IDLE = int(os.getenv("SNOWFLAKE_POOL_MIN_IDLE", "2"))
+POOL_MAX_LIFETIME_S = float(os.getenv("SNOWFLAKE_POOL_MAX_LIFETIME_S", "3600"))
+POOL_CHECKOUT_TIMEOUT_S = float(os.getenv("SNOWFLAKE_POOL_CHECKOUT_TIMEOUT_S", "30"))
+# Connections idle longer than this are pinged before being handed out
+POOL_HEALTH_CHECK_IDLE_S = float(os.getenv("SNOWFLAKE_POOL_HEALTH_CHECK_IDLE_S", "60"))
+
+QUERY_WORKERS = int(os.getenv("SNOWFLAKE_QUERY_WORKERS", str(POOL_SIZE)))
+QUERY_TIMEOUT_S = float(os.getenv("SNOWFLAKE_QUERY_TIMEOUT_S", "60"))
+CORTEX_TIMEOUT_S = float(os.getenv("SNOWFLAKE_CORTEX_TIMEOUT_S", "120"))
+# Extra time allowed on top of the statement timeout for checkout and fetch
+QUERY_TIMEOUT_GRACE_S = 5.0
+# Status poll backoff for statements submitted with execute_async
+ASYNC_POLL_INTERVALS_S = (0.02, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+class PoolTimeout(Exception):
+    pass
+
+class QueryTimeout(Exception):
+    pass
+
+class QueryCancelled(Exception):
+    pass
+
+class SnowflakeEngine:
+    name = "snowflake"
+
+    def __init__(self):
+        import snowflake.connector
+        self._connector = snowflake.connector
+
+    def connect(self):
         connection_name = os.getenv("SNOWFLAKE_CONNECTION_NAME", "demo")
-        _connection = snowflake.connector.connect(connection_name=connection_name)
-        _connection.cursor().execute(f"USE DATABASE {DATABASE}")
-        _connection.cursor().execute(f"USE SCHEMA {SCHEMA}")
-        _connection.cursor().execute(f"USE WAREHOUSE {WAREHOUSE}")
-    return _connection
-
-def close_connection():
-    global _connection
-    if _connection and not _connection.is_closed():
-        _connection.close()
-        _connection = None
-
-def execute_query(sql: str, params: tuple = None) -> list[dict]:
-    conn = get_connection()
-    cursor = conn.cursor()
+        # qmark binds are sent to the server instead of being interpolated client-side,
+        # so the statement text (and its cached plan/result) is shared across values
+        conn = self._connector.connect(connection_name=connection_name, paramstyle="qmark")
+        cursor = conn.cursor()
+        try:
+            cursor.execute(f"USE DATABASE {DATABASE}")
+            cursor.execute(f"USE SCHEMA {SCHEMA}")
+            cursor.execute(f"USE WAREHOUSE {WAREHOUSE}")
+        finally:
+            cursor.close()
+        return conn
+
+    def execute(
+        self, cursor, sql: str, params: tuple = None, timeout: Optional[float] = None,
+        handle: Optional["QueryHandle"] = None,
+    ):
+        # Submitted asynchronously so the query id is known while it runs and a cancel can target it alone
+        cursor.execute_async(sql, params)
+        query_id = cursor.sfqid
+        conn = cursor.connection
+        if handle is not None and not handle.started(query_id):
+            self.cancel(conn, query_id)
+            raise QueryCancelled("Query was cancelled before it started")
+        deadline = time.monotonic() + timeout if timeout else None
+        try:
+            for attempt in itertools.count():
+                if not conn.is_still_running(conn.get_query_status_throw_if_error(query_id)):
+                    break
+                if handle is not None and handle.cancelled:
+                    raise QueryCancelled("Query was cancelled")
+                if deadline is not None and time.monotonic() >= deadline:
+                    self.cancel(conn, query_id)
+                    raise QueryTimeout(f"Query exceeded {timeout:g}s and was cancelled")
+                wait = ASYNC_POLL_INTERVALS_S[min(attempt, len(ASYNC_POLL_INTERVALS_S) - 1)]
+                time.sleep(wait if deadline is None else max(0.0, min(wait, deadline - time.monotonic())))
+        except self._connector.errors.ProgrammingError as e:
+            if handle is not None and handle.cancelled:
+                raise QueryCancelled("Query was cancelled") from e
+            raise
+        cursor.get_results_from_sfqid(query_id)
+
+    def cancel(self, conn, query_id: str):
+        cursor = conn.cursor()
+        try:
+            cursor.execute("SELECT SYSTEM$CANCEL_QUERY(?)", (query_id,))
+        finally:
+            cursor.close()
+
+    def close(self):
+        pass
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            if DATA_ENGINE == "duckdb":
+                from duckdb_engine import DuckDBEngine
+                _engine = DuckDBEngine()
+            elif DATA_ENGINE == "snowflake":
+                _engine = SnowflakeEngine()
+            else:
+                raise ValueError(f"Unknown DATA_ENGINE: {DATA_ENGINE}")
+        return _engine
+
+class PooledConnection:
+    def __init__(self, conn):
+        self.conn = conn
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class ConnectionPool:
+    def __init__(
+        self,
+        size: int = POOL_SIZE,
+        min_idle: int = POOL_MIN_IDLE,
+        max_lifetime_s: float = POOL_MAX_LIFETIME_S,
+        checkout_timeout_s: float = POOL_CHECKOUT_TIMEOUT_S,
+        health_check_idle_s: float = POOL_HEALTH_CHECK_IDLE_S,
+    ):
+        self.size = max(1, size)
+        self.min_idle = min(max(0, min_idle), self.size)
+        self.max_lifetime_s = max_lifetime_s
+        self.checkout_timeout_s = checkout_timeout_s
+        self.health_check_idle_s = health_check_idle_s
+        self._idle: deque[PooledConnection] = deque()
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "checkouts": 0,
+            "checkout_timeouts": 0,
+            "checkout_wait_total_ms": 0.0,
+            "checkout_wait_max_ms": 0.0,
+            "connections_created": 0,
+            "connections_recycled": 0,
+            "health_check_failures": 0,
+        }
+
+    def _connect(self) -> PooledConnection:
+        conn = get_engine().connect()
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return PooledConnection(conn)
+
+    def _discard(self, pooled: PooledConnection):
+        try:
+            if not pooled.conn.is_closed():
+                pooled.conn.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, pooled: PooledConnection) -> bool:
+        if pooled.conn.is_closed():
+            return False
+        if time.monotonic() - pooled.last_used < self.health_check_idle_s:
+            return True
+        try:
+            cursor = pooled.conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def warm(self):
+        with self._cond:
+            missing = self.min_idle - len(self._idle)
+            missing = min(missing, self.size - self._open)
+            self._open += max(0, missing)
+        created = []
+        try:
+            for _ in range(max(0, missing)):
+                created.append(self._connect())
+        finally:
+            with self._cond:
+                self._open -= max(0, missing) - len(created)
+                self._idle.extend(created)
+                self._cond.notify(len(created))
+
+    def acquire(self) -> PooledConnection:
+        started = time.monotonic()
+        deadline = started + self.checkout_timeout_s
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Connection pool is closed")
+            self._waiting += 1
+            try:
+                while not self._idle and self._open >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0 or not self._cond.wait(remaining):
+                        if not self._idle and self._open >= self.size:
+                            self._stats["checkout_timeouts"] += 1
+                            raise PoolTimeout(
+                                f"No database connection available within {self.checkout_timeout_s}s"
+                            )
+            finally:
+                self._waiting -= 1
+            pooled = self._idle.pop() if self._idle else None
+            if pooled is None:
+                self._open += 1
+            self._in_use += 1
+
+        try:
+            if pooled is not None:
+                expired = time.monotonic() - pooled.created_at > self.max_lifetime_s
+                if expired or not self._is_healthy(pooled):
+                    with self._cond:
+                        self._stats["connections_recycled" if expired else "health_check_failures"] += 1
+                    self._discard(pooled)
+                    pooled = None
+            if pooled is None:
+                pooled = self._connect()
+        except BaseException:
+            with self._cond:
+                self._open -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        waited_ms = (time.monotonic() - started) * 1000
+        with self._cond:
+            self._stats["checkouts"] += 1
+            self._stats["checkout_wait_total_ms"] += waited_ms
+            self._stats["checkout_wait_max_ms"] = max(self._stats["checkout_wait_max_ms"], waited_ms)
+        record_pool_wait(waited_ms / 1000)
+        return pooled
+
+    def release(self, pooled: PooledConnection, discard: bool = False):
+        pooled.last_used = time.monotonic()
+        discard = discard or self._closed or pooled.conn.is_closed()
+        if discard:
+            self._discard(pooled)
+        with self._cond:
+            self._in_use -= 1
+            if discard:
+                self._open -= 1
+            else:
+                self._idle.append(pooled)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        pooled = self.acquire()
+        try:
+            yield pooled.conn
+        finally:
+            self.release(pooled)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> dict:
+        with self._cond:
+            checkouts = self._stats["checkouts"]
+            return {
+                "engine": DATA_ENGINE,
+                "size": self.size,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                **self._stats,
+                "checkout_wait_avg_ms": self._stats["checkout_wait_total_ms"] / checkouts if checkouts else 0.0,
+            }
+
+_pool: Optional[ConnectionPool] = None
+_pool_lock = threading.Lock()
+
+def get_pool() -> ConnectionPool:
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool._closed:
+            _pool = ConnectionPool()
+        return _pool
+
+def init_pool() -> ConnectionPool:
+    pool = get_pool()
+    pool.warm()
+    return pool
+
+def close_pool():
+    global _pool, _engine
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+    with _engine_lock:
+        if _engine is not None:
+            _engine.close()
+            _engine = None
+
+@contextmanager
+def connection():
+    with get_pool().connection() as conn:
+        yield conn
+
+def _execute(
+    cursor, sql: str, params: tuple = None, timeout: Optional[float] = None, handle: Optional["QueryHandle"] = None
+):
+    get_engine().execute(cursor, sql, params, timeout, handle)
+
+# Times execute + fetch for one statement; name defaults to the endpoint serving the request
+@contextmanager
+def _measure(cursor, name: Optional[str]):
+    result = {}
+    started = time.perf_counter()
     try:
-        cursor.execute(sql, params)
+        yield result
+    except BaseException:
+        record_query(query_name(name), time.perf_counter() - started, query_id=cursor.sfqid, error=True)
+        raise
+    record_query(
+        query_name(name), time.perf_counter() - started,
+        rows=result.get("rows"), nbytes=result.get("bytes"), query_id=cursor.sfqid,
+    )
+
+class QueryHandle:
+    # Lets the event loop cancel the one statement a worker thread is waiting on
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._conn = None
+        self._query_id = None
+        self.cancelled = False
+
+    def attach(self, conn):
+        with self._lock:
+            if self.cancelled:
+                raise QueryCancelled("Query was cancelled before it started")
+            self._conn = conn
+
+    def started(self, query_id) -> bool:
+        # Called by the engine once the statement has an id; False if a cancel already came in
+        with self._lock:
+            self._query_id = query_id
+            return not self.cancelled
+
+    def detach(self):
+        with self._lock:
+            self._conn = None
+            self._query_id = None
+
+    def cancel(self) -> bool:
+        with self._lock:
+            self.cancelled = True
+            conn, query_id = self._conn, self._query_id
+        if conn is None or query_id is None:
+            return False
+        # The cancel names the query id, so it cannot hit a later statement if the connection is reused
+        try:
+            get_engine().cancel(conn, query_id)
+            return True
+        except Exception:
+            return False
+
+@contextmanager
+def _cursor(handle: Optional[QueryHandle] = None):
+    with connection() as conn:
+        if handle is not None:
+            handle.attach(conn)
+        cursor = conn.cursor()
+        try:
+            yield cursor
+        finally:
+            cursor.close()
+            if handle is not None:
+                handle.detach()
+
+def execute_query(
+    sql: str, params: tuple = None, timeout: Optional[float] = None, name: Optional[str] = None,
+    handle: Optional[QueryHandle] = None,
+) -> list[dict]:
+    with _cursor(handle) as cursor, _measure(cursor, name) as result:
+        _execute(cursor, sql, params, timeout, handle)
         columns = [desc[0].lower() for desc in cursor.description] if cursor.description else []
-        return [dict(zip(columns, row)) for row in cursor.fetchall()]
-    finally:
-        cursor.close()
+        rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        result["rows"] = len(rows)
+    return rows
 
-def execute_scalar(sql: str, params: tuple = None):
-    conn = get_connection()
-    cursor = conn.cursor()
-    try:
-        cursor.execute(sql, params)
+def execute_scalar(
+    sql: str, params: tuple = None, timeout: Optional[float] = None, name: Optional[str] = None,
+    handle: Optional[QueryHandle] = None,
+):
+    with _cursor(handle) as cursor, _measure(cursor, name) as result:
+        _execute(cursor, sql, params, timeout, handle)
         row = cursor.fetchone()
-        return row[0] if row else None
-    finally:
-        cursor.close()
+        result["rows"] = 1 if row else 0
+    return row[0] if row else None
+
+def execute_arrow(
+    sql: str, params: tuple = None, timeout: Optional[float] = None, name: Optional[str] = None,
+    handle: Optional[QueryHandle] = None,
+) -> pa.Table:
+    with _cursor(handle) as cursor, _measure(cursor, name) as result:
+        _execute(cursor, sql, params, timeout, handle)
+        table = cursor.fetch_arrow_all(force_return_table=True)
+        result["rows"] = table.num_rows
+        result["bytes"] = table.nbytes
+    return table.rename_columns([column.lower() for column in table.column_names])
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _pool_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=QUERY_WORKERS, thread_name_prefix="snowflake-query")
+        return _executor
+
+def shutdown_executor():
+    global _executor
+    with _pool_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+def _cancel_in_background(handle: QueryHandle, name: Optional[str], reason: str):
+    increment("snowcore_query_cancellations_total", query=query_name(name), reason=reason)
+    # The cancel is a round trip of its own; keep it off the loop and out of the saturated query executor
+    asyncio.get_running_loop().run_in_executor(None, handle.cancel)
+
+async def _run_in_executor(fn, sql: str, params: tuple, timeout: float, name: Optional[str] = None):
+    budget = remaining()
+    if budget is not None:
+        # A statement never outlives the request that started it
+        if budget <= 0:
+            raise QueryTimeout("Request deadline exceeded before the query started")
+        timeout = min(timeout, budget)
+    loop = asyncio.get_running_loop()
+    handle = QueryHandle()
+    # Run under a copy of the caller's context so per-request timings reach the worker thread
+    call = functools.partial(fn, sql, params, timeout=timeout, name=name, handle=handle)
+    future = loop.run_in_executor(get_executor(), contextvars.copy_context().run, call)
+    try:
+        return await asyncio.wait_for(future, timeout + QUERY_TIMEOUT_GRACE_S)
+    except asyncio.TimeoutError:
+        _cancel_in_background(handle, name, "timeout")
+        raise QueryTimeout(f"Query exceeded {timeout:g}s") from None
+    except asyncio.CancelledError:
+        # Client went away or the request ran out of budget: stop the statement server-side too
+        _cancel_in_background(handle, name, "cancelled")
+        raise
+
+async def execute_query_async(
+    sql: str, params: tuple = None, timeout: float = QUERY_TIMEOUT_S, cached: bool = False, name: Optional[str] = None
+) -> list[dict]:
+    if cached:
+        return await query_cache.get_or_load(
+            cache_key("rows", sql, params), lambda: _run_in_executor(execute_query, sql, params, timeout, name)
+        )
+    return await _run_in_executor(execute_query, sql, params, timeout, name)
+
+async def execute_scalar_async(sql: str, params: tuple = None, timeout: float = QUERY_TIMEOUT_S, name: Optional[str] = None):
+    return await _run_in_executor(execute_scalar, sql, params, timeout, name)
+
+async def execute_arrow_async(
+    sql: str, params: tuple = None, timeout: float = QUERY_TIMEOUT_S, cached: bool = False, name: Optional[str] = None
+) -> pa.Table:
+    if cached:
+        return await query_cache.get_or_load(
+            cache_key("arrow", sql, params), lambda: _run_in_executor(execute_arrow, sql, params, timeout, name)
+        )
+    return await _run_in_executor(execute_arrow, sql, params, timeout, name)
@@ -0,0 +1,96 @@
+import asyncio
+import contextvars
+import os
+import time
+from typing import Optional
+from fastapi.responses import JSONResponse
+
+REQUEST_TIMEOUT_S = float(os.getenv("REQUEST_TIMEOUT_S", "60"))
+
+# Whole-request budgets per endpoint path; queries started by the request never outlive it
+ROUTE_TIMEOUTS_S = {
+    "/api/agent/run": 180.0,
+    "/api/predictions/autogl-interpretation": 150.0,
+    "/api/simulation/pressure-cascade": 30.0,
+    "/api/batch": 60.0,
+}
+
+def _parse_overrides(value: str) -> dict[str, float]:
+    # ROUTE_TIMEOUTS_S="/api/agent/run=240,/api/assets=10"
+    overrides = {}
+    for item in value.split(","):
+        path, _, seconds = item.strip().partition("=")
+        if path and seconds:
+            overrides[path.strip()] = float(seconds)
+    return overrides
+
+ROUTE_TIMEOUTS_S.update(_parse_overrides(os.getenv("ROUTE_TIMEOUTS_S", "")))
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("request_deadline", default=None)
+
+def route_timeout(path: str) -> float:
+    return ROUTE_TIMEOUTS_S.get(path.rstrip("/") or "/", REQUEST_TIMEOUT_S)
+
+def remaining() -> Optional[float]:
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+class DeadlineMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        budget = route_timeout(scope["path"])
+        deadline = time.monotonic() + budget
+        outer = _deadline.get()
+        if outer is not None:
+            # Batched sub-requests also stay inside the batch's own budget
+            deadline = min(deadline, outer)
+        token = _deadline.set(deadline)
+        inbox: asyncio.Queue = asyncio.Queue()
+        state = {"started": False, "complete": False, "disconnected": False}
+
+        async def forward_send(message):
+            if message["type"] == "http.response.start":
+                state["started"] = True
+            elif message["type"] == "http.response.body" and not message.get("more_body", False):
+                state["complete"] = True
+            await send(message)
+
+        app_task = asyncio.create_task(self.app(scope, inbox.get, forward_send))
+
+        # Owns the real receive channel so a disconnect is seen even while the handler waits on a query
+        async def watch_disconnect():
+            while True:
+                message = await receive()
+                await inbox.put(message)
+                if message["type"] == "http.disconnect":
+                    if not state["complete"]:
+                        state["disconnected"] = True
+                        scope["client_disconnected"] = True
+                        app_task.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch_disconnect())
+        try:
+            await asyncio.wait_for(asyncio.shield(app_task), deadline - time.monotonic())
+        except asyncio.TimeoutError:
+            app_task.cancel()
+            await asyncio.gather(app_task, return_exceptions=True)
+            if not state["started"]:
+                response = JSONResponse(status_code=504, content={"detail": f"Request exceeded its {budget:g}s budget"})
+                await response(scope, inbox.get, send)
+            elif not state["complete"]:
+                # A streamed response (agent SSE) already sent its headers; end the body so the client sees it close
+                await send({"type": "http.response.body", "body": b"", "more_body": False})
+        except asyncio.CancelledError:
+            if not state["disconnected"]:
+                app_task.cancel()
+                raise
+        finally:
+            watcher.cancel()
+            _deadline.reset(token)
@@ -0,0 +1,303 @@
+import itertools
+import os
+import re
+import sys
+import threading
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+import duckdb
+import pyarrow as pa
+from database import DATABASE, SCHEMA, QueryCancelled, QueryTimeout
+
+LOCAL_DATA_DIR = Path(os.getenv("LOCAL_DATA_DIR", Path(__file__).resolve().parents[3] / "data" / "synthetic"))
+LOCAL_DUCKDB_PATH = os.getenv("LOCAL_DUCKDB_PATH", ":memory:")
+# Telemetry is not committed; without a scada_telemetry file this many days are generated at startup
+LOCAL_TELEMETRY_DAYS = float(os.getenv("LOCAL_TELEMETRY_DAYS", "7"))
+GENERATOR_DIR = Path(__file__).resolve().parents[3] / "utils"
+
+# Column types follow sql/02_tables.sql (Snowflake FLOAT is a double)
+TABLES = {
+    "ASSET_MASTER": """
+        ASSET_ID VARCHAR NOT NULL PRIMARY KEY,
+        SOURCE_SYSTEM VARCHAR NOT NULL,
+        ASSET_TYPE VARCHAR NOT NULL,
+        ASSET_SUBTYPE VARCHAR,
+        LATITUDE DOUBLE,
+        LONGITUDE DOUBLE,
+        MAX_PRESSURE_RATING_PSI DOUBLE,
+        MANUFACTURER VARCHAR,
+        INSTALL_DATE DATE,
+        ZONE VARCHAR
+    """,
+    "NETWORK_EDGES": """
+        SEGMENT_ID VARCHAR NOT NULL PRIMARY KEY,
+        SOURCE_ASSET_ID VARCHAR NOT NULL,
+        TARGET_ASSET_ID VARCHAR NOT NULL,
+        LINE_DIAMETER_INCHES DOUBLE,
+        MAX_PRESSURE_RATING_PSI DOUBLE,
+        STATUS VARCHAR,
+        LENGTH_MILES DOUBLE
+    """,
+    "SCADA_TELEMETRY": """
+        ASSET_ID VARCHAR NOT NULL,
+        TIMESTAMP TIMESTAMP NOT NULL,
+        FLOW_RATE_BOPD DOUBLE,
+        GAS_FLOW_MCFD DOUBLE,
+        PRESSURE_PSI DOUBLE,
+        TEMPERATURE_F DOUBLE,
+        SOURCE_SYSTEM VARCHAR
+    """,
+    "GRAPH_PREDICTIONS": """
+        PREDICTION_ID BIGINT DEFAULT nextval('GRAPH_PREDICTIONS_SEQ') PRIMARY KEY,
+        PREDICTION_TYPE VARCHAR NOT NULL,
+        ENTITY_ID VARCHAR NOT NULL,
+        RELATED_ENTITY_ID VARCHAR,
+        SCORE DOUBLE NOT NULL,
+        CONFIDENCE DOUBLE,
+        EXPLANATION VARCHAR,
+        PREDICTION_TIMESTAMP TIMESTAMP DEFAULT current_timestamp
+    """,
+    "SCADA_AGGREGATES": """
+        ASSET_ID VARCHAR NOT NULL,
+        RECORD_DATE DATE NOT NULL,
+        SOURCE_SYSTEM VARCHAR,
+        ZONE VARCHAR,
+        ASSET_TYPE VARCHAR,
+        AVG_FLOW_RATE_BOPD DOUBLE,
+        MAX_FLOW_RATE_BOPD DOUBLE,
+        MIN_FLOW_RATE_BOPD DOUBLE,
+        TOTAL_PRODUCTION_BBL DOUBLE,
+        AVG_GAS_FLOW_MCFD DOUBLE,
+        TOTAL_GAS_MCF DOUBLE,
+        GAS_OIL_RATIO DOUBLE,
+        AVG_PRESSURE_PSI DOUBLE,
+        MAX_PRESSURE_PSI DOUBLE,
+        MIN_PRESSURE_PSI DOUBLE,
+        PRESSURE_VARIANCE DOUBLE,
+        AVG_TEMPERATURE_F DOUBLE,
+        MAX_TEMPERATURE_F DOUBLE,
+        READING_COUNT INTEGER,
+        DOWNTIME_HOURS DOUBLE,
+        PRIMARY KEY (ASSET_ID, RECORD_DATE)
+    """,
+}
+
+# Same formulas as the INSERT ... SELECT in sql/02_tables.sql
+AGGREGATES_SQL = """
+INSERT INTO SCADA_AGGREGATES
+SELECT
+    t.ASSET_ID,
+    CAST(t.TIMESTAMP AS DATE) AS RECORD_DATE,
+    t.SOURCE_SYSTEM,
+    a.ZONE,
+    a.ASSET_TYPE,
+    AVG(t.FLOW_RATE_BOPD),
+    MAX(t.FLOW_RATE_BOPD),
+    MIN(t.FLOW_RATE_BOPD),
+    SUM(t.FLOW_RATE_BOPD) / NULLIF(COUNT(*), 0),
+    AVG(t.GAS_FLOW_MCFD),
+    SUM(t.GAS_FLOW_MCFD) / NULLIF(COUNT(*), 0),
+    CASE WHEN AVG(t.FLOW_RATE_BOPD) > 0 THEN (AVG(t.GAS_FLOW_MCFD) / AVG(t.FLOW_RATE_BOPD)) * 1000 END,
+    AVG(t.PRESSURE_PSI),
+    MAX(t.PRESSURE_PSI),
+    MIN(t.PRESSURE_PSI),
+    VARIANCE(t.PRESSURE_PSI),
+    AVG(t.TEMPERATURE_F),
+    MAX(t.TEMPERATURE_F),
+    COUNT(*),
+    GREATEST(0, (1440 - COUNT(*)) / 60.0)
+FROM SCADA_TELEMETRY t
+JOIN ASSET_MASTER a ON t.ASSET_ID = a.ASSET_ID
+GROUP BY t.ASSET_ID, CAST(t.TIMESTAMP AS DATE), t.SOURCE_SYSTEM, a.ZONE, a.ASSET_TYPE
+"""
+
+# Stand-ins for the SNOWFLAKE.CORTEX functions the routes call
+CORTEX_MACROS = [
+    """CREATE MACRO snowflake.cortex.complete(model, prompt) AS
+       '[local engine] ' || model || ' is not available offline; received a '
+       || length(prompt) || '-character prompt.'""",
+    """CREATE MACRO snowflake.cortex.search_preview(service, query, options) AS
+       '{"results": []}'""",
+    """CREATE MACRO snowflake.cortex.semantic_view_answer(semantic_view, question) AS
+       '{"error": "Cortex Analyst is not available on the local engine", "fallback": true}'""",
+]
+
+# Snowflake-only syntax used by the routes, rewritten for DuckDB
+TRANSLATIONS = [
+    (re.compile(r"\bARRAY_CONSTRUCT\(", re.IGNORECASE), "list_value("),
+    (re.compile(r"\bARRAY_APPEND\(", re.IGNORECASE), "list_append("),
+    (re.compile(r"\bHASH_AGG\(([^()]*)\)", re.IGNORECASE), r"bit_xor(hash(\1))"),
+    (re.compile(r"\bARRAY_CONTAINS\(\s*([\w.]+)::VARIANT\s*,\s*([\w.]+)\s*\)", re.IGNORECASE), r"list_contains(\2, \1)"),
+]
+
+def translate_sql(sql: str) -> str:
+    for pattern, replacement in TRANSLATIONS:
+        sql = pattern.sub(replacement, sql)
+    return sql
+
+def _find_source(data_dir: Path, table: str) -> Optional[str]:
+    name = table.lower()
+    candidates = [
+        (data_dir / f"{name}.csv", f"{name}.csv"),
+        (data_dir / name, f"{name}/**/*.parquet"),
+        (data_dir / name, f"{name}/**/*.csv"),
+        (data_dir / "bulk" / name, f"bulk/{name}/*.csv.*"),
+    ]
+    for path, pattern in candidates:
+        if path.exists() and any(data_dir.glob(pattern)):
+            return str(data_dir / pattern)
+    return None
+
+_query_ids = itertools.count(1)
+
+class DuckDBCursor:
+    def __init__(self, connection: "DuckDBConnection"):
+        self._connection = connection
+        self._conn = connection._conn
+        self.description = None
+        self.sfqid = None
+
+    def execute(self, sql: str, params=None, timeout: Optional[float] = None, handle=None):
+        # Local stand-in for a Snowflake query id, so a cancel only interrupts this statement
+        self.sfqid = query_id = f"duckdb-{next(_query_ids)}"
+        if handle is not None and not handle.started(query_id):
+            raise QueryCancelled("Query was cancelled before it started")
+        expired = threading.Event()
+
+        def expire():
+            expired.set()
+            self._connection.interrupt(query_id)
+
+        timer = threading.Timer(timeout, expire) if timeout else None
+        self._connection.begin(query_id)
+        if timer:
+            timer.start()
+        try:
+            self._conn.execute(translate_sql(sql), params)
+        except duckdb.InterruptException as e:
+            if expired.is_set():
+                raise QueryTimeout(f"Query exceeded {timeout:g}s and was cancelled") from e
+            raise QueryCancelled("Query was cancelled") from e
+        finally:
+            if timer:
+                timer.cancel()
+            self._connection.end()
+        self.description = self._conn.description
+        return self
+
+    def fetchall(self):
+        return self._conn.fetchall()
+
+    def fetchone(self):
+        return self._conn.fetchone()
+
+    def fetch_arrow_all(self, force_return_table: bool = False) -> pa.Table:
+        return self._conn.to_arrow_table()
+
+    def close(self):
+        pass
+
+class DuckDBConnection:
+    def __init__(self, conn: duckdb.DuckDBPyConnection):
+        self._conn = conn
+        self._closed = False
+        self._lock = threading.Lock()
+        self._running = None
+
+    def cursor(self) -> DuckDBCursor:
+        return DuckDBCursor(self)
+
+    def begin(self, query_id: str):
+        with self._lock:
+            self._running = query_id
+
+    def end(self):
+        with self._lock:
+            self._running = None
+
+    def interrupt(self, query_id: str):
+        # The connection is pooled; only interrupt if that statement is still the one running
+        with self._lock:
+            if self._running == query_id:
+                self._conn.interrupt()
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+    def close(self):
+        if not self._closed:
+            self._conn.close()
+            self._closed = True
+
+class DuckDBEngine:
+    name = "duckdb"
+
+    def __init__(self, path: str = LOCAL_DUCKDB_PATH, data_dir: Path = LOCAL_DATA_DIR):
+        self.data_dir = Path(data_dir)
+        self._db = duckdb.connect(path)
+        self._db.execute(f"ATTACH IF NOT EXISTS ':memory:' AS {DATABASE}")
+        self._db.execute(f"CREATE SCHEMA IF NOT EXISTS {DATABASE}.{SCHEMA}")
+        self._db.execute(f"USE {DATABASE}.{SCHEMA}")
+        self._db.execute("ATTACH IF NOT EXISTS ':memory:' AS snowflake")
+        self._db.execute("CREATE SCHEMA IF NOT EXISTS snowflake.cortex")
+        for macro in CORTEX_MACROS:
+            self._db.execute(macro)
+        self.row_counts = self._seed()
+
+    def _seed(self) -> dict:
+        self._db.execute("CREATE SEQUENCE IF NOT EXISTS GRAPH_PREDICTIONS_SEQ")
+        row_counts = {}
+        for table, columns in TABLES.items():
+            self._db.execute(f"CREATE OR REPLACE TABLE {table} ({columns})")
+            source = _find_source(self.data_dir, table)
+            if source is None:
+                continue
+            reader = "read_parquet" if source.endswith(".parquet") else "read_csv"
+            options = ", hive_partitioning = false" if reader == "read_parquet" else ", header = true"
+            self._db.execute(f"INSERT INTO {table} BY NAME SELECT * FROM {reader}('{source}'{options})")
+        if _find_source(self.data_dir, "SCADA_TELEMETRY") is None:
+            self._generate_telemetry()
+        if _find_source(self.data_dir, "SCADA_AGGREGATES") is None:
+            self._db.execute(AGGREGATES_SQL)
+        for table in TABLES:
+            row_counts[table] = self._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+        return row_counts
+
+    def _generate_telemetry(self):
+        # Same model as utils/generate_synthetic_data.py, with per-asset seeds so it is stable run to run
+        if str(GENERATOR_DIR) not in sys.path:
+            sys.path.append(str(GENERATOR_DIR))
+        try:
+            import generate_synthetic_data as generator
+        except ImportError as e:
+            raise RuntimeError(
+                f"No scada_telemetry file in {self.data_dir} and the telemetry generator could not be imported"
+            ) from e
+        cursor = self._db.execute(
+            "SELECT ASSET_ID, SOURCE_SYSTEM, ASSET_TYPE, ZONE, MAX_PRESSURE_RATING_PSI FROM ASSET_MASTER"
+        )
+        columns = [d[0] for d in cursor.description]
+        assets = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        if not assets:
+            raise RuntimeError(f"No asset_master file in {self.data_dir}; cannot generate SCADA_TELEMETRY")
+        end = generator.START_TIME + timedelta(days=LOCAL_TELEMETRY_DAYS, minutes=-generator.INTERVAL_MINUTES)
+        blocks = generator.iter_scada_telemetry_blocks(assets, end=end, block_seconds=86400, per_asset_seeds=True)
+        for block in blocks:
+            self._db.register("telemetry_block", pa.table({name: block[name] for name in generator.TELEMETRY_FIELDS}))
+            self._db.execute("INSERT INTO SCADA_TELEMETRY BY NAME SELECT * FROM telemetry_block")
+        self._db.unregister("telemetry_block")
+
+    def connect(self) -> DuckDBConnection:
+        conn = self._db.cursor()
+        conn.execute(f"USE {DATABASE}.{SCHEMA}")
+        return DuckDBConnection(conn)
+
+    def execute(self, cursor: DuckDBCursor, sql: str, params=None, timeout: Optional[float] = None, handle=None):
+        cursor.execute(sql, params, timeout=timeout, handle=handle)
+
+    def cancel(self, conn: DuckDBConnection, query_id: str):
+        conn.interrupt(query_id)
+
+    def close(self):
+        self._db.close()
@@ -0,0 +1,483 @@
+import asyncio
+import heapq
+import os
+import time
+from typing import Optional
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+from database import execute_arrow_async, execute_query_async
+
+GRAPH_REFRESH_S = float(os.getenv("GRAPH_REFRESH_S", "60"))
+
+# Edge cost for route search: segment length, inverse diameter (favour big pipe),
+# or inverse pressure-rating headroom over current operating pressure
+ROUTE_WEIGHTS = ("length", "diameter", "headroom")
+# Segment diameter at which friction cost equals length, for pressure-wave attenuation
+REFERENCE_DIAMETER_IN = 8.0
+# Headroom below this is treated as this, so overpressured segments are very expensive but still routable
+MIN_HEADROOM_PSI = 1.0
+
+EDGES_SQL = """
+SELECT SEGMENT_ID, SOURCE_ASSET_ID, TARGET_ASSET_ID, LINE_DIAMETER_INCHES,
+       MAX_PRESSURE_RATING_PSI, STATUS, LENGTH_MILES
+FROM NETWORK_EDGES
+ORDER BY SEGMENT_ID
+"""
+
+NODES_SQL = """
+SELECT ASSET_ID, SOURCE_SYSTEM, ASSET_TYPE, ZONE, LATITUDE, LONGITUDE, MAX_PRESSURE_RATING_PSI
+FROM ASSET_MASTER
+"""
+
+# Cheap change detector: the graph is only rebuilt when this result moves
+EDGES_FINGERPRINT_SQL = """
+SELECT COUNT(*) AS edge_count,
+       HASH_AGG(SEGMENT_ID, SOURCE_ASSET_ID, TARGET_ASSET_ID, LINE_DIAMETER_INCHES,
+                MAX_PRESSURE_RATING_PSI, STATUS, LENGTH_MILES) AS edge_hash
+FROM NETWORK_EDGES
+"""
+
+def _strings(table: pa.Table, column: str) -> np.ndarray:
+    return np.asarray(table.column(column).fill_null("").to_pylist(), dtype=str)
+
+def _floats(table: pa.Table, column: str) -> np.ndarray:
+    return pc.cast(table.column(column), pa.float64()).to_numpy(zero_copy_only=False).astype(np.float64)
+
+def _csr(rows: np.ndarray, cols: np.ndarray, n: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    order = np.argsort(rows, kind="stable").astype(np.int32)
+    indptr = np.zeros(n + 1, dtype=np.int32)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, cols[order], order
+
+def _float_or_none(value) -> Optional[float]:
+    value = float(value)
+    return None if np.isnan(value) else value
+
+class NetworkGraph:
+    def __init__(self, nodes: pa.Table, edges: pa.Table, fingerprint=None):
+        self.fingerprint = fingerprint
+        self.loaded_at = time.time()
+
+        edge_sources = _strings(edges, "source_asset_id")
+        edge_targets = _strings(edges, "target_asset_id")
+        # Edges may reference assets missing from ASSET_MASTER; they become attribute-less nodes
+        asset_ids = _strings(nodes, "asset_id")
+        extra = np.setdiff1d(np.union1d(edge_sources, edge_targets), asset_ids)
+        ids = np.concatenate([asset_ids, extra])
+        n = len(ids)
+        self.index = {asset_id: i for i, asset_id in enumerate(ids.tolist())}
+
+        width = max(1, max((len(s) for s in ids.tolist()), default=1))
+        self.nodes = np.zeros(n, dtype=[
+            ("asset_id", f"U{width}"),
+            ("source_system", "U16"),
+            ("asset_type", "U32"),
+            ("zone", "U32"),
+            ("latitude", "f8"),
+            ("longitude", "f8"),
+            ("max_pressure_psi", "f8"),
+        ])
+        self.nodes["asset_id"] = ids
+        self.nodes["latitude"] = self.nodes["longitude"] = self.nodes["max_pressure_psi"] = np.nan
+        k = len(asset_ids)
+        self.nodes["source_system"][:k] = _strings(nodes, "source_system")
+        self.nodes["asset_type"][:k] = _strings(nodes, "asset_type")
+        self.nodes["zone"][:k] = _strings(nodes, "zone")
+        self.nodes["latitude"][:k] = _floats(nodes, "latitude")
+        self.nodes["longitude"][:k] = _floats(nodes, "longitude")
+        self.nodes["max_pressure_psi"][:k] = _floats(nodes, "max_pressure_rating_psi")
+
+        m = edges.num_rows
+        segment_width = max(1, max((len(s) for s in edges.column("segment_id").to_pylist()), default=1))
+        self.edges = np.zeros(m, dtype=[
+            ("segment_id", f"U{segment_width}"),
+            ("source", "i4"),
+            ("target", "i4"),
+            ("diameter_in", "f8"),
+            ("max_pressure_psi", "f8"),
+            ("length_miles", "f8"),
+            ("status", "U16"),
+            ("active", "?"),
+        ])
+        self.edges["segment_id"] = _strings(edges, "segment_id")
+        sorter = np.argsort(ids)
+        self.edges["source"] = sorter[np.searchsorted(ids, edge_sources, sorter=sorter)]
+        self.edges["target"] = sorter[np.searchsorted(ids, edge_targets, sorter=sorter)]
+        self.edges["diameter_in"] = _floats(edges, "line_diameter_inches")
+        self.edges["max_pressure_psi"] = _floats(edges, "max_pressure_rating_psi")
+        self.edges["length_miles"] = _floats(edges, "length_miles")
+        self.edges["status"] = _strings(edges, "status")
+        self.edges["active"] = np.char.upper(self.edges["status"]) == "ACTIVE"
+
+        # Downstream (out) and upstream (in) adjacency; *_edge maps each slot back to self.edges
+        sources = self.edges["source"].astype(np.int32)
+        targets = self.edges["target"].astype(np.int32)
+        self.out_indptr, self.out_indices, self.out_edge = _csr(sources, targets, n)
+        self.in_indptr, self.in_indices, self.in_edge = _csr(targets, sources, n)
+        # Plain-list copies for the per-node loops of route search, where numpy scalar indexing is slow
+        self._out_lists = (self.out_indptr.tolist(), self.out_indices.tolist(), self.out_edge.tolist())
+        self._in_lists = (self.in_indptr.tolist(), self.in_indices.tolist(), self.in_edge.tolist())
+        self.edge_table = pa.table({
+            "segment_id": self.edges["segment_id"],
+            "source_asset_id": self.nodes["asset_id"][sources],
+            "target_asset_id": self.nodes["asset_id"][targets],
+            "line_diameter_inches": self.edges["diameter_in"],
+            "max_pressure_rating_psi": self.edges["max_pressure_psi"],
+            "length_miles": self.edges["length_miles"],
+            "status": self.edges["status"],
+        })
+
+    @property
+    def node_count(self) -> int:
+        return len(self.nodes)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.edges)
+
+    def node_id(self, asset_id: str) -> Optional[int]:
+        return self.index.get(asset_id)
+
+    def node_record(self, i: int) -> dict:
+        node = self.nodes[i]
+        return {
+            "asset_id": str(node["asset_id"]),
+            "source_system": str(node["source_system"]) or None,
+            "asset_type": str(node["asset_type"]) or None,
+            "zone": str(node["zone"]) or None,
+            "latitude": _float_or_none(node["latitude"]),
+            "longitude": _float_or_none(node["longitude"]),
+            "max_pressure_psi": _float_or_none(node["max_pressure_psi"]),
+        }
+
+    def edge_record(self, e: int) -> dict:
+        edge = self.edges[e]
+        return {
+            "segment_id": str(edge["segment_id"]),
+            "source_asset_id": str(self.nodes["asset_id"][edge["source"]]),
+            "target_asset_id": str(self.nodes["asset_id"][edge["target"]]),
+            "line_diameter_inches": _float_or_none(edge["diameter_in"]),
+            "max_pressure_rating_psi": _float_or_none(edge["max_pressure_psi"]),
+            "length_miles": _float_or_none(edge["length_miles"]),
+            "status": str(edge["status"]) or None,
+        }
+
+    def _adjacency(self, direction: str):
+        if direction == "downstream":
+            return self.out_indptr, self.out_indices, self.out_edge
+        return self.in_indptr, self.in_indices, self.in_edge
+
+    def _slots(self, indptr: np.ndarray, frontier: np.ndarray) -> np.ndarray:
+        starts = indptr[frontier]
+        counts = indptr[frontier + 1] - starts
+        total = int(counts.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64)
+        # Flattened ranges [start, start + count) for every frontier node, without a Python loop
+        offsets = np.repeat(starts - np.cumsum(counts) + counts, counts)
+        return offsets + np.arange(total)
+
+    def neighbors(self, i: int, direction: str, active_only: bool = True) -> list[tuple[int, int]]:
+        indptr, indices, edge_ids = self._adjacency(direction)
+        slots = np.arange(indptr[i], indptr[i + 1])
+        if active_only:
+            slots = slots[self.edges["active"][edge_ids[slots]]]
+        return list(zip(indices[slots].tolist(), edge_ids[slots].tolist()))
+
+    def traverse(self, start: int, direction: str, max_depth: Optional[int] = None, active_only: bool = True):
+        indptr, indices, edge_ids = self._adjacency(direction)
+        depth = np.full(self.node_count, -1, dtype=np.int32)
+        parent_edge = np.full(self.node_count, -1, dtype=np.int32)
+        depth[start] = 0
+        frontier = np.array([start], dtype=np.int32)
+        level = 0
+        while len(frontier) and (max_depth is None or level < max_depth):
+            slots = self._slots(indptr, frontier)
+            if active_only:
+                slots = slots[self.edges["active"][edge_ids[slots]]]
+            reached = indices[slots]
+            fresh = depth[reached] < 0
+            reached, slots = reached[fresh], slots[fresh]
+            # First edge wins when two frontier nodes reach the same node in one level
+            reached, first = np.unique(reached, return_index=True)
+            level += 1
+            depth[reached] = level
+            parent_edge[reached] = edge_ids[slots[first]]
+            frontier = reached.astype(np.int32)
+        return depth, parent_edge
+
+    def shortest_path(self, source: int, target: int, active_only: bool = True) -> Optional[list[int]]:
+        depth, parent_edge = self.traverse(source, "downstream", active_only=active_only)
+        if depth[target] < 0:
+            return None
+        edges = []
+        node = target
+        while node != source:
+            e = int(parent_edge[node])
+            edges.append(e)
+            node = int(self.edges["source"][e])
+        return edges[::-1]
+
+    def node_values(self, asset_ids: list, values: list) -> np.ndarray:
+        out = np.full(self.node_count, np.nan)
+        for asset_id, value in zip(asset_ids, values):
+            i = self.index.get(asset_id)
+            if i is not None and value is not None:
+                out[i] = value
+        return out
+
+    def edge_weights(self, weight: str, node_pressure: Optional[np.ndarray] = None) -> np.ndarray:
+        if weight == "length":
+            weights = self.edges["length_miles"].copy()
+        elif weight == "diameter":
+            with np.errstate(divide="ignore"):
+                weights = 1.0 / self.edges["diameter_in"]
+        elif weight == "friction":
+            # Friction losses scale with L/D, so a narrow line damps a transient faster than a wide one
+            with np.errstate(divide="ignore"):
+                weights = self.edges["length_miles"] * (REFERENCE_DIAMETER_IN / self.edges["diameter_in"])
+        elif weight == "headroom":
+            headroom = self.edges["max_pressure_psi"].copy()
+            if node_pressure is not None:
+                # The higher-pressure end of a segment sets how close it runs to its rating
+                operating = np.fmax(node_pressure[self.edges["source"]], node_pressure[self.edges["target"]])
+                headroom -= np.nan_to_num(operating, nan=0.0)
+            weights = 1.0 / np.maximum(headroom, MIN_HEADROOM_PSI)
+        else:
+            raise ValueError(f"Unknown route weight: {weight}")
+        # Segments missing the attribute cost as much as a typical segment rather than nothing
+        valid = np.isfinite(weights) & (weights >= 0)
+        weights[~valid] = np.median(weights[valid]) if valid.any() else 1.0
+        return weights
+
+    def propagate(self, source: int, weights: np.ndarray, active_only: bool = True):
+        # Dijkstra downstream from source on `weights`, also carrying the miles and hops of each winning path
+        cost = {source: 0.0}
+        miles = {source: 0.0}
+        hops = {source: 0}
+        parent = {}
+        heap = [(0.0, source)]
+        indptr, indices, edge_ids = self.out_indptr, self.out_indices, self.out_edge
+        weights = weights.tolist()
+        active = self.edges["active"].tolist()
+        lengths = np.nan_to_num(self.edges["length_miles"], nan=0.0).tolist()
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > cost[u]:
+                continue
+            for slot in range(indptr[u], indptr[u + 1]):
+                e = int(edge_ids[slot])
+                if active_only and not active[e]:
+                    continue
+                v = int(indices[slot])
+                nd = d + weights[e]
+                if nd < cost.get(v, np.inf):
+                    cost[v] = nd
+                    miles[v] = miles[u] + lengths[e]
+                    hops[v] = hops[u] + 1
+                    parent[v] = e
+                    heapq.heappush(heap, (nd, v))
+        reached = np.fromiter(cost, dtype=np.int64, count=len(cost))
+        return (
+            reached,
+            np.fromiter(cost.values(), dtype=np.float64, count=len(cost)),
+            np.fromiter(miles.values(), dtype=np.float64, count=len(cost)),
+            np.fromiter(hops.values(), dtype=np.int64, count=len(cost)),
+            np.array([parent.get(int(v), -1) for v in reached], dtype=np.int64),
+        )
+
+    def _corridor(self, source: int, target: int, weights: np.ndarray,
+                  active_only: bool) -> tuple[np.ndarray, np.ndarray]:
+        # Only nodes both reachable from source and able to reach target can be on a route;
+        # two vectorized sweeps give the mask of corridor edges every later search is limited to
+        on_route = (self.traverse(source, "downstream", active_only=active_only)[0] >= 0) & \
+                   (self.traverse(target, "upstream", active_only=active_only)[0] >= 0)
+        mask = on_route[self.edges["source"]] & on_route[self.edges["target"]]
+        if active_only:
+            mask &= self.edges["active"]
+        # Exact cost-to-target on the full corridor; removing edges only raises it, so it stays
+        # a consistent A* potential for every spur search Yen's algorithm runs
+        potential = np.full(self.node_count, np.inf)
+        if not on_route[source]:
+            return mask, potential
+        potential[target] = 0.0
+        indptr, indices, edge_ids = self._in_lists
+        cost = {target: 0.0}
+        heap = [(0.0, target)]
+        while heap:
+            d, v = heapq.heappop(heap)
+            if d > cost[v]:
+                continue
+            for slot in range(indptr[v], indptr[v + 1]):
+                e = edge_ids[slot]
+                if not mask[e]:
+                    continue
+                u = indices[slot]
+                nd = d + float(weights[e])
+                if nd < cost.get(u, np.inf):
+                    cost[u] = nd
+                    heapq.heappush(heap, (nd, u))
+        potential[np.fromiter(cost, dtype=np.int64, count=len(cost))] = list(cost.values())
+        return mask, potential
+
+    def _search(self, mask: np.ndarray, potential: np.ndarray, weights: np.ndarray, source: int, target: int,
+                banned_nodes: set, banned_edges: set) -> Optional[tuple[float, list[int]]]:
+        indptr, indices, edge_ids = self._out_lists
+        cost = {source: 0.0}
+        parent: dict[int, tuple[int, int]] = {}
+        closed = set()
+        heap = [(float(potential[source]), source)]
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u in closed:
+                continue
+            if u == target:
+                edges = []
+                while u != source:
+                    u, e = parent[u]
+                    edges.append(e)
+                return cost[target], edges[::-1]
+            closed.add(u)
+            d = cost[u]
+            for slot in range(indptr[u], indptr[u + 1]):
+                e = edge_ids[slot]
+                v = indices[slot]
+                if not mask[e] or v in banned_nodes or e in banned_edges or v in closed:
+                    continue
+                nd = d + float(weights[e])
+                if nd < cost.get(v, np.inf):
+                    cost[v] = nd
+                    parent[v] = (u, e)
+                    heapq.heappush(heap, (nd + float(potential[v]), v))
+        return None
+
+    def k_shortest_paths(self, source: int, target: int, k: int, weights: np.ndarray,
+                         active_only: bool = False) -> list[tuple[float, list[int]]]:
+        # Yen's algorithm: loopless paths in increasing cost, no hop limit
+        if source == target:
+            return []
+        mask, potential = self._corridor(source, target, weights, active_only)
+        if not np.isfinite(potential[source]):
+            return []
+        cost, edges = self._search(mask, potential, weights, source, target, set(), set())
+        found = [(cost, edges)]
+        seen = {tuple(edges)}
+        candidates: list[tuple[float, int, list[int], int]] = []
+        counter = 0
+        deviation = 0
+        edge_targets = self.edges["target"]
+        while len(found) < k:
+            nodes = [source] + edge_targets[edges].tolist()
+            # How far each accepted path shares this one's prefix decides which spur edges it bans
+            shared = []
+            for _, path in found:
+                n = 0
+                for a, b in zip(path, edges):
+                    if a != b:
+                        break
+                    n += 1
+                shared.append((n, path))
+            banned_nodes = set(nodes[:deviation])
+            root_cost = float(weights[edges[:deviation]].sum())
+            # Lawler: spurs before the previous path's deviation point were already tried from its parent
+            for i in range(deviation, len(edges)):
+                banned_edges = {path[i] for n, path in shared if n >= i and len(path) > i}
+                spur = self._search(mask, potential, weights, nodes[i], target, banned_nodes, banned_edges)
+                if spur is not None:
+                    path = edges[:i] + spur[1]
+                    key = tuple(path)
+                    if key not in seen:
+                        seen.add(key)
+                        counter += 1
+                        heapq.heappush(candidates, (root_cost + spur[0], counter, path, i))
+                banned_nodes.add(nodes[i])
+                root_cost += float(weights[edges[i]])
+            if not candidates:
+                break
+            cost, _, edges, deviation = heapq.heappop(candidates)
+            found.append((cost, edges))
+        return found
+
+    def path_length(self, edges: list[int]) -> float:
+        return float(np.nansum(self.edges["length_miles"][edges]))
+
+    def bottleneck(self, edges: list[int]) -> dict:
+        # The lowest-rated segment limits what the whole route can carry
+        rated = self.edges["max_pressure_psi"][edges]
+        narrowest = self.edges["diameter_in"][edges]
+        limiting = int(edges[int(np.nanargmin(rated))]) if np.isfinite(rated).any() else int(edges[0])
+        return {
+            "segment_id": str(self.edges["segment_id"][limiting]),
+            "max_pressure_rating_psi": _float_or_none(self.edges["max_pressure_psi"][limiting]),
+            "min_line_diameter_inches": _float_or_none(np.nanmin(narrowest)) if np.isfinite(narrowest).any() else None,
+        }
+
+    def path_nodes(self, source: int, edges: list[int]) -> list[str]:
+        return [str(self.nodes["asset_id"][source])] + [str(self.nodes["asset_id"][self.edges["target"][e]]) for e in edges]
+
+    def status(self) -> dict:
+        return {
+            "nodes": self.node_count,
+            "edges": self.edge_count,
+            "active_edges": int(self.edges["active"].sum()),
+            "loaded_at": self.loaded_at,
+            "age_s": round(time.time() - self.loaded_at, 1),
+        }
+
+_graph: Optional[NetworkGraph] = None
+_refresh_task: Optional[asyncio.Task] = None
+_last_error: Optional[str] = None
+
+def get_graph() -> Optional[NetworkGraph]:
+    return _graph
+
+async def _fingerprint() -> tuple:
+    rows = await execute_query_async(EDGES_FINGERPRINT_SQL, name="graph_fingerprint")
+    row = rows[0] if rows else {}
+    return (row.get("edge_count"), row.get("edge_hash"))
+
+async def load_graph(force: bool = False) -> Optional[NetworkGraph]:
+    global _graph, _last_error
+    try:
+        fingerprint = await _fingerprint()
+        if not force and _graph is not None and _graph.fingerprint == fingerprint:
+            return _graph
+        nodes, edges = await asyncio.gather(
+            execute_arrow_async(NODES_SQL, name="graph_nodes"),
+            execute_arrow_async(EDGES_SQL, name="graph_edges"),
+        )
+        _graph = NetworkGraph(nodes, edges, fingerprint)
+    except Exception as e:
+        _last_error = f"{type(e).__name__}: {e}"
+        return _graph
+    _last_error = None
+    return _graph
+
+async def _refresh_loop(interval_s: float):
+    while True:
+        await asyncio.sleep(interval_s)
+        await load_graph()
+
+def start_graph_refresh(interval_s: float = GRAPH_REFRESH_S):
+    global _refresh_task
+    if interval_s > 0 and _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresh_loop(interval_s))
+
+async def stop_graph_refresh():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+
+def graph_status() -> dict:
+    status = {"loaded": _graph is not None, "refresh_s": GRAPH_REFRESH_S}
+    if _graph is not None:
+        status.update(_graph.status())
+    if _last_error:
+        status["last_error"] = _last_error
+    return status
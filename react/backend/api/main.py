@@ -1,15 +1,31 @@
+import asyncio
 import os
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from routes import assets, predictions, agent, simulation, telemetry
-from database import get_connection, close_connection
+from fastapi.responses import JSONResponse, PlainTextResponse
+from routes import assets, predictions, agent, simulation, telemetry, admin, network, batch
+from database import init_pool, close_pool, get_pool, shutdown_executor, PoolTimeout, QueryTimeout
+from cache import query_cache
+from graph import load_graph, start_graph_refresh, stop_graph_refresh
+from snapshot import load_snapshot, start_refresh, stop_refresh, get_snapshot, snapshot_status, SNAPSHOT_ENABLED
+from metrics import MetricsMiddleware, render
+from conditional import ETagMiddleware
+from compression import CompressionMiddleware
+from deadlines import DeadlineMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    get_connection()
+    init_pool()
+    # Startup waits for the reference snapshot and network graph so the first requests after a deploy are warm
+    await asyncio.gather(load_snapshot(), load_graph())
+    start_refresh()
+    start_graph_refresh()
     yield
-    close_connection()
+    await stop_refresh()
+    await stop_graph_refresh()
+    shutdown_executor()
+    close_pool()
 
 app = FastAPI(
     title="SnowCore Permian Integration API",
@@ -17,20 +33,62 @@ app = FastAPI(
     lifespan=lifespan
 )
 
+# Innermost first: ETags are computed on the identity body, compression runs on the way out
+app.add_middleware(ETagMiddleware)
+app.add_middleware(DeadlineMiddleware)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:5173", "http://127.0.0.1:5173"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Query-Id", "ETag", "X-Next-Cursor"],
 )
 
+@app.exception_handler(QueryTimeout)
+async def query_timeout_handler(request: Request, exc: QueryTimeout):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+@app.exception_handler(PoolTimeout)
+async def pool_timeout_handler(request: Request, exc: PoolTimeout):
+    return JSONResponse(status_code=503, content={"detail": str(exc)})
+
 app.include_router(assets.router, prefix="/api/assets", tags=["assets"])
 app.include_router(predictions.router, prefix="/api/predictions", tags=["predictions"])
 app.include_router(agent.router, prefix="/api/agent", tags=["agent"])
 app.include_router(simulation.router, prefix="/api/simulation", tags=["simulation"])
 app.include_router(telemetry.router, prefix="/api/telemetry", tags=["telemetry"])
+app.include_router(network.router, prefix="/api/network", tags=["network"])
+app.include_router(batch.router, prefix="/api/batch", tags=["batch"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 @app.get("/api/health")
 async def health_check():
-    return {"status": "healthy", "service": "snowcore-permian-api"}
+    status = "degraded" if SNAPSHOT_ENABLED and get_snapshot() is None else "healthy"
+    return {"status": status, "service": "snowcore-permian-api", "snapshot": snapshot_status()}
+
+@app.get("/api/health/pool")
+async def pool_health():
+    return get_pool().stats()
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    pool = get_pool().stats()
+    cache = query_cache.stats()
+    gauges = {
+        "snowcore_pool_open_connections": pool["open"],
+        "snowcore_pool_idle_connections": pool["idle"],
+        "snowcore_pool_in_use_connections": pool["in_use"],
+        "snowcore_pool_waiting_requests": pool["waiting"],
+        "snowcore_cache_entries": cache["entries"],
+    }
+    totals = {
+        "snowcore_pool_checkout_timeouts_total": pool["checkout_timeouts"],
+        "snowcore_cache_hits_total": cache["hits"],
+        "snowcore_cache_misses_total": cache["misses"],
+        "snowcore_cache_coalesced_total": cache["coalesced"],
+    }
+    return PlainTextResponse(render(gauges, totals), media_type="text/plain; version=0.0.4")
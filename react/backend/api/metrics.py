@@ -0,0 +1,225 @@
+import contextvars
+import threading
+import time
+from bisect import bisect_left
+from typing import Optional
+
+LATENCY_BUCKETS_S = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS_S):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{_braces(labels)} {self.sum:.6f}")
+        lines.append(f"{name}_count{_braces(labels)} {self.count}")
+        return lines
+
+class RequestTimings:
+    # Query worker threads of one request (gathered queries, batch sub-requests) update this concurrently
+    def __init__(self, scope: dict):
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.pool_wait_s = 0.0
+        self.query_s = 0.0
+        self.serialize_s = 0.0
+        self.query_count = 0
+        self.query_ids: list[str] = []
+        self.lock = threading.Lock()
+
+    def add_pool_wait(self, seconds: float):
+        with self.lock:
+            self.pool_wait_s += seconds
+
+    def add_query(self, seconds: float, query_id: Optional[str] = None):
+        with self.lock:
+            self.query_s += seconds
+            self.query_count += 1
+            if query_id:
+                self.query_ids.append(query_id)
+
+    def add_serialization(self, seconds: float):
+        with self.lock:
+            self.serialize_s += seconds
+
+    @property
+    def endpoint_name(self) -> Optional[str]:
+        endpoint = self.scope.get("endpoint")
+        return getattr(endpoint, "__name__", None)
+
+_current: contextvars.ContextVar[Optional[RequestTimings]] = contextvars.ContextVar("request_timings", default=None)
+_lock = threading.Lock()
+_histograms: dict[tuple[str, str], Histogram] = {}
+_counters: dict[tuple[str, str], float] = {}
+
+HISTOGRAM_HELP = {
+    "snowcore_request_duration_seconds": "HTTP request wall time by route",
+    "snowcore_query_duration_seconds": "Query execution time by named query",
+    "snowcore_pool_wait_seconds": "Time spent waiting for a pooled connection",
+    "snowcore_serialization_duration_seconds": "Response serialization time by route",
+}
+COUNTER_HELP = {
+    "snowcore_requests_total": "HTTP requests by route and status",
+    "snowcore_response_bytes_total": "Response body bytes by route",
+    "snowcore_query_rows_total": "Rows returned by named query",
+    "snowcore_query_bytes_total": "Arrow bytes returned by named query",
+    "snowcore_query_errors_total": "Failed queries by named query",
+    "snowcore_query_cancellations_total": "Queries cancelled server-side by named query and reason",
+}
+
+def _labels(**labels) -> str:
+    return ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in sorted(labels.items()))
+
+def _braces(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+# Route template (/api/assets/{asset_id}) rebuilt from the matched path params so
+# label cardinality stays bounded whatever router nesting FastAPI uses
+def route_label(scope: dict) -> str:
+    if scope.get("endpoint") is None:
+        # Set by middleware that answers before routing (e.g. a 304 from the ETag index)
+        return scope.get("route_label", "unmatched")
+    params = {str(v): k for k, v in scope.get("path_params", {}).items()}
+    return "/".join(f"{{{params[part]}}}" if part in params else part for part in scope["path"].split("/"))
+
+def observe(name: str, value: float, **labels):
+    key = (name, _labels(**labels))
+    with _lock:
+        histogram = _histograms.get(key)
+        if histogram is None:
+            histogram = _histograms[key] = Histogram()
+        histogram.observe(value)
+
+def increment(name: str, value: float = 1, **labels):
+    key = (name, _labels(**labels))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current.get()
+
+def query_name(name: Optional[str] = None) -> str:
+    if name:
+        return name
+    timings = _current.get()
+    return (timings and timings.endpoint_name) or "unnamed"
+
+def record_pool_wait(seconds: float):
+    observe("snowcore_pool_wait_seconds", seconds)
+    timings = _current.get()
+    if timings is not None:
+        timings.add_pool_wait(seconds)
+
+def record_query(name: str, seconds: float, rows: Optional[int] = None, nbytes: Optional[int] = None,
+                 query_id: Optional[str] = None, error: bool = False):
+    observe("snowcore_query_duration_seconds", seconds, query=name)
+    if error:
+        increment("snowcore_query_errors_total", query=name)
+    if rows is not None:
+        increment("snowcore_query_rows_total", rows, query=name)
+    if nbytes is not None:
+        increment("snowcore_query_bytes_total", nbytes, query=name)
+    timings = _current.get()
+    if timings is not None:
+        timings.add_query(seconds, query_id)
+
+def record_serialization(seconds: float):
+    timings = _current.get()
+    if timings is not None:
+        timings.add_serialization(seconds)
+
+# gauges/totals carry point-in-time readings owned elsewhere (pool, cache)
+def render(gauges: Optional[dict[str, float]] = None, totals: Optional[dict[str, float]] = None) -> str:
+    lines = []
+    with _lock:
+        histograms = sorted(_histograms.items())
+        counters = sorted(_counters.items())
+    seen = set()
+    for (name, labels), histogram in histograms:
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {HISTOGRAM_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} histogram")
+        lines.extend(histogram.render(name, labels))
+    for (name, labels), value in counters:
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# HELP {name} {COUNTER_HELP.get(name, name)}")
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_braces(labels)} {value:g}")
+    for kind, values in (("gauge", gauges), ("counter", totals)):
+        for name, value in (values or {}).items():
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {value:g}")
+    return "\n".join(lines) + "\n"
+
+def server_timing(timings: RequestTimings, total_s: float) -> str:
+    with timings.lock:
+        parts = [
+            f"pool;dur={timings.pool_wait_s * 1000:.1f}",
+            f'db;dur={timings.query_s * 1000:.1f};desc="{timings.query_count} queries"',
+            f"ser;dur={timings.serialize_s * 1000:.1f}",
+            f"total;dur={total_s * 1000:.1f}",
+        ]
+    return ", ".join(parts)
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings(scope)
+        token = _current.set(timings)
+        status = {"code": 500}
+        response_bytes = 0
+
+        async def send_with_timing(message):
+            nonlocal response_bytes
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                headers = list(message.get("headers", []))
+                total_s = time.perf_counter() - timings.started
+                headers.append((b"server-timing", server_timing(timings, total_s).encode()))
+                with timings.lock:
+                    query_ids = list(timings.query_ids)
+                if query_ids:
+                    headers.append((b"x-query-id", ",".join(query_ids).encode()))
+                message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            if scope.get("client_disconnected") and status["code"] == 500:
+                # Client closed the connection before a response was sent
+                status["code"] = 499
+            route_path = route_label(scope)
+            method = scope["method"]
+            elapsed = time.perf_counter() - timings.started
+            observe("snowcore_request_duration_seconds", elapsed, route=route_path, method=method)
+            increment("snowcore_requests_total", route=route_path, method=method, status=status["code"])
+            increment("snowcore_response_bytes_total", response_bytes, route=route_path, method=method)
+            if timings.serialize_s:
+                observe("snowcore_serialization_duration_seconds", timings.serialize_s, route=route_path)
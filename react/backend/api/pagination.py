@@ -0,0 +1,44 @@
+import base64
+from typing import Optional, Sequence
+import orjson
+import pyarrow as pa
+from fastapi import HTTPException, Request, Response
+from database import execute_arrow_async, QUERY_TIMEOUT_S
+from serialization import dumps, table_response
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Cursors are the sort key of the last row returned, base64url-encoded so clients treat them as opaque
+def encode_cursor(values: Sequence) -> str:
+    return base64.urlsafe_b64encode(dumps(list(values))).rstrip(b"=").decode()
+
+def decode_cursor(cursor: Optional[str], types: Sequence[type]) -> Optional[list]:
+    if not cursor:
+        return None
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError
+        return [t(v) for t, v in zip(types, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def _with_cursor(response: Response, last: Optional[list]) -> Response:
+    if last is not None:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last)
+    return response
+
+# Pages are fetched with limit + 1 rows; the extra row only tells us whether another page exists
+def paged_table_response(request: Request, table: pa.Table, limit: int, key_columns: Sequence[str]) -> Response:
+    last = None
+    if table.num_rows > limit:
+        table = table.slice(0, limit)
+        last = [table.column(c)[limit - 1].as_py() for c in key_columns]
+    return _with_cursor(table_response(request, table), last)
+
+async def paged_query_response(
+    request: Request, sql: str, params: tuple, limit: int, key_columns: Sequence[str],
+    timeout: float = QUERY_TIMEOUT_S, cached: bool = False,
+) -> Response:
+    table = await execute_arrow_async(sql, params, timeout=timeout, cached=cached)
+    return paged_table_response(request, table, limit, key_columns)
@@ -0,0 +1,47 @@
+from typing import Any, Iterable, Optional
+
+# Filter values only ever travel as qmark (?) binds, so one logical query maps to one SQL
+# string (one compiled plan, one result-cache entry). Render where_sql() before
+# limit_sql() so params line up with the placeholders.
+class QueryBuilder:
+    def __init__(self):
+        self.conditions: list[str] = []
+        self.params: list[Any] = []
+
+    def where(self, condition: str, *params) -> "QueryBuilder":
+        self.conditions.append(condition)
+        self.params.extend(params)
+        return self
+
+    def eq(self, column: str, value) -> "QueryBuilder":
+        if value is None:
+            return self
+        return self.where(f"{column} = ?", value)
+
+    def gte(self, column: str, value) -> "QueryBuilder":
+        if value is None:
+            return self
+        return self.where(f"{column} >= ?", value)
+
+    def in_(self, column: str, values: Optional[Iterable]) -> "QueryBuilder":
+        if values is None:
+            return self
+        values = canonical_values(values)
+        if not values:
+            return self.where("1 = 0")
+        return self.where(f"{column} IN ({placeholders(len(values))})", *values)
+
+    def where_sql(self, keyword: str = "WHERE") -> str:
+        if not self.conditions:
+            return ""
+        return f"{keyword} " + " AND ".join(self.conditions)
+
+    def limit_sql(self, limit: int) -> str:
+        self.params.append(int(limit))
+        return "LIMIT ?"
+
+def canonical_values(values: Iterable) -> list:
+    return sorted(set(values), key=lambda v: (v is None, str(type(v)), v))
+
+def placeholders(count: int) -> str:
+    return ", ".join(["?"] * count)
@@ -0,0 +1,41 @@
+import asyncio
+import hmac
+import os
+from fastapi import APIRouter, Header, HTTPException
+from pydantic import BaseModel
+from typing import List, Optional
+from cache import query_cache
+from graph import load_graph
+from snapshot import load_snapshot, snapshot_status
+
+router = APIRouter()
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+class InvalidateRequest(BaseModel):
+    tables: Optional[List[str]] = None
+
+def check_admin_token(token: Optional[str]):
+    # Without a configured token the admin routes are off rather than open
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if token is None or not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@router.get("/cache")
+async def cache_stats(x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    return query_cache.stats()
+
+@router.post("/cache/invalidate")
+async def invalidate_cache(request: InvalidateRequest = InvalidateRequest(), x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    removed = query_cache.invalidate(request.tables)
+    # Reference data changed underneath us; rebuild the snapshot instead of waiting for the schedule
+    await asyncio.gather(load_snapshot(), load_graph())
+    return {"removed": removed, "version": query_cache.version, "snapshot": snapshot_status()}
+
+@router.get("/snapshot")
+async def get_snapshot_status(x_admin_token: Optional[str] = Header(None)):
+    check_admin_token(x_admin_token)
+    return snapshot_status()
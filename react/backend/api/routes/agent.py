@@ -4,7 +4,7 @@ from fastapi import APIRouter
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional, AsyncGenerator
-from database import get_connection, execute_query, DATABASE, SCHEMA
+from database import execute_query_async, execute_scalar_async, CORTEX_TIMEOUT_S, DATABASE, SCHEMA
 
 router = APIRouter()
 
@@ -15,7 +15,7 @@ class AgentRequest(BaseModel):
     thread_id: Optional[str] = None
     context: Optional[str] = None
 
-def get_asset_context(asset_id: str) -> dict:
+async def get_asset_context(asset_id: str) -> dict:
     try:
         sql = f"""
         SELECT 
@@ -41,16 +41,16 @@ def get_asset_context(asset_id: str) -> dict:
             FROM {DATABASE}.{SCHEMA}.GRAPH_PREDICTIONS
             WHERE UPPER(prediction_type) = 'NODE_ANOMALY'
         ) gp ON am.asset_id = gp.entity_id
-        WHERE am.asset_id = '{asset_id}'
+        WHERE am.asset_id = ?
         """
-        results = execute_query(sql)
+        results = await execute_query_async(sql, (asset_id,), name="agent_asset_context")
         if results:
             return results[0]
     except Exception:
         pass
     return {}
 
-def search_docs(query: str) -> str:
+async def search_docs(query: str) -> str:
     try:
         sql = f"""
         SELECT 
@@ -63,21 +63,14 @@ def search_docs(query: str) -> str:
                 }}
             ) as results
         """
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(sql)
-        row = cursor.fetchone()
-        cursor.close()
-        if row and row[0]:
-            return str(row[0])[:2000]
+        result = await execute_scalar_async(sql, timeout=CORTEX_TIMEOUT_S, name="cortex_search")
+        if result:
+            return str(result)[:2000]
     except Exception:
         pass
     return ""
 
-def query_analyst_via_sql(question: str) -> dict:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
+async def query_analyst_via_sql(question: str) -> dict:
     try:
         escaped_question = question.replace("'", "''").replace("\\", "\\\\")
         
@@ -88,20 +81,17 @@ def query_analyst_via_sql(question: str) -> dict:
         ) as answer
         """
         
-        cursor.execute(sql)
-        row = cursor.fetchone()
-        cursor.close()
+        answer = await execute_scalar_async(sql, timeout=CORTEX_TIMEOUT_S, name="cortex_analyst")
         
-        if row and row[0]:
-            result = json.loads(row[0]) if isinstance(row[0], str) else row[0]
+        if answer:
+            result = json.loads(answer) if isinstance(answer, str) else answer
             return result
     except Exception as e:
-        cursor.close()
         return {"error": str(e), "fallback": True}
     
     return {"error": "No response", "fallback": True}
 
-def get_contextual_data(question: str) -> str:
+async def get_contextual_data(question: str) -> str:
     question_lower = question.lower()
     
     data_parts = []
@@ -123,7 +113,7 @@ def get_contextual_data(question: str) -> str:
         LIMIT 10
         """
         try:
-            results = execute_query(sql)
+            results = await execute_query_async(sql, name="agent_risk_context")
             if results:
                 data_parts.append("HIGH-RISK ASSETS (from AutoGL anomaly detection):")
                 for r in results:
@@ -144,7 +134,7 @@ def get_contextual_data(question: str) -> str:
         ORDER BY gp.confidence DESC
         """
         try:
-            results = execute_query(sql)
+            results = await execute_query_async(sql, name="agent_link_context")
             if results:
                 data_parts.append("\nDISCOVERED NETWORK LINKS (from AutoGL link prediction):")
                 for r in results:
@@ -172,7 +162,7 @@ def get_contextual_data(question: str) -> str:
         LIMIT 20
         """
         try:
-            results = execute_query(sql)
+            results = await execute_query_async(sql, name="agent_asset_summary")
             if results:
                 data_parts.append("\nASSET INVENTORY:")
                 snowcore = [r for r in results if r.get('source_system') == 'snowcore']
@@ -208,7 +198,7 @@ def get_contextual_data(question: str) -> str:
         LIMIT 10
         """
         try:
-            results = execute_query(sql)
+            results = await execute_query_async(sql, name="agent_telemetry_context")
             if results:
                 data_parts.append("\nOPERATIONAL DATA (Latest SCADA readings):")
                 for r in results:
@@ -218,10 +208,7 @@ def get_contextual_data(question: str) -> str:
     
     return "\n".join(data_parts) if data_parts else ""
 
-def generate_response_with_cortex(question: str, context_data: str, asset_context: str = "") -> str:
-    conn = get_connection()
-    cursor = conn.cursor()
-    
+async def generate_response_with_cortex(question: str, context_data: str, asset_context: str = "") -> str:
     system_prompt = """You are an AI assistant for SnowCore Permian Integration, helping analyze oil & gas pipeline networks.
 
 Context:
@@ -252,13 +239,10 @@ Be concise and data-driven. Reference specific asset IDs and metrics when availa
     """
     
     try:
-        cursor.execute(sql)
-        row = cursor.fetchone()
-        cursor.close()
-        if row and row[0]:
-            return row[0]
+        response = await execute_scalar_async(sql, timeout=CORTEX_TIMEOUT_S, name="cortex_complete")
+        if response:
+            return response
     except Exception as e:
-        cursor.close()
         return f"Error generating response: {str(e)}"
     
     return "I couldn't generate a response. Please try rephrasing your question."
@@ -270,26 +254,26 @@ async def stream_agent_response(message: str, thread_id: Optional[str] = None, c
         asset_context = ""
         if context:
             yield f"data: {json.dumps({'type': 'tool_start', 'tool_name': 'Asset Lookup', 'input': context})}\n\n"
-            asset_data = get_asset_context(context)
+            asset_data = await get_asset_context(context)
             if asset_data:
                 asset_context = json.dumps(asset_data, default=str)
             yield f"data: {json.dumps({'type': 'tool_end', 'tool_name': 'Asset Lookup', 'output': 'Retrieved asset details'})}\n\n"
         
         yield f"data: {json.dumps({'type': 'tool_start', 'tool_name': 'Data Query', 'input': message[:50] + '...'})}\n\n"
-        context_data = get_contextual_data(message)
+        context_data = await get_contextual_data(message)
         yield f"data: {json.dumps({'type': 'tool_end', 'tool_name': 'Data Query', 'output': f'Retrieved {len(context_data)} chars of context'})}\n\n"
         
         keywords = ['maintenance', 'repair', 'history', 'document', 'log', 'report', 'manual', 'procedure']
         if any(kw in message.lower() for kw in keywords):
             yield f"data: {json.dumps({'type': 'tool_start', 'tool_name': 'Document Search', 'input': message[:30] + '...'})}\n\n"
-            doc_results = search_docs(message)
+            doc_results = await search_docs(message)
             if doc_results:
                 context_data += f"\n\nRELEVANT DOCUMENTATION:\n{doc_results}"
             yield f"data: {json.dumps({'type': 'tool_end', 'tool_name': 'Document Search', 'output': 'Searched documents'})}\n\n"
         
         yield f"data: {json.dumps({'type': 'reasoning', 'text': 'Generating response...'})}\n\n"
         
-        response = generate_response_with_cortex(message, context_data, asset_context)
+        response = await generate_response_with_cortex(message, context_data, asset_context)
         
         yield f"data: {json.dumps({'type': 'text_delta', 'text': response})}\n\n"
         yield "data: [DONE]\n\n"
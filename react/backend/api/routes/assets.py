@@ -1,26 +1,43 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 from typing import Optional
-from database import execute_query
+from database import execute_query_async
+from serialization import query_response, table_response
+from pagination import decode_cursor, paged_query_response, paged_table_response
+from query_builder import QueryBuilder
+from snapshot import get_snapshot
+
+ASSET_CURSOR_KEYS = ("risk_score", "asset_id")
 
 router = APIRouter()
 
 @router.get("")
 async def list_assets(
+    request: Request,
     source_system: Optional[str] = Query(None),
     asset_type: Optional[str] = Query(None),
     zone: Optional[str] = Query(None),
     min_risk: Optional[float] = Query(None),
-    limit: int = Query(500, le=2000)
+    limit: int = Query(500, ge=1, le=2000),
+    cursor: Optional[str] = Query(None)
 ):
-    conditions = []
-    if source_system:
-        conditions.append(f"source_system = '{source_system}'")
-    if asset_type:
-        conditions.append(f"asset_type = '{asset_type}'")
-    if zone:
-        conditions.append(f"zone = '{zone}'")
-    
-    where_clause = " AND ".join(conditions) if conditions else "1=1"
+    after = decode_cursor(cursor, (float, str))
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        page = snapshot.assets(source_system or None, asset_type or None, zone or None, min_risk, limit + 1, after)
+        return paged_table_response(request, page, limit, ASSET_CURSOR_KEYS)
+
+    query = (
+        QueryBuilder()
+        .eq("am.source_system", source_system or None)
+        .eq("am.asset_type", asset_type or None)
+        .eq("am.zone", zone or None)
+        .gte("COALESCE(gp.risk_score, 0)", min_risk)
+    )
+    if after is not None:
+        query.where(
+            "(COALESCE(gp.risk_score, 0) < ? OR (COALESCE(gp.risk_score, 0) = ? AND am.asset_id > ?))",
+            after[0], after[0], after[1],
+        )
     
     sql = f"""
     SELECT 
@@ -49,14 +66,18 @@ async def list_assets(
         FROM SCADA_AGGREGATES
         WHERE record_date = (SELECT MAX(record_date) FROM SCADA_AGGREGATES)
     ) sa ON am.asset_id = sa.asset_id
-    WHERE {where_clause}
-    ORDER BY risk_score DESC NULLS LAST
-    LIMIT {limit}
+    {query.where_sql()}
+    ORDER BY risk_score DESC NULLS LAST, am.asset_id
+    {query.limit_sql(limit + 1)}
     """
-    return execute_query(sql)
+    return await paged_query_response(request, sql, tuple(query.params), limit, ASSET_CURSOR_KEYS, cached=True)
 
 @router.get("/{asset_id}")
 async def get_asset(asset_id: str):
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return snapshot.asset(asset_id)
+
     sql = """
     SELECT 
         am.asset_id,
@@ -79,13 +100,17 @@ async def get_asset(asset_id: str):
         WHERE prediction_type = 'anomaly_detection'
         GROUP BY entity_id
     ) gp ON am.asset_id = gp.entity_id
-    WHERE am.asset_id = %s
+    WHERE am.asset_id = ?
     """
-    results = execute_query(sql, (asset_id,))
+    results = await execute_query_async(sql, (asset_id,), cached=True)
     return results[0] if results else None
 
 @router.get("/edges/all")
-async def get_network_edges(include_predictions: bool = Query(True)):
+async def get_network_edges(request: Request, include_predictions: bool = Query(True)):
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return table_response(request, snapshot.edges(include_predictions))
+
     base_sql = """
     SELECT 
         SEGMENT_ID as edge_id,
@@ -117,4 +142,4 @@ async def get_network_edges(include_predictions: bool = Query(True)):
         WHERE UPPER(prediction_type) = 'LINK_PREDICTION' AND confidence > 0.5
         """
     
-    return execute_query(base_sql)
+    return await query_response(request, base_sql, cached=True)
@@ -0,0 +1,100 @@
+import asyncio
+import os
+import time
+from urllib.parse import urlencode, urlsplit
+from fastapi import APIRouter, HTTPException, Request, Response
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+from serialization import ROW_JSON, dumps
+
+router = APIRouter()
+
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "16"))
+BATCH_PATH_PREFIX = "/api/"
+
+class BatchItem(BaseModel):
+    path: str
+    params: Dict[str, Any] = Field(default_factory=dict)
+    id: Optional[str] = None
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem]
+
+def _query_string(query: str, params: Dict[str, Any]) -> bytes:
+    extra = urlencode(
+        [(k, v) for k, value in params.items() if value is not None
+         for v in (value if isinstance(value, (list, tuple)) else [value])]
+    )
+    return "&".join(part for part in (query, extra) if part).encode()
+
+async def _dispatch(request: Request, item: BatchItem) -> bytes:
+    started = time.perf_counter()
+    url = urlsplit(item.path)
+    envelope = {"id": item.id, "path": item.path}
+    if not url.path.startswith(BATCH_PATH_PREFIX) or url.path.rstrip("/") == "/api/batch":
+        envelope.update(status=400, duration_ms=0.0)
+        return dumps(envelope)[:-1] + b',"body":' + dumps({"detail": "Only GET /api/* routes can be batched"}) + b"}"
+
+    # Sub-requests go through the full ASGI app in-process, so they share the pool,
+    # the query cache, the snapshot and the metrics middleware with direct calls
+    headers = [
+        (k, v) for k, v in request.scope["headers"]
+        if k not in (b"accept", b"content-length", b"content-type", b"accept-encoding", b"if-none-match")
+    ]
+    scope = {
+        **{k: v for k, v in request.scope.items() if k in ("type", "asgi", "http_version", "scheme", "server", "client", "root_path", "app", "state")},
+        "method": "GET",
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "query_string": _query_string(url.query, item.params),
+        "headers": headers + [(b"accept", ROW_JSON.encode())],
+    }
+    status = 500
+    response_headers = {}
+    chunks = []
+
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Sub-requests have no connection of their own; they end when the batch request does
+        await asyncio.Future()
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers.update((k.decode().lower(), v.decode()) for k, v in message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # Already answered with a 500 by the app's error middleware; keep the other items
+        pass
+    body = b"".join(chunks)
+    if not response_headers.get("content-type", "").startswith(ROW_JSON):
+        body = dumps(body.decode(errors="replace"))
+    envelope.update(
+        status=status,
+        duration_ms=round((time.perf_counter() - started) * 1000, 2),
+        server_timing=response_headers.get("server-timing"),
+    )
+    if "x-next-cursor" in response_headers:
+        envelope["next_cursor"] = response_headers["x-next-cursor"]
+    # Splice the already-encoded body in rather than decoding and re-encoding it
+    return dumps(envelope)[:-1] + b',"body":' + (body or b"null") + b"}"
+
+@router.post("")
+async def run_batch(request: Request, batch: BatchRequest):
+    if len(batch.requests) > BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"A batch may contain at most {BATCH_MAX_ITEMS} requests")
+    started = time.perf_counter()
+    items = await asyncio.gather(*(_dispatch(request, item) for item in batch.requests))
+    duration_ms = round((time.perf_counter() - started) * 1000, 2)
+    content = b'{"duration_ms":' + dumps(duration_ms) + b',"responses":[' + b",".join(items) + b"]}"
+    return Response(content, media_type=ROW_JSON)
@@ -0,0 +1,88 @@
+from fastapi import APIRouter, HTTPException, Query, Request
+from typing import Optional
+import pyarrow.compute as pc
+from graph import NetworkGraph, get_graph, graph_status
+from serialization import table_response
+
+router = APIRouter()
+
+def require_graph() -> NetworkGraph:
+    graph = get_graph()
+    if graph is None:
+        raise HTTPException(status_code=503, detail="Network graph is not loaded yet")
+    return graph
+
+def require_node(graph: NetworkGraph, asset_id: str) -> int:
+    i = graph.node_id(asset_id)
+    if i is None:
+        raise HTTPException(status_code=404, detail=f"Asset {asset_id} is not in the network")
+    return i
+
+def reachable(graph: NetworkGraph, asset_id: str, direction: str, max_depth: Optional[int], active_only: bool) -> dict:
+    start = require_node(graph, asset_id)
+    depth, parent_edge = graph.traverse(start, direction, max_depth, active_only)
+    found = (depth > 0).nonzero()[0]
+    found = found[depth[found].argsort(kind="stable")]
+    assets = []
+    for i in found.tolist():
+        edge = graph.edges[parent_edge[i]]
+        assets.append({
+            **graph.node_record(i),
+            "depth": int(depth[i]),
+            "via_segment_id": str(edge["segment_id"]),
+        })
+    return {"asset_id": asset_id, "direction": direction, "count": len(assets), "assets": assets}
+
+@router.get("/status")
+async def network_status():
+    return graph_status()
+
+@router.get("/edges")
+async def list_edges(request: Request, active_only: bool = Query(True)):
+    graph = require_graph()
+    table = graph.edge_table
+    if active_only:
+        table = table.filter(pc.equal(pc.utf8_upper(table.column("status")), "ACTIVE"))
+    return table_response(request, table)
+
+@router.get("/nodes/{asset_id}/neighbors")
+async def get_neighbors(asset_id: str, active_only: bool = Query(True)):
+    graph = require_graph()
+    i = require_node(graph, asset_id)
+    return {
+        **graph.node_record(i),
+        "upstream": [
+            {**graph.node_record(j), "segment": graph.edge_record(e)}
+            for j, e in graph.neighbors(i, "upstream", active_only)
+        ],
+        "downstream": [
+            {**graph.node_record(j), "segment": graph.edge_record(e)}
+            for j, e in graph.neighbors(i, "downstream", active_only)
+        ],
+    }
+
+@router.get("/nodes/{asset_id}/downstream")
+async def get_downstream(asset_id: str, max_depth: Optional[int] = Query(None, ge=1), active_only: bool = Query(True)):
+    return reachable(require_graph(), asset_id, "downstream", max_depth, active_only)
+
+@router.get("/nodes/{asset_id}/upstream")
+async def get_upstream(asset_id: str, max_depth: Optional[int] = Query(None, ge=1), active_only: bool = Query(True)):
+    return reachable(require_graph(), asset_id, "upstream", max_depth, active_only)
+
+@router.get("/path")
+async def get_path(source_asset_id: str, target_asset_id: str, active_only: bool = Query(True)):
+    graph = require_graph()
+    source = require_node(graph, source_asset_id)
+    target = require_node(graph, target_asset_id)
+    edges = graph.shortest_path(source, target, active_only)
+    if edges is None:
+        raise HTTPException(status_code=404, detail=f"No path from {source_asset_id} to {target_asset_id}")
+    segments = [graph.edge_record(e) for e in edges]
+    return {
+        "source_asset_id": source_asset_id,
+        "target_asset_id": target_asset_id,
+        "hops": len(edges),
+        "path": graph.path_nodes(source, edges),
+        "total_length_miles": round(float(graph.edges["length_miles"][edges].sum()), 3) if edges else 0.0,
+        "segments": segments,
+    }
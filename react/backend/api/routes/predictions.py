@@ -1,19 +1,43 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Query, Request
 from typing import Optional
-from database import execute_query, get_connection
+from database import execute_query_async, execute_scalar_async, CORTEX_TIMEOUT_S
+from serialization import query_response, table_response
+from pagination import decode_cursor, paged_query_response, paged_table_response
+from query_builder import QueryBuilder
+from snapshot import get_snapshot
+
+PREDICTION_CURSOR_KEYS = ("confidence", "prediction_id")
 
 router = APIRouter()
 
 @router.get("")
 async def list_predictions(
+    request: Request,
     prediction_type: Optional[str] = Query(None),
     min_confidence: float = Query(0.5),
-    limit: int = Query(100, le=500)
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = Query(None)
 ):
-    type_filter = f"AND prediction_type = '{prediction_type}'" if prediction_type else ""
+    after = decode_cursor(cursor, (float, int))
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        page = snapshot.predictions(prediction_type or None, min_confidence, limit + 1, after)
+        return paged_table_response(request, page, limit, PREDICTION_CURSOR_KEYS)
+
+    query = (
+        QueryBuilder()
+        .gte("gp.confidence", min_confidence)
+        .eq("gp.prediction_type", prediction_type or None)
+    )
+    if after is not None:
+        query.where(
+            "(gp.confidence < ? OR (gp.confidence = ? AND gp.prediction_id > ?))",
+            after[0], after[0], after[1],
+        )
     
     sql = f"""
     SELECT 
+        gp.prediction_id,
         gp.entity_id as source_node,
         gp.related_entity_id as target_node,
         gp.prediction_type,
@@ -31,16 +55,19 @@ async def list_predictions(
     FROM GRAPH_PREDICTIONS gp
     LEFT JOIN ASSET_MASTER src ON gp.entity_id = src.asset_id
     LEFT JOIN ASSET_MASTER tgt ON gp.related_entity_id = tgt.asset_id
-    WHERE gp.confidence >= {min_confidence}
-    {type_filter}
-    ORDER BY gp.confidence DESC
-    LIMIT {limit}
+    {query.where_sql()}
+    ORDER BY gp.confidence DESC, gp.prediction_id
+    {query.limit_sql(limit + 1)}
     """
-    return execute_query(sql)
+    return await paged_query_response(request, sql, tuple(query.params), limit, PREDICTION_CURSOR_KEYS, cached=True)
 
 @router.get("/link-discoveries")
-async def get_link_discoveries(min_confidence: float = Query(0.5)):
-    sql = f"""
+async def get_link_discoveries(request: Request, min_confidence: float = Query(0.5)):
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return table_response(request, snapshot.link_discoveries(min_confidence))
+
+    sql = """
     SELECT 
         gp.entity_id as source_node,
         gp.related_entity_id as target_node,
@@ -59,14 +86,18 @@ async def get_link_discoveries(min_confidence: float = Query(0.5)):
     JOIN ASSET_MASTER src ON gp.entity_id = src.asset_id
     JOIN ASSET_MASTER tgt ON gp.related_entity_id = tgt.asset_id
     WHERE UPPER(gp.prediction_type) = 'LINK_PREDICTION'
-      AND gp.confidence >= {min_confidence}
+      AND gp.confidence >= ?
     ORDER BY gp.confidence DESC
     """
-    return execute_query(sql)
+    return await query_response(request, sql, (min_confidence,), cached=True)
 
 @router.get("/anomalies")
-async def get_anomalies(min_risk: float = Query(0.6)):
-    sql = f"""
+async def get_anomalies(request: Request, min_risk: float = Query(0.6)):
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return table_response(request, snapshot.anomalies(min_risk))
+
+    sql = """
     SELECT 
         gp.entity_id as asset_id,
         am.asset_id as asset_name,
@@ -80,10 +111,10 @@ async def get_anomalies(min_risk: float = Query(0.6)):
     FROM GRAPH_PREDICTIONS gp
     JOIN ASSET_MASTER am ON gp.entity_id = am.asset_id
     WHERE UPPER(gp.prediction_type) = 'NODE_ANOMALY'
-      AND gp.score >= {min_risk}
+      AND gp.score >= ?
     ORDER BY gp.score DESC
     """
-    return execute_query(sql)
+    return await query_response(request, sql, (min_risk,), cached=True)
 
 @router.get("/autogl-interpretation")
 async def get_autogl_interpretation():
@@ -102,7 +133,7 @@ async def get_autogl_interpretation():
     ORDER BY gp.confidence DESC
     LIMIT 10
     """
-    links = execute_query(link_sql)
+    links = await execute_query_async(link_sql, cached=True, name="autogl_links")
     
     cross_network = [l for l in links if l.get('source_origin') != l.get('target_origin')]
     same_network = [l for l in links if l.get('source_origin') == l.get('target_origin')]
@@ -125,12 +156,7 @@ Focus on: business value, operational efficiency gains, and risk reduction poten
     sql = f"""SELECT SNOWFLAKE.CORTEX.COMPLETE('claude-3-5-sonnet', '{escaped_prompt}') as interpretation"""
     
     try:
-        conn = get_connection()
-        cursor = conn.cursor()
-        cursor.execute(sql)
-        row = cursor.fetchone()
-        cursor.close()
-        interpretation = row[0] if row else "Analysis unavailable"
+        interpretation = await execute_scalar_async(sql, timeout=CORTEX_TIMEOUT_S, name="cortex_complete") or "Analysis unavailable"
     except Exception as e:
         interpretation = f"Unable to generate interpretation: {str(e)}"
     
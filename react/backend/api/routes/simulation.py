@@ -1,15 +1,57 @@
-from fastapi import APIRouter, HTTPException
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Optional
-from database import execute_query, execute_scalar
+from typing import List, Literal, Optional
+import numpy as np
+from database import execute_query_async
+from query_builder import QueryBuilder
+from graph import get_graph, NetworkGraph, ROUTE_WEIGHTS
+from snapshot import get_snapshot
 
 router = APIRouter()
 
+ROUTE_MAX_K = 50
+
+# Pressure-wave model for the topology cascade: the change decays by exp(-rate * L * (8in / D))
+# per segment and reaches each asset at a fixed speed along the least-attenuated path
+CASCADE_ATTENUATION_PER_MILE = float(os.getenv("CASCADE_ATTENUATION_PER_MILE", "0.016"))
+CASCADE_PROPAGATION_MPH = float(os.getenv("CASCADE_PROPAGATION_MPH", "40"))
+# Changes that have decayed below this are treated as noise, not an affected asset
+CASCADE_MIN_DELTA_PSI = float(os.getenv("CASCADE_MIN_DELTA_PSI", "0.5"))
+DEFAULT_DESIGN_PRESSURE_PSI = 1200.0
+DEFAULT_OPERATING_PRESSURE_PSI = 800.0
+
+LATEST_CONDITIONS_SQL = """
+SELECT asset_id, avg_pressure_psi, avg_flow_rate_bopd
+FROM SCADA_AGGREGATES
+WHERE record_date = (SELECT MAX(record_date) FROM SCADA_AGGREGATES)
+"""
+
+async def operating_conditions(graph: NetworkGraph):
+    # Latest-day average pressure and flow per asset, aligned to the graph's node index
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        table = snapshot.tables["aggregates"]
+        asset_ids = table.column("asset_id").to_pylist()
+        return (
+            graph.node_values(asset_ids, table.column("avg_pressure_psi").to_pylist()),
+            graph.node_values(asset_ids, table.column("avg_flow_rate_bopd").to_pylist()),
+        )
+    rows = await execute_query_async(LATEST_CONDITIONS_SQL, cached=True, name="latest_conditions")
+    asset_ids = [r["asset_id"] for r in rows]
+    return (
+        graph.node_values(asset_ids, [r["avg_pressure_psi"] for r in rows]),
+        graph.node_values(asset_ids, [r["avg_flow_rate_bopd"] for r in rows]),
+    )
+
 class SimulationRequest(BaseModel):
     source_asset_id: str
-    target_asset_ids: List[str]
+    # topology: only these assets are reported; heuristic: the assumed cascade order
+    target_asset_ids: List[str] = []
     pressure_change_psi: float = -50.0
     scenario_name: Optional[str] = "pressure_cascade"
+    mode: Literal["topology", "heuristic"] = "topology"
 
 class SimulationResult(BaseModel):
     scenario_id: str
@@ -18,6 +60,103 @@ class SimulationResult(BaseModel):
     pressure_cascade: List[dict]
     recommended_actions: List[str]
     estimated_impact_mcfd: float
+    mode: str = "heuristic"
+
+def _risk_levels(new_pressure: np.ndarray, design: np.ndarray) -> np.ndarray:
+    # Over the rating is as critical as collapsing below 30% of it
+    return np.select(
+        [
+            (new_pressure >= design) | (new_pressure < design * 0.3),
+            (new_pressure >= design * 0.9) | (new_pressure < design * 0.5),
+            new_pressure < design * 0.7,
+        ],
+        ["critical", "high", "medium"],
+        default="low",
+    )
+
+def _recommended_actions(pressure_cascade: List[dict], horizon_min: float) -> List[str]:
+    high_risk_count = sum(1 for p in pressure_cascade if p['risk_level'] in ['high', 'critical'])
+    recommended_actions = []
+    if high_risk_count > 0:
+        recommended_actions.append(f"Alert: {high_risk_count} assets entering high-risk pressure state")
+    if any(p['risk_level'] == 'critical' for p in pressure_cascade):
+        recommended_actions.append("CRITICAL: Initiate emergency pressure relief protocol")
+        recommended_actions.append("Notify field operations for manual valve inspection")
+    recommended_actions.append(f"Monitor downstream pressure for {round(horizon_min + 30)} minutes")
+    recommended_actions.append("Consider rerouting flow through alternate pipelines if available")
+    return recommended_actions
+
+async def _topology_cascade(request: SimulationRequest, source_asset: dict, graph: NetworkGraph, source: int):
+    reached, friction, miles, hops, parent_edge = await asyncio.to_thread(
+        graph.propagate, source, graph.edge_weights("friction")
+    )
+    downstream = reached != source
+    reached, friction, miles, hops, parent_edge = (
+        a[downstream] for a in (reached, friction, miles, hops, parent_edge)
+    )
+    pressure, flow = await operating_conditions(graph)
+
+    # Every reachable asset is evaluated at once; only the rows worth reporting become dicts
+    delta = request.pressure_change_psi * np.exp(-CASCADE_ATTENUATION_PER_MILE * friction)
+    design = graph.nodes["max_pressure_psi"][reached]
+    design = np.where(np.isnan(design), graph.edges["max_pressure_psi"][parent_edge], design)
+    design = np.nan_to_num(design, nan=DEFAULT_DESIGN_PRESSURE_PSI)
+    current = pressure[reached]
+    current = np.where(np.isnan(current), design * 0.8, current)
+    new_pressure = np.maximum(0.0, current + delta)
+    risk = _risk_levels(new_pressure, design)
+    arrival_min = miles / CASCADE_PROPAGATION_MPH * 60
+
+    report = np.abs(delta) >= CASCADE_MIN_DELTA_PSI
+    if request.target_asset_ids:
+        report &= np.isin(graph.nodes["asset_id"][reached], request.target_asset_ids)
+    order = np.flatnonzero(report)[np.argsort(arrival_min[report], kind="stable")]
+
+    nodes = graph.nodes[reached]
+    pressure_cascade = []
+    affected_assets = []
+    for j in order.tolist():
+        asset_id = str(nodes["asset_id"][j])
+        latitude = None if np.isnan(nodes["latitude"][j]) else float(nodes["latitude"][j])
+        longitude = None if np.isnan(nodes["longitude"][j]) else float(nodes["longitude"][j])
+        pressure_cascade.append({
+            'asset_id': asset_id,
+            'asset_name': asset_id,
+            'time_offset_min': round(float(arrival_min[j]), 1),
+            'pressure_delta': round(float(delta[j]), 1),
+            'new_pressure': round(float(new_pressure[j]), 1),
+            'original_pressure': round(float(current[j]), 1),
+            'design_pressure_psi': float(design[j]),
+            'risk_level': str(risk[j]),
+            'distance_miles': round(float(miles[j]), 2),
+            'hops': int(hops[j]),
+            'via_segment_id': str(graph.edges["segment_id"][parent_edge[j]]),
+            'latitude': latitude,
+            'longitude': longitude,
+        })
+        affected_assets.append({
+            'asset_id': asset_id,
+            'asset_name': asset_id,
+            'asset_type': str(nodes["asset_type"][j]) or None,
+            'latitude': latitude,
+            'longitude': longitude,
+            'design_pressure_psi': float(design[j]),
+            'source_system': str(nodes["source_system"][j]) or None,
+            'current_pressure': float(current[j]),
+            'flow_rate': float(np.nan_to_num(flow[reached[j]])),
+        })
+
+    horizon = float(arrival_min[order].max()) if len(order) else 0.0
+    total_flow = sum(a['flow_rate'] for a in affected_assets)
+    return SimulationResult(
+        scenario_id=f"sim_{request.source_asset_id}_{len(request.target_asset_ids)}",
+        source_asset=source_asset,
+        affected_assets=affected_assets,
+        pressure_cascade=pressure_cascade,
+        recommended_actions=_recommended_actions(pressure_cascade, horizon),
+        estimated_impact_mcfd=round(total_flow * 0.15, 1),
+        mode="topology",
+    )
 
 @router.post("/pressure-cascade")
 async def simulate_pressure_cascade(request: SimulationRequest) -> SimulationResult:
@@ -25,14 +164,20 @@ async def simulate_pressure_cascade(request: SimulationRequest) -> SimulationRes
     SELECT asset_id, asset_id as asset_name, asset_type, latitude, longitude, 
            MAX_PRESSURE_RATING_PSI as design_pressure_psi, source_system
     FROM ASSET_MASTER
-    WHERE asset_id = %s
+    WHERE asset_id = ?
     """
-    source_results = execute_query(source_sql, (request.source_asset_id,))
+    source_results = await execute_query_async(source_sql, (request.source_asset_id,), name="cascade_source")
     if not source_results:
         raise HTTPException(status_code=404, detail="Source asset not found")
     source_asset = source_results[0]
-    
-    target_ids = ",".join([f"'{t}'" for t in request.target_asset_ids])
+
+    graph = get_graph()
+    source = graph.node_id(request.source_asset_id) if graph is not None else None
+    if request.mode == "topology" and source is not None:
+        return await _topology_cascade(request, source_asset, graph, source)
+
+    # Heuristic fallback: assumes the targets form a chain in the order given
+    targets = QueryBuilder().in_("am.asset_id", request.target_asset_ids)
     targets_sql = f"""
     SELECT 
         am.asset_id, 
@@ -51,9 +196,11 @@ async def simulate_pressure_cascade(request: SimulationRequest) -> SimulationRes
         WHERE record_date >= CURRENT_DATE - 7
         GROUP BY asset_id
     ) sa ON am.asset_id = sa.asset_id
-    WHERE am.asset_id IN ({target_ids})
+    {targets.where_sql()}
     """
-    affected_assets = execute_query(targets_sql)
+    affected_assets = await execute_query_async(targets_sql, tuple(targets.params), name="cascade_targets")
+    target_order = {asset_id: i for i, asset_id in enumerate(request.target_asset_ids)}
+    affected_assets.sort(key=lambda a: target_order.get(a['asset_id'], len(target_order)))
     
     pressure_cascade = []
     time_offset = 0
@@ -87,29 +234,48 @@ async def simulate_pressure_cascade(request: SimulationRequest) -> SimulationRes
             'longitude': asset['longitude']
         })
     
-    high_risk_count = sum(1 for p in pressure_cascade if p['risk_level'] in ['high', 'critical'])
     total_flow = sum(a.get('flow_rate') or 0 for a in affected_assets)
     
-    recommended_actions = []
-    if high_risk_count > 0:
-        recommended_actions.append(f"Alert: {high_risk_count} assets entering high-risk pressure state")
-    if any(p['risk_level'] == 'critical' for p in pressure_cascade):
-        recommended_actions.append("CRITICAL: Initiate emergency pressure relief protocol")
-        recommended_actions.append("Notify field operations for manual valve inspection")
-    recommended_actions.append(f"Monitor downstream pressure for {time_offset + 30} minutes")
-    recommended_actions.append("Consider rerouting flow through alternate pipelines if available")
-    
     return SimulationResult(
         scenario_id=f"sim_{request.source_asset_id}_{len(request.target_asset_ids)}",
         source_asset=source_asset,
         affected_assets=affected_assets,
         pressure_cascade=pressure_cascade,
-        recommended_actions=recommended_actions,
+        recommended_actions=_recommended_actions(pressure_cascade, time_offset),
         estimated_impact_mcfd=round(total_flow * 0.15, 1)
     )
 
 @router.get("/routing-options")
-async def get_routing_options(source_asset_id: str, target_asset_id: str):
+async def get_routing_options(
+    source_asset_id: str,
+    target_asset_id: str,
+    k: int = Query(5, ge=1, le=ROUTE_MAX_K),
+    weight: str = Query("length", pattern="^(" + "|".join(ROUTE_WEIGHTS) + ")$"),
+    active_only: bool = Query(False),
+):
+    graph = get_graph()
+    if graph is not None:
+        source, target = graph.node_id(source_asset_id), graph.node_id(target_asset_id)
+        if source is None or target is None:
+            return []
+        pressure = (await operating_conditions(graph))[0] if weight == "headroom" else None
+        weights = graph.edge_weights(weight, pressure)
+        routes = []
+        # Long routes on meshed networks can take a while; keep the search off the event loop
+        paths = await asyncio.to_thread(graph.k_shortest_paths, source, target, k, weights, active_only)
+        for cost, edges in paths:
+            routes.append({
+                "path": graph.path_nodes(source, edges),
+                "depth": len(edges),
+                "weight": weight,
+                "cost": round(cost, 6),
+                "total_length_miles": round(graph.path_length(edges), 3),
+                "segments": [str(s) for s in graph.edges["segment_id"][edges]],
+                "bottleneck": graph.bottleneck(edges),
+            })
+        return routes
+
+    # Without the in-memory graph: bounded recursive search, ordered by hop count only
     sql = """
     WITH RECURSIVE paths AS (
         SELECT 
@@ -118,7 +284,7 @@ async def get_routing_options(source_asset_id: str, target_asset_id: str):
             ARRAY_CONSTRUCT(source_asset_id, target_asset_id) as path,
             1 as depth
         FROM NETWORK_EDGES
-        WHERE source_asset_id = %s
+        WHERE source_asset_id = ?
         
         UNION ALL
         
@@ -134,8 +300,8 @@ async def get_routing_options(source_asset_id: str, target_asset_id: str):
     )
     SELECT path, depth
     FROM paths
-    WHERE current_node = %s
+    WHERE current_node = ?
     ORDER BY depth
     LIMIT 5
     """
-    return execute_query(sql, (source_asset_id, target_asset_id))
+    return await execute_query_async(sql, (source_asset_id, target_asset_id))
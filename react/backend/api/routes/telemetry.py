@@ -1,10 +1,14 @@
-from fastapi import APIRouter, Query
-from database import execute_query
+from fastapi import APIRouter, Query, Request
+from database import execute_query_async
+from serialization import query_response
+from query_builder import QueryBuilder
+from snapshot import get_snapshot
 
 router = APIRouter()
 
 @router.get("")
 async def get_telemetry(
+    request: Request,
     asset_id: str = Query(...),
     hours: int = Query(24, le=168)
 ):
@@ -17,18 +21,19 @@ async def get_telemetry(
         avg_temperature_f as temperature_f,
         gas_oil_ratio
     FROM SCADA_AGGREGATES
-    WHERE asset_id = %s
+    WHERE asset_id = ?
     ORDER BY record_date DESC
     LIMIT 30
     """
-    return execute_query(sql, (asset_id,))
+    return await query_response(request, sql, (asset_id,))
 
 @router.get("/aggregates")
 async def get_aggregates(
+    request: Request,
     asset_id: str = Query(None),
     period: str = Query("daily")
 ):
-    asset_filter = f"AND asset_id = '{asset_id}'" if asset_id else ""
+    query = QueryBuilder().eq("asset_id", asset_id or None)
     
     sql = f"""
     SELECT 
@@ -42,14 +47,18 @@ async def get_aggregates(
         total_production_bbl as total_volume,
         reading_count
     FROM SCADA_AGGREGATES
-    WHERE 1=1 {asset_filter}
+    {query.where_sql()}
     ORDER BY record_date DESC
-    LIMIT 30
+    {query.limit_sql(30)}
     """
-    return execute_query(sql)
+    return await query_response(request, sql, tuple(query.params))
 
 @router.get("/kpis")
 async def get_kpis():
+    snapshot = get_snapshot()
+    if snapshot is not None:
+        return snapshot.kpis()
+
     sql = """
     SELECT 
         COUNT(DISTINCT asset_id) as total_assets,
@@ -59,5 +68,5 @@ async def get_kpis():
     FROM SCADA_AGGREGATES
     WHERE record_date = (SELECT MAX(record_date) FROM SCADA_AGGREGATES)
     """
-    results = execute_query(sql)
+    results = await execute_query_async(sql, cached=True)
     return results[0] if results else {}
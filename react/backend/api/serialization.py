@@ -0,0 +1,137 @@
+import time
+from decimal import Decimal
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+from fastapi import Request, Response
+from database import execute_arrow_async, QUERY_TIMEOUT_S
+from metrics import record_serialization
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+COLUMNAR_JSON = "application/vnd.snowcore.columnar+json"
+ROW_JSON = "application/json"
+
+def negotiate_format(request: Request) -> str:
+    accept = request.headers.get("accept", "")
+    if ARROW_STREAM in accept:
+        return ARROW_STREAM
+    if COLUMNAR_JSON in accept:
+        return COLUMNAR_JSON
+    return ROW_JSON
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+def dumps(content) -> bytes:
+    return orjson.dumps(content, default=_json_default, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def _json_column(column: pa.ChunkedArray):
+    if pa.types.is_decimal(column.type):
+        column = pc.cast(column, pa.float64())
+    if pa.types.is_floating(column.type) or pa.types.is_integer(column.type):
+        if column.null_count == 0:
+            return column.to_numpy()
+    return column.to_pylist()
+
+# Arrow kernels render each column as JSON text, so row-oriented JSON never builds per-row Python objects
+_NEEDS_ESCAPE = r"[\x00-\x1f]"
+
+def _text(value) -> pa.Scalar:
+    return pa.scalar(value, pa.large_string())
+
+def _concat(*parts, separator: str = ""):
+    return pc.binary_join_element_wise(*parts, _text(separator))
+
+def _quoted(column):
+    return _concat(_text('"'), pc.cast(column, pa.large_string()), _text('"'))
+
+def _json_fallback(column: pa.ChunkedArray) -> pa.Array:
+    return pa.array([dumps(value).decode() for value in column.to_pylist()], pa.large_string())
+
+def _json_text(column: pa.ChunkedArray):
+    column_type = column.type
+    if pa.types.is_dictionary(column_type):
+        column, column_type = column.cast(column_type.value_type), column_type.value_type
+    if pa.types.is_decimal(column_type):
+        column, column_type = pc.cast(column, pa.float64()), pa.float64()
+    if pa.types.is_floating(column_type):
+        # NaN and infinity are not JSON; orjson writes them as null too
+        text = pc.if_else(pc.is_finite(column), pc.cast(column, pa.large_string()), _text(None))
+    elif pa.types.is_integer(column_type) or pa.types.is_boolean(column_type):
+        text = pc.cast(column, pa.large_string())
+    elif pa.types.is_string(column_type) or pa.types.is_large_string(column_type):
+        if pc.any(pc.match_substring_regex(column, _NEEDS_ESCAPE)).as_py():
+            return _json_fallback(column)
+        text = _quoted(pc.replace_substring(pc.replace_substring(column, "\\", "\\\\"), '"', '\\"'))
+    elif pa.types.is_date(column_type):
+        text = _quoted(column)
+    elif pa.types.is_timestamp(column_type) and column_type.tz is None:
+        # Same text as orjson for a naive datetime: microseconds only when non-zero
+        micros = pc.cast(column, pa.timestamp("us"), safe=False)
+        seconds = pc.cast(micros, pa.timestamp("s"), safe=False)
+        whole = pc.equal(pc.cast(seconds, pa.timestamp("us")), micros)
+        if pc.all(whole).as_py() is not False:
+            iso = pc.cast(seconds, pa.large_string())
+        else:
+            iso = pc.cast(micros, pa.large_string())
+            if pc.any(whole).as_py():
+                iso = pc.replace_substring_regex(iso, r"\.000000$", "")
+        text = _quoted(pc.replace_substring(iso, " ", "T", max_replacements=1))
+    else:
+        return _json_fallback(column)
+    return pc.fill_null(text, _text("null"))
+
+def row_json(table: pa.Table) -> bytes:
+    if table.num_rows == 0:
+        return b"[]"
+    table = table.combine_chunks()
+    parts = []
+    for i, name in enumerate(table.column_names):
+        parts += [_text(("{" if i == 0 else ",") + dumps(name).decode() + ":"), _json_text(table.column(name))]
+    rows = _concat(*parts, _text("}"))
+    if isinstance(rows, pa.ChunkedArray):
+        rows = rows.combine_chunks()
+    joined = pc.binary_join(pa.LargeListArray.from_arrays(pa.array([0, len(rows)], pa.int64()), rows), _text(","))
+    return b"[" + joined[0].as_buffer().to_pybytes() + b"]"
+
+def _timed_response(encode, media_type: str) -> Response:
+    started = time.perf_counter()
+    body = encode()
+    record_serialization(time.perf_counter() - started)
+    return Response(body, media_type=media_type, headers={"Vary": "Accept"})
+
+def row_json_response(table: pa.Table) -> Response:
+    return _timed_response(lambda: row_json(table), ROW_JSON)
+
+def columnar_response(table: pa.Table) -> Response:
+    def encode():
+        return dumps({
+            "columns": table.column_names,
+            "num_rows": table.num_rows,
+            "data": {name: _json_column(table.column(name)) for name in table.column_names},
+        })
+    return _timed_response(encode, COLUMNAR_JSON)
+
+def arrow_response(table: pa.Table) -> Response:
+    def encode():
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    return _timed_response(encode, ARROW_STREAM)
+
+def table_response(request: Request, table: pa.Table) -> Response:
+    response_format = negotiate_format(request)
+    if response_format == ARROW_STREAM:
+        return arrow_response(table)
+    if response_format == COLUMNAR_JSON:
+        return columnar_response(table)
+    return row_json_response(table)
+
+async def query_response(
+    request: Request, sql: str, params: tuple = None, timeout: float = QUERY_TIMEOUT_S, cached: bool = False,
+    name: str = None,
+) -> Response:
+    return table_response(request, await execute_arrow_async(sql, params, timeout=timeout, cached=cached, name=name))
@@ -0,0 +1,288 @@
+import asyncio
+import os
+import time
+from typing import Optional
+import pyarrow as pa
+import pyarrow.compute as pc
+from database import execute_arrow_async
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "true").lower() not in ("0", "false", "no")
+SNAPSHOT_REFRESH_S = float(os.getenv("SNAPSHOT_REFRESH_S", "300"))
+
+# Reference datasets kept in memory; the column lists match what the routes return
+SNAPSHOT_QUERIES = {
+    "assets": """
+    SELECT
+        am.asset_id,
+        am.asset_id as asset_name,
+        am.asset_type,
+        am.source_system,
+        am.latitude,
+        am.longitude,
+        am.zone as basin,
+        am.zone as field,
+        am.max_pressure_rating_psi as design_pressure,
+        am.manufacturer,
+        am.install_date,
+        COALESCE(gp.risk_score, 0) as risk_score,
+        COALESCE(gp.anomaly_score, 0) as anomaly_score,
+        sa.avg_pressure_psi as current_pressure,
+        sa.avg_flow_rate_bopd as throughput
+    FROM ASSET_MASTER am
+    LEFT JOIN (
+        SELECT entity_id, MAX(score) as risk_score, MAX(confidence) as anomaly_score
+        FROM GRAPH_PREDICTIONS
+        WHERE prediction_type = 'anomaly_detection'
+        GROUP BY entity_id
+    ) gp ON am.asset_id = gp.entity_id
+    LEFT JOIN (
+        SELECT asset_id, avg_pressure_psi, avg_flow_rate_bopd
+        FROM SCADA_AGGREGATES
+        WHERE record_date = (SELECT MAX(record_date) FROM SCADA_AGGREGATES)
+    ) sa ON am.asset_id = sa.asset_id
+    ORDER BY risk_score DESC NULLS LAST, am.asset_id
+    """,
+    "edges": """
+    SELECT
+        SEGMENT_ID as edge_id,
+        SOURCE_ASSET_ID as source_asset_id,
+        TARGET_ASSET_ID as target_asset_id,
+        'pipeline' as edge_type,
+        CASE
+            WHEN SOURCE_ASSET_ID LIKE 'SC-%' THEN 'snowcore'
+            ELSE 'terafield'
+        END as source_system,
+        1.0 as confidence,
+        'existing' as discovery_method
+    FROM NETWORK_EDGES
+    WHERE STATUS = 'ACTIVE'
+    UNION ALL
+    SELECT
+        'pred_' || ROW_NUMBER() OVER (ORDER BY confidence DESC) as edge_id,
+        entity_id as source_asset_id,
+        related_entity_id as target_asset_id,
+        'predicted' as edge_type,
+        'autogl' as source_system,
+        confidence,
+        'autogl_gnn' as discovery_method
+    FROM GRAPH_PREDICTIONS
+    WHERE UPPER(prediction_type) = 'LINK_PREDICTION' AND confidence > 0.5
+    """,
+    "aggregates": """
+    SELECT asset_id, record_date, avg_flow_rate_bopd, avg_pressure_psi, max_pressure_psi
+    FROM SCADA_AGGREGATES
+    WHERE record_date = (SELECT MAX(record_date) FROM SCADA_AGGREGATES)
+    """,
+    "predictions": """
+    SELECT
+        gp.prediction_id,
+        gp.entity_id as source_node,
+        gp.related_entity_id as target_node,
+        gp.prediction_type,
+        gp.confidence,
+        gp.score as risk_score,
+        gp.explanation,
+        src.asset_id as source_asset_name,
+        src.asset_type as source_asset_type,
+        src.source_system as source_origin,
+        src.latitude as source_lat,
+        src.longitude as source_lon,
+        tgt.asset_id as target_asset_name,
+        tgt.asset_type as target_asset_type,
+        tgt.source_system as target_origin,
+        tgt.latitude as target_lat,
+        tgt.longitude as target_lon
+    FROM GRAPH_PREDICTIONS gp
+    LEFT JOIN ASSET_MASTER src ON gp.entity_id = src.asset_id
+    LEFT JOIN ASSET_MASTER tgt ON gp.related_entity_id = tgt.asset_id
+    ORDER BY gp.confidence DESC NULLS LAST, gp.prediction_id
+    """,
+}
+
+ASSET_LIST_COLUMNS = [
+    "asset_id", "asset_name", "asset_type", "source_system", "latitude", "longitude", "basin", "field",
+    "design_pressure", "risk_score", "anomaly_score", "current_pressure", "throughput",
+]
+ASSET_DETAIL_COLUMNS = [
+    "asset_id", "asset_name", "asset_type", "source_system", "latitude", "longitude", "basin", "field",
+    "design_pressure", "manufacturer", "install_date", "risk_score", "anomaly_score",
+]
+PREDICTION_COLUMNS = [
+    "prediction_id", "source_node", "target_node", "prediction_type", "confidence", "risk_score", "explanation",
+    "source_asset_name", "source_asset_type", "source_lat", "source_lon",
+    "target_asset_name", "target_asset_type", "target_lat", "target_lon",
+]
+LINK_COLUMNS = {
+    "source_node": "source_node", "target_node": "target_node", "confidence": "confidence",
+    "risk_score": "risk_score", "explanation": "explanation",
+    "source_asset_name": "source_name", "source_origin": "source_origin",
+    "source_lat": "source_lat", "source_lon": "source_lon",
+    "target_asset_name": "target_name", "target_origin": "target_origin",
+    "target_lat": "target_lat", "target_lon": "target_lon",
+}
+ANOMALY_COLUMNS = {
+    "source_node": "asset_id", "source_asset_name": "asset_name", "source_asset_type": "asset_type",
+    "source_origin": "source_system", "source_lat": "latitude", "source_lon": "longitude",
+    "risk_score": "risk_score", "confidence": "anomaly_score", "explanation": "explanation",
+}
+
+def _filter(table: pa.Table, *masks) -> pa.Table:
+    masks = [m for m in masks if m is not None]
+    if not masks:
+        return table
+    mask = masks[0]
+    for m in masks[1:]:
+        mask = pc.and_(mask, m)
+    return table.filter(mask)
+
+def _eq(table: pa.Table, column: str, value):
+    return None if value is None else pc.equal(table.column(column), value)
+
+def _gte(table: pa.Table, column: str, value):
+    return None if value is None else pc.greater_equal(table.column(column), value)
+
+# Rows strictly after (sort_value, tiebreak) in "sort_column DESC, tiebreak ASC" order
+def _after(table: pa.Table, sort_column: str, tiebreak_column: str, after: Optional[list]):
+    if after is None:
+        return None
+    sort_value, tiebreak = after
+    column = table.column(sort_column)
+    return pc.or_(
+        pc.less(column, sort_value),
+        pc.and_(pc.equal(column, sort_value), pc.greater(table.column(tiebreak_column), tiebreak)),
+    )
+
+def _project(table: pa.Table, columns: dict) -> pa.Table:
+    return table.select(list(columns)).rename_columns(list(columns.values()))
+
+class ReferenceSnapshot:
+    def __init__(self, tables: dict[str, pa.Table], load_ms: float):
+        self.tables = tables
+        self.loaded_at = time.time()
+        self.load_ms = load_ms
+        assets = tables["assets"]
+        self._asset_index = {asset_id: i for i, asset_id in enumerate(assets.column("asset_id").to_pylist())}
+        prediction_types = pc.utf8_upper(tables["predictions"].column("prediction_type"))
+        self._links = tables["predictions"].filter(pc.equal(prediction_types, "LINK_PREDICTION"))
+        self._anomalies = tables["predictions"].filter(pc.equal(prediction_types, "NODE_ANOMALY"))
+
+    def assets(self, source_system=None, asset_type=None, zone=None, min_risk=None, limit: int = 500,
+               after: Optional[list] = None) -> pa.Table:
+        table = self.tables["assets"]
+        table = _filter(
+            table,
+            _eq(table, "source_system", source_system),
+            _eq(table, "asset_type", asset_type),
+            _eq(table, "basin", zone),
+            _gte(table, "risk_score", min_risk),
+            _after(table, "risk_score", "asset_id", after),
+        )
+        return table.select(ASSET_LIST_COLUMNS).slice(0, limit)
+
+    def asset(self, asset_id: str) -> Optional[dict]:
+        i = self._asset_index.get(asset_id)
+        if i is None:
+            return None
+        return self.tables["assets"].select(ASSET_DETAIL_COLUMNS).slice(i, 1).to_pylist()[0]
+
+    def edges(self, include_predictions: bool = True) -> pa.Table:
+        table = self.tables["edges"]
+        if include_predictions:
+            return table
+        return table.filter(pc.equal(table.column("discovery_method"), "existing"))
+
+    def predictions(self, prediction_type=None, min_confidence=None, limit: int = 100,
+                    after: Optional[list] = None) -> pa.Table:
+        table = self.tables["predictions"]
+        table = _filter(
+            table,
+            _gte(table, "confidence", min_confidence),
+            _eq(table, "prediction_type", prediction_type),
+            _after(table, "confidence", "prediction_id", after),
+        )
+        return table.select(PREDICTION_COLUMNS).slice(0, limit)
+
+    def link_discoveries(self, min_confidence: float) -> pa.Table:
+        table = self._links
+        table = _filter(
+            table,
+            _gte(table, "confidence", min_confidence),
+            pc.is_valid(table.column("source_asset_name")),
+            pc.is_valid(table.column("target_asset_name")),
+        )
+        return _project(table, LINK_COLUMNS)
+
+    def anomalies(self, min_risk: float) -> pa.Table:
+        table = self._anomalies
+        table = _filter(table, _gte(table, "risk_score", min_risk), pc.is_valid(table.column("source_asset_name")))
+        return _project(table, ANOMALY_COLUMNS).sort_by([("risk_score", "descending")])
+
+    def kpis(self) -> dict:
+        table = self.tables["aggregates"]
+        return {
+            "total_assets": pc.count_distinct(table.column("asset_id")).as_py(),
+            "total_throughput": pc.sum(table.column("avg_flow_rate_bopd")).as_py(),
+            "avg_network_pressure": pc.mean(table.column("avg_pressure_psi")).as_py(),
+            "high_pressure_events": pc.sum(pc.greater(table.column("max_pressure_psi"), 1200)).as_py() or 0,
+        }
+
+    def status(self) -> dict:
+        return {
+            "loaded_at": self.loaded_at,
+            "age_s": round(time.time() - self.loaded_at, 1),
+            "load_ms": round(self.load_ms, 1),
+            "rows": {name: table.num_rows for name, table in self.tables.items()},
+        }
+
+_snapshot: Optional[ReferenceSnapshot] = None
+_refresh_task: Optional[asyncio.Task] = None
+_last_error: Optional[str] = None
+
+def get_snapshot() -> Optional[ReferenceSnapshot]:
+    return _snapshot if SNAPSHOT_ENABLED else None
+
+async def load_snapshot() -> Optional[ReferenceSnapshot]:
+    global _snapshot, _last_error
+    if not SNAPSHOT_ENABLED:
+        return None
+    started = time.perf_counter()
+    names = list(SNAPSHOT_QUERIES)
+    try:
+        tables = await asyncio.gather(
+            *(execute_arrow_async(SNAPSHOT_QUERIES[name], name=f"snapshot_{name}") for name in names)
+        )
+    except Exception as e:
+        # Keep serving the previous snapshot (or fall back to live queries) until a load succeeds
+        _last_error = f"{type(e).__name__}: {e}"
+        return _snapshot
+    _snapshot = ReferenceSnapshot(dict(zip(names, tables)), (time.perf_counter() - started) * 1000)
+    _last_error = None
+    return _snapshot
+
+async def _refresh_loop(interval_s: float):
+    while True:
+        await asyncio.sleep(interval_s)
+        await load_snapshot()
+
+def start_refresh(interval_s: float = SNAPSHOT_REFRESH_S):
+    global _refresh_task
+    if SNAPSHOT_ENABLED and interval_s > 0 and _refresh_task is None:
+        _refresh_task = asyncio.create_task(_refresh_loop(interval_s))
+
+async def stop_refresh():
+    global _refresh_task
+    if _refresh_task is not None:
+        _refresh_task.cancel()
+        try:
+            await _refresh_task
+        except asyncio.CancelledError:
+            pass
+        _refresh_task = None
+
+def snapshot_status() -> dict:
+    status = {"enabled": SNAPSHOT_ENABLED, "loaded": _snapshot is not None, "refresh_s": SNAPSHOT_REFRESH_S}
+    if _snapshot is not None:
+        status.update(_snapshot.status())
+    if _last_error:
+        status["last_error"] = _last_error
+    return status
@@ -0,0 +1,21 @@
+import type { BatchResponse } from '@/types'
+
+// Fetches several GET endpoints in one round trip via /api/batch.
+// Resolves to the response bodies in the order the paths were given.
+export async function fetchBatch(paths: string[]): Promise<any[]> {
+  const response = await fetch('/api/batch', {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ requests: paths.map((path) => ({ path })) }),
+  })
+  if (!response.ok) {
+    throw new Error(`Batch request failed: ${response.status}`)
+  }
+  const data: BatchResponse = await response.json()
+  return data.responses.map((item) => {
+    if (item.status >= 400) {
+      throw new Error(`${item.path} failed: ${item.status}`)
+    }
+    return item.body
+  })
+}
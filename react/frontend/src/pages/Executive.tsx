@@ -10,6 +10,7 @@ import {
   Tooltip, ResponsiveContainer, PieChart as RPieChart, Pie, Cell
 } from 'recharts'
 import { useAppStore } from '@/stores/appStore'
+import { fetchBatch } from '@/lib/api'
 
 interface KPI {
   id: string
@@ -34,13 +35,7 @@ export default function ExecutivePage() {
   useEffect(() => {
     async function fetchData() {
       try {
-        const [assetsRes, kpiRes] = await Promise.all([
-          fetch('/api/assets'),
-          fetch('/api/telemetry/kpis'),
-        ])
-        
-        const assets = await assetsRes.json()
-        const kpiData = await kpiRes.json()
+        const [assets, kpiData] = await fetchBatch(['/api/assets', '/api/telemetry/kpis'])
 
         const snowcoreAssets = assets.filter((a: any) => a.source_system?.toUpperCase() === 'SNOWCORE').length
         const terafieldAssets = assets.filter((a: any) => a.source_system?.toUpperCase() === 'TERAFIELD').length
@@ -9,6 +9,7 @@ import {
 } from 'lucide-react'
 import { useAppStore } from '@/stores/appStore'
 import type { Asset, NetworkEdge, GraphPrediction } from '@/types'
+import { fetchBatch } from '@/lib/api'
 import 'maplibre-gl/dist/maplibre-gl.css'
 
 interface AutoGLInterpretation {
@@ -58,15 +59,14 @@ export default function NetworkDiscoveryPage() {
   useEffect(() => {
     async function fetchData() {
       try {
-        const [assetsRes, edgesRes, predsRes] = await Promise.all([
-          fetch('/api/assets'),
-          fetch('/api/assets/edges/all'),
-          fetch('/api/predictions/link-discoveries'),
+        const [assetsData, edgesData, predsData] = await fetchBatch([
+          '/api/assets',
+          '/api/assets/edges/all',
+          '/api/predictions/link-discoveries',
         ])
-        const assetsData = await assetsRes.json()
         setAssets(assetsData)
-        setEdges(await edgesRes.json())
-        setPredictions(await predsRes.json())
+        setEdges(edgesData)
+        setPredictions(predsData)
         setViewState(getInitialViewState(assetsData))
       } catch (e) {
         console.error('Failed to fetch data:', e)
@@ -9,6 +9,7 @@ import {
 } from 'lucide-react'
 import { useAppStore } from '@/stores/appStore'
 import type { Asset } from '@/types'
+import { fetchBatch } from '@/lib/api'
 import 'maplibre-gl/dist/maplibre-gl.css'
 
 const PERMIAN_CENTER = { latitude: 31.85, longitude: -103.5, zoom: 8 }
@@ -50,13 +51,7 @@ export default function OperationsPage() {
   useEffect(() => {
     async function fetchData() {
       try {
-        const [assetsRes, anomaliesRes] = await Promise.all([
-          fetch('/api/assets'),
-          fetch('/api/predictions/anomalies?min_risk=0.5'),
-        ])
-        
-        const assetsData = await assetsRes.json()
-        const anomalies = await anomaliesRes.json()
+        const [assetsData, anomalies] = await fetchBatch(['/api/assets', '/api/predictions/anomalies?min_risk=0.5'])
         
         setAssets(assetsData)
         
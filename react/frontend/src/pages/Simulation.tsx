@@ -9,6 +9,7 @@ import {
 } from 'lucide-react'
 import { useAppStore } from '@/stores/appStore'
 import type { Asset, SimulationResult, NetworkEdge } from '@/types'
+import { fetchBatch } from '@/lib/api'
 import 'maplibre-gl/dist/maplibre-gl.css'
 
 const getInitialViewState = (assets: {latitude: number, longitude: number}[]) => {
@@ -50,10 +51,7 @@ export default function SimulationPage() {
   const { setChatOpen, setPendingPrompt } = useAppStore()
 
   useEffect(() => {
-    Promise.all([
-      fetch('/api/assets').then(r => r.json()),
-      fetch('/api/assets/edges/all').then(r => r.json())
-    ]).then(([assetsData, edgesData]) => {
+    fetchBatch(['/api/assets', '/api/assets/edges/all']).then(([assetsData, edgesData]) => {
       setAssets(assetsData)
       setEdges(edgesData)
       setViewState(getInitialViewState(assetsData))
@@ -66,9 +66,14 @@ export interface SimulationResult {
     risk_level: RiskLevel
     latitude: number
     longitude: number
+    design_pressure_psi?: number
+    distance_miles?: number
+    hops?: number
+    via_segment_id?: string
   }[]
   recommended_actions: string[]
   estimated_impact_mcfd: number
+  mode?: 'topology' | 'heuristic'
 }
 
 export interface CortexMessage {
@@ -106,3 +111,17 @@ export interface KPIMetric {
   trend: 'up' | 'down' | 'stable'
   target?: number
 }
+
+export interface BatchItemResult<T = any> {
+  id: string | null
+  path: string
+  status: number
+  duration_ms: number
+  server_timing?: string | null
+  body: T
+}
+
+export interface BatchResponse {
+  duration_ms: number
+  responses: BatchItemResult[]
+}
@@ -23,6 +23,12 @@ CREATE OR REPLACE FILE FORMAT CSV_FORMAT
     EMPTY_FIELD_AS_NULL = TRUE
     COMMENT = 'Standard CSV format for demo data loading';
 
+-- Columnar telemetry (utils/generate_synthetic_data.py --format parquet)
+CREATE OR REPLACE FILE FORMAT PARQUET_FORMAT
+    TYPE = 'PARQUET'
+    COMPRESSION = AUTO
+    COMMENT = 'Date-partitioned, zstd-compressed Parquet telemetry';
+
 -- ============================================================================
 -- ASSET_MASTER - Equipment Registry
 -- ============================================================================
@@ -168,6 +174,24 @@ FROM @DATA_STAGE/scada_telemetry.csv
 FILE_FORMAT = CSV_FORMAT
 ON_ERROR = 'CONTINUE';
 
+-- Parquet alternative: upload data/synthetic/scada_telemetry/ (date=YYYY-MM-DD/*.parquet)
+-- and load all files in parallel with typed columns instead of the CSV above:
+-- COPY INTO SCADA_TELEMETRY
+-- FROM @DATA_STAGE/scada_telemetry/
+-- FILE_FORMAT = PARQUET_FORMAT
+-- MATCH_BY_COLUMN_NAME = CASE_INSENSITIVE
+-- PATTERN = '.*[.]parquet'
+-- ON_ERROR = 'CONTINUE';
+
+-- Bulk alternative: upload data/synthetic/bulk/ (--split-size-mb, equal-sized
+-- .csv.gz / .csv.zst files, compression detected automatically) and load each
+-- table's files in parallel; compare row counts with bulk/manifest.json:
+-- COPY INTO SCADA_TELEMETRY
+-- FROM @DATA_STAGE/bulk/scada_telemetry/
+-- FILE_FORMAT = CSV_FORMAT
+-- PATTERN = '.*[.]csv[.](gz|zst)'
+-- ON_ERROR = 'CONTINUE';
+
 -- Load Graph Predictions
 COPY INTO GRAPH_PREDICTIONS (
     PREDICTION_TYPE, ENTITY_ID, RELATED_ENTITY_ID, 
@@ -180,6 +204,14 @@ ON_ERROR = 'CONTINUE';
 -- ============================================================================
 -- Populate Aggregates Table
 -- ============================================================================
+-- utils/generate_synthetic_data.py also writes scada_aggregates.csv with these
+-- exact columns, computed in a single pass while generating telemetry (with
+-- either engine; NumPy must be installed). To skip
+-- the second scan of SCADA_TELEMETRY, load it instead of the INSERT below:
+-- COPY INTO SCADA_AGGREGATES
+-- FROM @DATA_STAGE/scada_aggregates.csv
+-- FILE_FORMAT = CSV_FORMAT
+-- ON_ERROR = 'CONTINUE';
 
 INSERT INTO SCADA_AGGREGATES
 SELECT 
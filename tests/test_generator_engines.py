@@ -0,0 +1,43 @@
+"""The NumPy and reference telemetry engines must agree statistically."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("numpy")
+sys.path.insert(0, str(Path(__file__).parent.parent / "utils"))
+
+import generate_synthetic_data as gen  # noqa: E402
+
+# One asset of each kind, plus the two carrying the injected pressure anomaly
+CHECK_ASSETS = {"SC-PAD-42", "SC-PAD-43", "TF-V-204"}
+
+
+@pytest.fixture(scope="module")
+def assets():
+    all_assets = gen.generate_asset_master()
+    picked = [a for a in all_assets if a["ASSET_ID"] in CHECK_ASSETS]
+    picked_types = {a["ASSET_TYPE"] for a in picked}
+    for asset in all_assets:
+        if asset["ASSET_TYPE"] not in picked_types:
+            picked.append(asset)
+            picked_types.add(asset["ASSET_TYPE"])
+    return picked
+
+
+def test_engines_agree(assets):
+    assert gen.compare_engines(assets) == []
+
+
+def test_compare_engines_catches_a_drifted_engine(assets, monkeypatch):
+    build = gen.build_telemetry_model
+
+    def drifted(*args, **kwargs):
+        model = build(*args, **kwargs)
+        model["arrays"]["base_flow"] = model["arrays"]["base_flow"] * 1.05
+        return model
+
+    monkeypatch.setattr(gen, "build_telemetry_model", drifted)
+    failures = gen.compare_engines(assets)
+    assert {statistic for _, statistic, _, _ in failures} >= {"FLOW_RATE_BOPD mean"}
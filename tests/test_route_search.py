@@ -0,0 +1,83 @@
+"""Yen's k-shortest-paths on a gathering network of ~50k segments."""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pa = pytest.importorskip("pyarrow")
+pytest.importorskip("fastapi")
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "utils"))
+sys.path.insert(0, str(ROOT / "react" / "backend" / "api"))
+
+import generate_synthetic_data as gen  # noqa: E402
+from graph import NetworkGraph  # noqa: E402
+
+NODE_COLUMNS = ["ASSET_ID", "SOURCE_SYSTEM", "ASSET_TYPE", "ZONE", "LATITUDE", "LONGITUDE", "MAX_PRESSURE_RATING_PSI"]
+EDGE_COLUMNS = [
+    "SEGMENT_ID", "SOURCE_ASSET_ID", "TARGET_ASSET_ID", "LINE_DIAMETER_INCHES",
+    "MAX_PRESSURE_RATING_PSI", "STATUS", "LENGTH_MILES",
+]
+# Route search is per request; it has to stay in milliseconds at this size
+MEDIAN_BUDGET_S = 0.05
+
+
+def _table(records, columns):
+    return pa.table({c.lower(): [r[c] for r in records] for c in columns})
+
+
+@pytest.fixture(scope="module")
+def graph():
+    assets, edges = gen.generate_large_topology(
+        n_pads=40000, n_separators=8000, n_compressors=1600, n_hubs=80, n_cross_links=4000,
+    )
+    return NetworkGraph(_table(assets, NODE_COLUMNS), _table(edges, EDGE_COLUMNS))
+
+
+@pytest.fixture(scope="module")
+def pairs(graph):
+    # Well pads paired with a processing facility downstream of each
+    hubs = np.flatnonzero(graph.nodes["asset_type"] == "PROCESSING_FACILITY")
+    pads = np.flatnonzero(graph.nodes["asset_type"] == "WELL_PAD")
+    pairs = []
+    for source in np.random.default_rng(7).choice(pads, 200, replace=False).tolist():
+        depth, _ = graph.traverse(source, "downstream", active_only=False)
+        reachable = hubs[depth[hubs] >= 0]
+        if len(reachable):
+            pairs.append((source, int(reachable[-1])))
+        if len(pairs) == 20:
+            break
+    return pairs
+
+
+def test_graph_size(graph):
+    assert graph.edge_count >= 50000
+
+
+def test_paths_are_ordered_loopless_and_start_with_the_shortest(graph, pairs):
+    weights = graph.edge_weights("length")
+    for source, target in pairs:
+        routes = graph.k_shortest_paths(source, target, 5, weights, active_only=False)
+        reached, cost, *_ = graph.propagate(source, weights, active_only=False)
+        assert routes[0][0] == pytest.approx(cost[np.flatnonzero(reached == target)[0]])
+        costs = [c for c, _ in routes]
+        assert costs == sorted(costs)
+        assert len({tuple(edges) for _, edges in routes}) == len(routes)
+        for c, edges in routes:
+            nodes = graph.path_nodes(source, edges)
+            assert len(set(nodes)) == len(nodes)
+            assert c == pytest.approx(float(weights[edges].sum()))
+
+
+def test_route_search_is_fast(graph, pairs):
+    weights = graph.edge_weights("length")
+    graph.k_shortest_paths(*pairs[0], 5, weights, active_only=False)
+    timings = []
+    for source, target in pairs:
+        started = time.perf_counter()
+        graph.k_shortest_paths(source, target, 5, weights, active_only=False)
+        timings.append(time.perf_counter() - started)
+    assert np.median(timings) < MEDIAN_BUDGET_S, f"median {np.median(timings) * 1000:.1f} ms"
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+benchmark_generator.py - Performance Benchmarks for generate_synthetic_data.py
+
+Runs the synthetic data generator across a matrix of asset counts, durations,
+reading intervals and output formats. Each case runs in its own subprocess
+writing to a scratch directory, and records:
+- telemetry rows and rows/sec (wall clock, whole generator run)
+- peak RSS of the generator process (largest single process for --shards)
+- bytes written for telemetry and aggregates in that format
+
+Results are written as JSON so runs can be diffed when the telemetry engine
+or writers change. The reference engine only supports the generator's default
+7-day range at 60 s written as CSV; other cases are skipped for it.
+
+Usage:
+    python utils/benchmark_generator.py
+    python utils/benchmark_generator.py --assets 18 1000 10000 --days 1 7 \\
+        --interval-seconds 60 10 --formats csv parquet arrow
+
+Output:
+    data/benchmarks/generator_benchmark.json (or --output)
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).parent.parent
+GENERATOR = Path(__file__).parent / "generate_synthetic_data.py"
+DEFAULT_OUTPUT = REPO_ROOT / "data" / "benchmarks" / "generator_benchmark.json"
+
+BENCHMARK_START = datetime(2024, 1, 1, 0, 0, 0)
+DEMO_ASSET_COUNT = 18
+# The generator's built-in range, the only one the reference engine accepts
+REFERENCE_DAYS = 7
+REFERENCE_INTERVAL_SECONDS = 60
+
+
+def topology_args(n_assets):
+    """Generator options producing roughly `n_assets` assets."""
+    if n_assets <= DEMO_ASSET_COUNT:
+        return ["--topology", "demo"]
+    extra = n_assets - DEMO_ASSET_COUNT
+    hubs = max(1, extra // 500)
+    compressors = max(1, extra // 25)
+    separators = max(1, extra // 5)
+    pads = max(1, extra - hubs - compressors - separators)
+    return [
+        "--topology", "parametric",
+        "--hubs", str(hubs),
+        "--compressors", str(compressors),
+        "--separators", str(separators),
+        "--pads", str(pads),
+        "--cross-links", str(extra // 20),
+    ]
+
+
+def directory_bytes(path):
+    """Total size of a file, or of all files under a directory."""
+    if path.is_file():
+        return path.stat().st_size
+    if path.is_dir():
+        return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+    return 0
+
+
+def supports_case(engine, days, interval_seconds, output_format):
+    """Whether the generator accepts this case for `engine`."""
+    if engine != "reference":
+        return True
+    return (days, interval_seconds, output_format) == (REFERENCE_DAYS, REFERENCE_INTERVAL_SECONDS, "csv")
+
+
+def run_case(n_assets, days, interval_seconds, output_format, engine, extra_args):
+    """Run one generator case in a subprocess and return its measurements."""
+    end = BENCHMARK_START + timedelta(days=days) - timedelta(seconds=interval_seconds)
+    with tempfile.TemporaryDirectory(prefix="generator_bench_") as output_dir:
+        command = [sys.executable, str(GENERATOR), "--output-dir", output_dir, "--engine", engine]
+        if engine != "reference":
+            # The reference engine rejects these; it always writes the default range as CSV
+            command += [
+                "--format", output_format,
+                "--start", BENCHMARK_START.isoformat(),
+                "--end", end.isoformat(),
+                "--interval-seconds", str(interval_seconds),
+            ]
+        command += [*topology_args(n_assets), *extra_args]
+        # Capture output in files (not pipes) so wait4() cannot deadlock on a full pipe
+        with tempfile.TemporaryFile("w+") as stdout_file, tempfile.TemporaryFile("w+") as stderr_file:
+            started = time.perf_counter()
+            process = subprocess.Popen(command, stdout=stdout_file, stderr=stderr_file, text=True)
+            _, status, rusage = os.wait4(process.pid, 0)
+            elapsed = time.perf_counter() - started
+            process.returncode = os.waitstatus_to_exitcode(status)
+            stdout_file.seek(0)
+            stderr_file.seek(0)
+            stdout, stderr = stdout_file.read(), stderr_file.read()
+
+        result = {
+            "assets": n_assets,
+            "days": days,
+            "interval_seconds": interval_seconds,
+            "format": output_format,
+            "engine": engine,
+            "wall_seconds": round(elapsed, 3),
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            "peak_rss_bytes": rusage.ru_maxrss * (1 if sys.platform == "darwin" else 1024),
+            "exit_code": process.returncode,
+        }
+        if process.returncode != 0:
+            result["error"] = stderr.strip().splitlines()[-1] if stderr.strip() else "failed"
+            return result
+
+        rows = re.search(r"Telemetry records: (\d+)", stdout)
+        telemetry_rows = int(rows.group(1)) if rows else None
+        output = Path(output_dir)
+        result.update({
+            "telemetry_rows": telemetry_rows,
+            "rows_per_sec": round(telemetry_rows / elapsed, 1) if telemetry_rows else None,
+            # Single file, or the directory used by --shards / parquet / arrow
+            "telemetry_bytes": sum(
+                directory_bytes(output / name) for name in ("scada_telemetry.csv", "scada_telemetry")
+            ),
+            "aggregates_bytes": sum(
+                directory_bytes(output / name) for name in ("scada_aggregates.csv", "scada_aggregates")
+            ),
+        })
+        return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the synthetic data generator")
+    parser.add_argument("--assets", type=int, nargs="+", default=[18, 1000])
+    parser.add_argument("--days", type=float, nargs="+", default=[1, 7])
+    parser.add_argument("--interval-seconds", type=int, nargs="+", default=[60])
+    parser.add_argument("--formats", nargs="+", choices=["csv", "parquet", "arrow"], default=["csv", "parquet"])
+    parser.add_argument("--engine", choices=["numpy", "reference"], default="numpy")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT)
+    parser.add_argument(
+        "generator_args", nargs=argparse.REMAINDER,
+        help="Extra generator options after --, e.g. -- --shards 8 --workers 4",
+    )
+    args = parser.parse_args(argv)
+    extra_args = [a for a in args.generator_args if a != "--"]
+
+    results = []
+    skipped = 0
+    matrix = list(itertools.product(args.assets, args.days, args.interval_seconds, args.formats))
+    for i, (n_assets, days, interval_seconds, output_format) in enumerate(matrix, 1):
+        print(
+            f"[{i}/{len(matrix)}] assets={n_assets} days={days:g} "
+            f"interval={interval_seconds}s format={output_format}...",
+            flush=True,
+        )
+        if not supports_case(args.engine, days, interval_seconds, output_format):
+            print(
+                f"    skipped: the reference engine only runs {REFERENCE_DAYS} days "
+                f"at {REFERENCE_INTERVAL_SECONDS}s to csv"
+            )
+            skipped += 1
+            continue
+        result = run_case(n_assets, days, interval_seconds, output_format, args.engine, extra_args)
+        results.append(result)
+        if result["exit_code"] != 0:
+            print(f"    FAILED: {result['error']}")
+        else:
+            print(
+                f"    {result['telemetry_rows']:,} rows in {result['wall_seconds']:.1f}s "
+                f"({result['rows_per_sec']:,.0f} rows/s), peak RSS "
+                f"{result['peak_rss_bytes'] / 2**20:,.0f} MiB, "
+                f"{result['telemetry_bytes'] / 2**20:,.1f} MiB written"
+            )
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "generator_args": extra_args,
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {args.output}" + (f" ({skipped} cases skipped)" if skipped else ""))
+    if any(r["exit_code"] != 0 for r in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,18 +9,54 @@ Generates deterministic demo data with a hidden pattern:
 
 Usage:
     python utils/generate_synthetic_data.py
+    python utils/generate_synthetic_data.py --engine reference
+
+Telemetry engines:
+    numpy      Builds the whole (time x asset) grid with array operations
+               (default with --topology parametric or any numpy-only option)
+    reference  Original per-row Python loop (default for a plain demo run,
+               so the committed data/synthetic files reproduce exactly)
+
+    python utils/generate_synthetic_data.py --compare-engines
+               Checks the two engines agree per asset on counts, means and stds
 
 Output:
     data/synthetic/*.csv (version controlled)
+    data/synthetic/bulk/<table>/*.csv.gz + manifest.json (--split-size-mb)
 """
 
+import argparse
 import csv
+import gzip
+import hashlib
+import io
+import itertools
+import json
 import math
 import os
 import random
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the reference engine is pure Python
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is only needed for --format parquet/arrow
+    pa = None
+
+try:
+    import zstandard
+except ImportError:  # zstandard is only needed for --compression zstd
+    zstandard = None
+
 # ============================================================================
 # Configuration
 # ============================================================================
@@ -175,28 +211,187 @@ def generate_network_edges():
     ]
 
 
-def generate_scada_telemetry(assets):
-    """Generate SCADA_TELEMETRY time-series data.
+# ============================================================================
+# Parametric Large-Basin Topology
+# ============================================================================
+
+# Per-system layout: SnowCore (Delaware, west) and TeraField (Midland, east)
+TOPOLOGY_SYSTEMS = {
+    "SNOWCORE": {
+        "prefix": "SC", "zone": "DELAWARE", "lon": (LON_MIN, -102.4), "install_years": (2020, 2023),
+        "anchor_hub": "SC-CPF-01",
+        "max_psi": {"WELL_PAD": (1440, 1500), "SEPARATOR": (1200, 1440),
+                    "COMPRESSOR": (1000, 1200), "PROCESSING_FACILITY": (1200, 1440)},
+        "manufacturers": ["Schlumberger", "Halliburton", "Exterran", "Ariel", "Solar Turbines", "Wood Group"],
+    },
+    "TERAFIELD": {
+        "prefix": "TF", "zone": "MIDLAND", "lon": (-102.4, LON_MAX), "install_years": (2010, 2018),
+        "anchor_hub": "TF-MID-HUB",
+        "max_psi": {"WELL_PAD": (720, 1000), "SEPARATOR": (550, 720),
+                    "COMPRESSOR": (450, 650), "PROCESSING_FACILITY": (650, 800)},
+        "manufacturers": ["Natco", "Cameron", "Ingersoll Rand", "Fisher", "Pioneer Legacy", "Unknown"],
+    },
+}
+
+# Topology levels from the outlets inward: (asset type, subtype choices, id token,
+# spread of children around their parent in degrees, line diameter range in inches)
+TOPOLOGY_LEVELS = [
+    ("PROCESSING_FACILITY", ["GATHERING_HUB", "CENTRAL"], "HUB", None, None),
+    ("COMPRESSOR", ["RECIPROCATING", "CENTRIFUGAL", "LOW_PRESSURE"], "COMP", 0.12, (12, 20)),
+    ("SEPARATOR", ["3PHASE", "2PHASE_VERTICAL", "2PHASE_HORIZONTAL"], "SEP", 0.05, (8, 12)),
+    ("WELL_PAD", ["MULTI_WELL", "SINGLE_WELL"], "PAD", 0.02, (4, 8)),
+]
+
+
+def generate_large_topology(
+    n_pads=20000,
+    n_separators=4000,
+    n_compressors=800,
+    n_hubs=40,
+    n_cross_links=2000,
+    seed=RANDOM_SEED,
+):
+    """Generate a parametric tree-plus-loop gathering network.
     
-    Creates 1-minute interval sensor readings with:
-    - Normal operating patterns (sine wave + noise)
-    - Anomaly injection at ANOMALY_EVENT_TIME
-    - SnowCore: Clean signals, high frequency
-    - TeraField: Noisier, with occasional gaps (legacy system artifacts)
+    Starts from the demo assets and edges (so SC-PAD-42 -> PIPE-88 -> TF-V-204
+    is still present) and grows hubs, compressors, separators and pads around
+    them. Each generated asset hangs off a parent one level up and is placed
+    near it; cross links between nearby separators/compressors close loops,
+    some of them across the SnowCore/TeraField boundary.
+    
+    Uses its own random.Random(seed), so the demo records are identical to
+    generate_asset_master()/generate_network_edges().
+    
+    Returns:
+        (assets, edges) in the ASSET_MASTER / NETWORK_EDGES record format
     """
-    telemetry = []
+    assets = generate_asset_master()
+    edges = generate_network_edges()
+    rng = random.Random(seed)
     
-    current_time = START_TIME
+    counts = {"PROCESSING_FACILITY": n_hubs, "COMPRESSOR": n_compressors,
+              "SEPARATOR": n_separators, "WELL_PAD": n_pads}
+    by_id = {a["ASSET_ID"]: a for a in assets}
+    levels = {}
+    segment_counter = 0
     
-    # Pre-calculate asset operating points
+    def add_edge(source, target, diameter, status="ACTIVE"):
+        nonlocal segment_counter
+        segment_counter += 1
+        edges.append({
+            "SEGMENT_ID": f"PIPE-G{segment_counter:06d}",
+            "SOURCE_ASSET_ID": source["ASSET_ID"],
+            "TARGET_ASSET_ID": target["ASSET_ID"],
+            "LINE_DIAMETER_INCHES": diameter,
+            "MAX_PRESSURE_RATING_PSI": min(source["MAX_PRESSURE_RATING_PSI"], target["MAX_PRESSURE_RATING_PSI"]),
+            "STATUS": status,
+            "LENGTH_MILES": _segment_length_miles(source, target, rng),
+        })
+    
+    for asset_type, subtypes, token, spread, diameters in TOPOLOGY_LEVELS:
+        level = []
+        parents = levels.get(_parent_type(asset_type), [])
+        for i in range(counts[asset_type]):
+            if parents:
+                parent = parents[rng.randrange(len(parents))]
+                system = parent["SOURCE_SYSTEM"]
+                lat = _clamp(rng.gauss(parent["LATITUDE"], spread), LAT_MIN, LAT_MAX)
+                lon = _clamp(rng.gauss(parent["LONGITUDE"], spread), LON_MIN, LON_MAX)
+            else:
+                parent = None
+                system = "SNOWCORE" if i % 2 == 0 else "TERAFIELD"
+                lon_min, lon_max = TOPOLOGY_SYSTEMS[system]["lon"]
+                lat = rng.uniform(LAT_MIN, LAT_MAX)
+                lon = rng.uniform(lon_min, lon_max)
+            
+            spec = TOPOLOGY_SYSTEMS[system]
+            psi_min, psi_max = spec["max_psi"][asset_type]
+            asset = {
+                "ASSET_ID": f"{spec['prefix']}-{token}-{i:05d}",
+                "SOURCE_SYSTEM": system,
+                "ASSET_TYPE": asset_type,
+                "ASSET_SUBTYPE": rng.choice(subtypes),
+                "LATITUDE": round(lat, 5),
+                "LONGITUDE": round(lon, 5),
+                "MAX_PRESSURE_RATING_PSI": rng.randrange(psi_min, psi_max + 1, 10),
+                "MANUFACTURER": rng.choice(spec["manufacturers"]),
+                "INSTALL_DATE": f"{rng.randint(*spec['install_years'])}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                "ZONE": spec["zone"],
+            }
+            assets.append(asset)
+            level.append(asset)
+            by_id[asset["ASSET_ID"]] = asset
+            
+            if parent is not None:
+                add_edge(asset, parent, rng.choice(range(diameters[0], diameters[1] + 1, 2)))
+            else:
+                # Hubs feed the demo network's central facility for their system
+                add_edge(asset, by_id[spec["anchor_hub"]], 20)
+        levels[asset_type] = level
+    
+    # Loops: link a separator/compressor to the nearest of a few random peers
+    loop_candidates = levels["SEPARATOR"] + levels["COMPRESSOR"]
+    for _ in range(n_cross_links if len(loop_candidates) > 1 else 0):
+        source = rng.choice(loop_candidates)
+        peers = [rng.choice(loop_candidates) for _ in range(8)]
+        peers = [p for p in peers if p is not source]
+        if not peers:
+            continue
+        target = min(peers, key=lambda p: _distance_deg(source, p))
+        if source["SOURCE_SYSTEM"] == "TERAFIELD" and target["SOURCE_SYSTEM"] == "SNOWCORE":
+            source, target = target, source  # flow from high-pressure SnowCore into TeraField
+        add_edge(source, target, rng.choice([6, 8, 10]), status=rng.choice(["ACTIVE"] * 4 + ["PLANNED"]))
+    
+    return assets, edges
+
+
+def _parent_type(asset_type):
+    """Asset type one level closer to the outlet in TOPOLOGY_LEVELS."""
+    types = [level[0] for level in TOPOLOGY_LEVELS]
+    index = types.index(asset_type)
+    return types[index - 1] if index > 0 else None
+
+
+def _clamp(value, low, high):
+    return max(low, min(high, value))
+
+
+def _distance_deg(a, b):
+    return math.hypot(a["LATITUDE"] - b["LATITUDE"], a["LONGITUDE"] - b["LONGITUDE"])
+
+
+def _segment_length_miles(source, target, rng):
+    """Straight-line distance with a routing allowance, at least 0.5 miles."""
+    lat_miles = (source["LATITUDE"] - target["LATITUDE"]) * 69.0
+    lon_miles = (source["LONGITUDE"] - target["LONGITUDE"]) * 69.0 * math.cos(math.radians(32))
+    return round(max(0.5, math.hypot(lat_miles, lon_miles) * rng.uniform(1.1, 1.4)), 2)
+
+
+TELEMETRY_FIELDS = [
+    "ASSET_ID", "TIMESTAMP", "FLOW_RATE_BOPD", "GAS_FLOW_MCFD", "PRESSURE_PSI",
+    "TEMPERATURE_F", "SOURCE_SYSTEM",
+]
+
+# Anomaly pattern assets (see module docstring)
+RAMP_ASSET_ID = "SC-PAD-42"
+SPIKE_ASSET_ID = "TF-V-204"
+
+
+def generate_asset_baselines(assets, asset_rngs=None):
+    """Pick each asset's operating point (shared by both telemetry engines).
+    
+    Draws from the global `random` stream, or from each asset's own generator
+    when `asset_rngs` (one per asset, see asset_generators()) is given.
+    """
     asset_baselines = {}
-    for asset in assets:
+    for index, asset in enumerate(assets):
         asset_id = asset["ASSET_ID"]
         max_psi = asset["MAX_PRESSURE_RATING_PSI"]
+        uniform = asset_rngs[index].uniform if asset_rngs is not None else random.uniform
         
         # Operating point is typically 60-80% of max rating
-        baseline_pressure = max_psi * random.uniform(0.6, 0.75)
-        baseline_flow = random.uniform(500, 2000)  # BOPD equivalent
+        baseline_pressure = max_psi * uniform(0.6, 0.75)
+        baseline_flow = uniform(500, 2000)  # BOPD equivalent
         
         asset_baselines[asset_id] = {
             "pressure": baseline_pressure,
@@ -204,6 +399,312 @@ def generate_scada_telemetry(assets):
             "is_snowcore": asset["SOURCE_SYSTEM"] == "SNOWCORE",
             "max_psi": max_psi,
         }
+    return asset_baselines
+
+
+def asset_seed(asset_id, seed=RANDOM_SEED):
+    """Derive a stable per-asset seed from the master seed and the asset ID."""
+    digest = hashlib.sha256(f"{seed}:{asset_id}".encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "little")
+
+
+def asset_generators(assets, seed=RANDOM_SEED):
+    """One independent NumPy generator per asset, seeded by asset_seed()."""
+    return [np.random.default_rng(asset_seed(a["ASSET_ID"], seed)) for a in assets]
+
+
+def generate_scada_telemetry(assets, engine):
+    """Generate SCADA_TELEMETRY time-series data.
+    
+    Creates 1-minute interval sensor readings with:
+    - Normal operating patterns (sine wave + noise)
+    - Anomaly injection at ANOMALY_EVENT_TIME
+    - SnowCore: Clean signals, high frequency
+    - TeraField: Noisier, with occasional gaps (legacy system artifacts)
+    
+    engine="numpy" returns a dict of column arrays keyed by TELEMETRY_FIELDS;
+    engine="reference" returns the original list of row dicts. There is no
+    default: the two return different types and draw different random values
+    (the CLI picks reference for the demo so the committed files reproduce).
+    Both hold the whole range in memory; use iter_scada_telemetry_blocks()
+    for long ranges.
+    """
+    if engine == "reference":
+        return _generate_scada_telemetry_reference(assets)
+    if engine != "numpy":
+        raise ValueError(f"Unknown telemetry engine: {engine}")
+    blocks = list(iter_scada_telemetry_blocks(assets))
+    return {name: np.concatenate([b[name] for b in blocks]) for name in TELEMETRY_FIELDS}
+
+
+def iter_scada_telemetry_blocks(
+    assets,
+    start=START_TIME,
+    end=END_TIME,
+    interval_seconds=INTERVAL_MINUTES * 60,
+    block_seconds=3600,
+    per_asset_seeds=False,
+    model=None,
+):
+    """Yield SCADA_TELEMETRY as column-array blocks of `block_seconds` each.
+    
+    Only one block is alive at a time, so peak memory depends on the block
+    size and asset count, not on the length of the start..end range.
+    
+    With per_asset_seeds=True every asset draws its baseline and noise from
+    its own generator (asset_generators()), so an asset's readings do not
+    depend on which other assets are generated alongside it.
+    
+    Pass a `model` from build_telemetry_model()/load_telemetry_state() to
+    continue from existing baselines and RNG state; it is advanced in place.
+    """
+    if model is None:
+        model = build_telemetry_model(assets, per_asset_seeds=per_asset_seeds)
+    for times in _time_blocks(start, end, interval_seconds, block_seconds):
+        yield _telemetry_block(model["arrays"], times, model["rng"])
+
+
+def build_telemetry_model(assets, per_asset_seeds=False, asset_baselines=None):
+    """Baselines, per-asset constants and RNG(s) driving the NumPy engine."""
+    if np is None:
+        raise RuntimeError("NumPy is not installed; use engine='reference'")
+    
+    if per_asset_seeds:
+        rng = asset_generators(assets)
+        asset_baselines = generate_asset_baselines(assets, asset_rngs=rng)
+    else:
+        if asset_baselines is None:
+            asset_baselines = generate_asset_baselines(assets)
+        rng = np.random.default_rng(RANDOM_SEED)
+    return {
+        "assets": assets,
+        "baselines": asset_baselines,
+        "arrays": _asset_arrays(assets, asset_baselines),
+        "rng": rng,
+    }
+
+
+def save_telemetry_state(path, model, last_timestamp, interval_seconds):
+    """Persist a telemetry model so a later run can append after `last_timestamp`."""
+    rng = model["rng"]
+    state = {
+        "random_seed": RANDOM_SEED,
+        "last_timestamp": last_timestamp.isoformat(),
+        "interval_seconds": interval_seconds,
+        "assets": [
+            {key: a[key] for key in ("ASSET_ID", "SOURCE_SYSTEM", "ASSET_TYPE", "ZONE")}
+            for a in model["assets"]
+        ],
+        "baselines": model["baselines"],
+        "rng_state": (
+            [r.bit_generator.state for r in rng] if isinstance(rng, list) else rng.bit_generator.state
+        ),
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+
+
+def load_telemetry_state(path):
+    """Restore a model saved by save_telemetry_state().
+    
+    Returns:
+        (model, last_timestamp, interval_seconds)
+    """
+    if np is None:
+        raise RuntimeError("NumPy is not installed; use engine='reference'")
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    
+    def restore(rng_state):
+        rng = np.random.default_rng()
+        rng.bit_generator.state = rng_state
+        return rng
+    
+    rng_state = state["rng_state"]
+    rng = [restore(s) for s in rng_state] if isinstance(rng_state, list) else restore(rng_state)
+    model = {
+        "assets": state["assets"],
+        "baselines": state["baselines"],
+        "arrays": _asset_arrays(state["assets"], state["baselines"]),
+        "rng": rng,
+    }
+    return model, datetime.fromisoformat(state["last_timestamp"]), state["interval_seconds"]
+
+
+def append_scada_telemetry(
+    state_path, days, output_format="csv", block_seconds=3600, aggregates=True, **writer_options
+):
+    """Generate `days` more telemetry after the saved state as a delta file.
+    
+    Writes scada_telemetry_delta_<first timestamp>.csv (or a partitioned
+    directory of that name for parquet/arrow), plus the matching
+    scada_aggregates_delta_<first timestamp>.csv, and advances the state file.
+    A delta that starts or ends mid-day yields partial aggregates for that day.
+    
+    Returns:
+        (output path, rows written)
+    """
+    model, last_timestamp, interval_seconds = load_telemetry_state(state_path)
+    start = last_timestamp + timedelta(seconds=interval_seconds)
+    end = last_timestamp + timedelta(days=days)
+    blocks = iter_scada_telemetry_blocks(
+        model["assets"], start=start, end=end,
+        interval_seconds=interval_seconds, block_seconds=block_seconds, model=model,
+    )
+    
+    name = f"scada_telemetry_delta_{start:%Y%m%dT%H%M%S}"
+    if aggregates:
+        aggregator = DailyAggregator(
+            model["assets"], OUTPUT_DIR / f"scada_aggregates_delta_{start:%Y%m%dT%H%M%S}.csv",
+            interval_seconds=interval_seconds,
+        )
+        blocks = aggregator.observe(blocks)
+    if output_format == "csv":
+        output_path = OUTPUT_DIR / f"{name}.csv"
+        row_count = write_telemetry_stream(output_path.name, blocks)
+    else:
+        output_path = OUTPUT_DIR / name
+        _reset_output_dir(output_path)
+        row_count = write_telemetry_columnar(
+            blocks, model["assets"], output_format, root=output_path,
+            interval_seconds=interval_seconds, **writer_options,
+        )
+    if aggregates:
+        aggregator.close()
+    
+    save_telemetry_state(state_path, model, last_grid_timestamp(start, end, interval_seconds), interval_seconds)
+    return output_path, row_count
+
+
+def last_grid_timestamp(start, end, interval_seconds):
+    """Last timestamp on the start + k * interval grid that is <= end."""
+    steps = int((end - start).total_seconds() // interval_seconds)
+    return start + timedelta(seconds=steps * interval_seconds)
+
+
+def _time_blocks(start, end, interval_seconds, block_seconds):
+    """Split the inclusive start..end range into arrays of block timestamps."""
+    step = np.timedelta64(interval_seconds, "s")
+    steps_per_block = max(1, block_seconds // interval_seconds)
+    block_start = np.datetime64(start, "s")
+    stop = np.datetime64(end, "s") + step
+    while block_start < stop:
+        block_stop = min(block_start + steps_per_block * step, stop)
+        yield np.arange(block_start, block_stop, step)
+        block_start = block_stop
+
+
+def _asset_arrays(assets, asset_baselines):
+    """Per-asset constants for the NumPy engine, computed once per run."""
+    asset_ids = np.array([a["ASSET_ID"] for a in assets], dtype=object)
+    is_snowcore = np.array([asset_baselines[a]["is_snowcore"] for a in asset_ids])
+    return {
+        "asset_ids": asset_ids,
+        "source_systems": np.array([a["SOURCE_SYSTEM"] for a in assets], dtype=object),
+        "base_pressure": np.array([asset_baselines[a]["pressure"] for a in asset_ids]),
+        "base_flow": np.array([asset_baselines[a]["flow"] for a in asset_ids]),
+        "is_snowcore": is_snowcore,
+        "is_upstream": np.array([a["ASSET_TYPE"] in ("WELL_PAD", "SEPARATOR") for a in assets]),
+        # TeraField has more noise due to older sensors
+        "noise_factor": np.where(is_snowcore, 2.0, 8.0),
+        "ramp_cols": np.flatnonzero(asset_ids == RAMP_ASSET_ID),
+        "spike_cols": np.flatnonzero(asset_ids == SPIKE_ASSET_ID),
+    }
+
+
+def _telemetry_block(asset_arrays, times, rng):
+    """Compute the (time x asset) telemetry grid for `times` in one pass.
+    
+    Mirrors the reference loop: daily sine factor, sensor noise, TeraField
+    comm dropouts, the SC-PAD-42 ramp and the TF-V-204 spike. Rows come out
+    in the same time-major, asset-minor order as the reference engine.
+    
+    `rng` is either one generator for the whole grid or a list with one
+    generator per asset column.
+    """
+    asset_ids = asset_arrays["asset_ids"]
+    is_snowcore = asset_arrays["is_snowcore"]
+    base_flow = asset_arrays["base_flow"]
+    n_times, n_assets = len(times), len(asset_ids)
+    
+    # Sine wave for daily operational patterns (+/-10%), one value per timestamp
+    seconds_of_day = (times - times.astype("datetime64[D]")).astype(np.float64)
+    daily_factor = (1 + 0.1 * np.sin(seconds_of_day / 3600 * (2 * math.pi / 24)))[:, None]
+    
+    if isinstance(rng, list):
+        normal = np.stack([r.standard_normal((4, n_times)) for r in rng], axis=-1)
+        uniform = np.stack([r.random((2, n_times)) for r in rng], axis=-1)
+    else:
+        normal = rng.standard_normal((4, n_times, n_assets))
+        uniform = rng.random((2, n_times, n_assets))
+    
+    # Base values + noise
+    pressure = asset_arrays["base_pressure"] * daily_factor + normal[0] * asset_arrays["noise_factor"]
+    flow = base_flow * daily_factor + normal[1] * (base_flow * 0.02)
+    
+    # ANOMALY INJECTION
+    minutes_since_event = (
+        (times - np.datetime64(ANOMALY_EVENT_TIME, "s")).astype(np.float64) / 60
+    )
+    ramp_cols = asset_arrays["ramp_cols"]
+    if ramp_cols.size:
+        ramp_factor = np.where(
+            minutes_since_event >= 0,
+            np.minimum(1.5, 1.0 + 0.5 * (minutes_since_event / 30)),
+            1.0,
+        )[:, None]
+        flow[:, ramp_cols] *= ramp_factor
+        pressure[:, ramp_cols] *= 1 + 0.3 * (ramp_factor - 1)
+    
+    spike_cols = asset_arrays["spike_cols"]
+    spike_rows = minutes_since_event >= 5
+    if spike_cols.size and spike_rows.any():
+        spike = np.minimum(250, (minutes_since_event[spike_rows] - 5) * 2)[:, None]
+        block = pressure[np.ix_(spike_rows, spike_cols)]
+        pressure[np.ix_(spike_rows, spike_cols)] = np.minimum(block + spike, 800)
+    
+    # Temperature (correlated with pressure)
+    temperature = 120 + (pressure / 20) + normal[2] * 3
+    
+    # Gas flow: higher GOR for wells/separators, lower for downstream equipment
+    base_gor = np.where(
+        asset_arrays["is_upstream"], 1500 + 1000 * uniform[0], 500 + 500 * uniform[0]
+    )
+    gas_flow_mcfd = (flow * base_gor / 1000) * daily_factor
+    gas_flow_mcfd += normal[3] * (gas_flow_mcfd * 0.03)
+    
+    # TeraField assets have occasional communication gaps
+    keep = (is_snowcore | (uniform[1] >= 0.02)).ravel()
+    
+    return {
+        "ASSET_ID": np.tile(asset_ids, n_times)[keep],
+        "TIMESTAMP": np.repeat(times, n_assets)[keep],
+        "FLOW_RATE_BOPD": np.round(np.maximum(0, flow), 2).ravel()[keep],
+        "GAS_FLOW_MCFD": np.round(np.maximum(0, gas_flow_mcfd), 2).ravel()[keep],
+        "PRESSURE_PSI": np.round(np.maximum(0, pressure), 2).ravel()[keep],
+        "TEMPERATURE_F": np.round(temperature, 1).ravel()[keep],
+        "SOURCE_SYSTEM": np.tile(asset_arrays["source_systems"], n_times)[keep],
+    }
+
+
+def _generate_scada_telemetry_reference(assets, asset_baselines=None):
+    """Generate SCADA_TELEMETRY rows with the original per-row Python loop.
+    
+    Creates 1-minute interval sensor readings with:
+    - Normal operating patterns (sine wave + noise)
+    - Anomaly injection at ANOMALY_EVENT_TIME
+    - SnowCore: Clean signals, high frequency
+    - TeraField: Noisier, with occasional gaps (legacy system artifacts)
+    
+    Kept as the reference engine for checking the NumPy engine.
+    """
+    telemetry = []
+    
+    current_time = START_TIME
+    
+    # Pre-calculate asset operating points
+    if asset_baselines is None:
+        asset_baselines = generate_asset_baselines(assets)
     
     # Time counter for sine wave patterns
     time_step = 0
@@ -285,6 +786,182 @@ def generate_scada_telemetry(assets):
     return telemetry
 
 
+def reference_rows_to_block(rows):
+    """Column-array block, as the NumPy engine yields, from reference-engine rows."""
+    block = {name: np.array([r[name] for r in rows]) for name in TELEMETRY_FIELDS}
+    block["TIMESTAMP"] = block["TIMESTAMP"].astype("datetime64[s]")
+    return block
+
+
+ENGINE_CHECK_MEASURES = ["FLOW_RATE_BOPD", "GAS_FLOW_MCFD", "PRESSURE_PSI", "TEMPERATURE_F"]
+
+
+def compare_engines(assets, mean_tolerance=0.02, std_tolerance=0.10, count_tolerance=0.01):
+    """Check that the NumPy and reference engines agree statistically.
+    
+    Both engines run over the default range from the same asset baselines;
+    their random draws differ, so per asset we compare reading counts and the
+    mean and standard deviation of each measure within relative tolerances.
+    
+    Returns:
+        List of (asset_id, statistic, numpy value, reference value) outside tolerance
+    """
+    if np is None:
+        raise RuntimeError("NumPy is not installed; the engine check needs both engines")
+    random.seed(RANDOM_SEED)
+    asset_baselines = generate_asset_baselines(assets)
+    
+    model = build_telemetry_model(assets, asset_baselines=asset_baselines)
+    blocks = list(iter_scada_telemetry_blocks(assets, model=model))
+    fast = {name: np.concatenate([b[name] for b in blocks]) for name in ["ASSET_ID"] + ENGINE_CHECK_MEASURES}
+    reference = reference_rows_to_block(
+        _generate_scada_telemetry_reference(assets, asset_baselines=asset_baselines)
+    )
+    
+    failures = []
+    
+    def check(asset_id, statistic, value, expected, tolerance):
+        if abs(value - expected) > tolerance * max(abs(expected), 1e-9):
+            failures.append((asset_id, statistic, value, expected))
+    
+    for asset in assets:
+        asset_id = asset["ASSET_ID"]
+        fast_rows = fast["ASSET_ID"] == asset_id
+        reference_rows = reference["ASSET_ID"] == asset_id
+        check(asset_id, "count", fast_rows.sum(), reference_rows.sum(), count_tolerance)
+        for measure in ENGINE_CHECK_MEASURES:
+            x, y = fast[measure][fast_rows], reference[measure][reference_rows]
+            check(asset_id, f"{measure} mean", x.mean(), y.mean(), mean_tolerance)
+            check(asset_id, f"{measure} std", x.std(ddof=1), y.std(ddof=1), std_tolerance)
+    return failures
+
+
+# ============================================================================
+# Single-Pass Daily Aggregates (SCADA_AGGREGATES)
+# ============================================================================
+
+AGGREGATE_FIELDS = [
+    "ASSET_ID", "RECORD_DATE", "SOURCE_SYSTEM", "ZONE", "ASSET_TYPE",
+    "AVG_FLOW_RATE_BOPD", "MAX_FLOW_RATE_BOPD", "MIN_FLOW_RATE_BOPD", "TOTAL_PRODUCTION_BBL",
+    "AVG_GAS_FLOW_MCFD", "TOTAL_GAS_MCF", "GAS_OIL_RATIO",
+    "AVG_PRESSURE_PSI", "MAX_PRESSURE_PSI", "MIN_PRESSURE_PSI", "PRESSURE_VARIANCE",
+    "AVG_TEMPERATURE_F", "MAX_TEMPERATURE_F",
+    "READING_COUNT", "DOWNTIME_HOURS",
+]
+
+AGGREGATE_MEASURES = ["FLOW_RATE_BOPD", "GAS_FLOW_MCFD", "PRESSURE_PSI", "TEMPERATURE_F"]
+
+
+class DailyAggregator:
+    """Streaming per-(asset, day) accumulators for SCADA_AGGREGATES.
+    
+    Keeps count, sum, min, max and a Welford mean/M2 (merged per block with
+    Chan's parallel update) for each measure, and writes a day's rows with
+    the same columns and formulas as the INSERT ... SELECT in
+    sql/02_tables.sql as soon as a later day starts. Blocks must arrive in
+    time order; only the open days are held in memory.
+    """
+    
+    def __init__(self, assets, filepath, interval_seconds=INTERVAL_MINUTES * 60, bulk=None):
+        self.assets = assets
+        self.filepath = Path(filepath)
+        self.row_count = 0
+        self._index = {a["ASSET_ID"]: i for i, a in enumerate(assets)}
+        self._expected_readings = 86400 / interval_seconds  # 1440 for 1-minute data
+        self._interval_hours = interval_seconds / 3600
+        self._days = {}
+        if bulk is not None:
+            self._file = self._writer = bulk.open(self.filepath.stem, AGGREGATE_FIELDS)
+            self.filepath = self._writer.root
+        else:
+            self._file = open(self.filepath, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(AGGREGATE_FIELDS)
+    
+    def observe(self, blocks):
+        """Pass blocks through unchanged, accumulating each one on the way."""
+        for block in blocks:
+            self.update(block)
+            yield block
+    
+    def update(self, block):
+        if not len(block["ASSET_ID"]):
+            return
+        unique_ids, inverse = np.unique(block["ASSET_ID"], return_inverse=True)
+        asset_index = np.array([self._index[a] for a in unique_ids])[inverse]
+        dates = block["TIMESTAMP"].astype("datetime64[D]")
+        
+        for date in np.unique(dates):
+            rows = dates == date
+            self._merge(self._day(date), asset_index[rows], {m: block[m][rows] for m in AGGREGATE_MEASURES})
+        
+        first_date = dates.min()
+        for date in sorted(d for d in self._days if d < first_date):
+            self._emit(date)
+    
+    def close(self):
+        """Write the remaining days and close the file. Returns rows written."""
+        for date in sorted(self._days):
+            self._emit(date)
+        self._file.close()
+        return self.row_count
+    
+    def _day(self, date):
+        if date not in self._days:
+            n = len(self.assets)
+            self._days[date] = {"count": np.zeros(n)} | {
+                m: {
+                    "sum": np.zeros(n), "mean": np.zeros(n), "m2": np.zeros(n),
+                    "min": np.full(n, np.inf), "max": np.full(n, -np.inf),
+                }
+                for m in AGGREGATE_MEASURES
+            }
+        return self._days[date]
+    
+    def _merge(self, acc, asset_index, values):
+        n = len(self.assets)
+        count_a = acc["count"]
+        count_b = np.bincount(asset_index, minlength=n).astype(np.float64)
+        total = count_a + count_b
+        zeros = np.zeros(n)
+        weight_b = np.divide(count_b, total, out=zeros.copy(), where=total > 0)
+        cross = np.divide(count_a * count_b, total, out=zeros.copy(), where=total > 0)
+        
+        for measure, x in values.items():
+            stats = acc[measure]
+            sum_b = np.bincount(asset_index, weights=x, minlength=n)
+            mean_b = np.divide(sum_b, count_b, out=zeros.copy(), where=count_b > 0)
+            m2_b = np.bincount(asset_index, weights=(x - mean_b[asset_index]) ** 2, minlength=n)
+            delta = mean_b - stats["mean"]
+            stats["m2"] += m2_b + delta ** 2 * cross
+            stats["mean"] += delta * weight_b
+            stats["sum"] += sum_b
+            np.minimum.at(stats["min"], asset_index, x)
+            np.maximum.at(stats["max"], asset_index, x)
+        acc["count"] = total
+    
+    def _emit(self, date):
+        acc = self._days.pop(date)
+        flow, gas = acc["FLOW_RATE_BOPD"], acc["GAS_FLOW_MCFD"]
+        pressure, temperature = acc["PRESSURE_PSI"], acc["TEMPERATURE_F"]
+        for i in np.flatnonzero(acc["count"] > 0):
+            asset = self.assets[i]
+            count = int(acc["count"][i])
+            avg_flow = float(flow["mean"][i])
+            avg_gas = float(gas["mean"][i])
+            self._writer.writerow([
+                asset["ASSET_ID"], str(date), asset["SOURCE_SYSTEM"], asset["ZONE"], asset["ASSET_TYPE"],
+                avg_flow, float(flow["max"][i]), float(flow["min"][i]), float(flow["sum"][i]) / count,
+                avg_gas, float(gas["sum"][i]) / count,
+                avg_gas / avg_flow * 1000 if avg_flow > 0 else None,
+                float(pressure["mean"][i]), float(pressure["max"][i]), float(pressure["min"][i]),
+                float(pressure["m2"][i]) / (count - 1) if count > 1 else None,
+                float(temperature["mean"][i]), float(temperature["max"][i]),
+                count, max(0.0, (self._expected_readings - count) * self._interval_hours),
+            ])
+            self.row_count += 1
+
+
 def generate_graph_predictions(assets, edges):
     """Generate pre-computed graph predictions for the demo.
     
@@ -356,8 +1033,14 @@ def generate_graph_predictions(assets, edges):
     return predictions
 
 
-def write_csv(filename, data, fieldnames):
-    """Write data to CSV file."""
+def write_csv(filename, data, fieldnames, bulk=None):
+    """Write data to CSV file, or to split compressed files via `bulk`."""
+    if bulk is not None:
+        writer = bulk.open(Path(filename).stem, fieldnames)
+        writer.writerows([row[name] for name in fieldnames] for row in data)
+        writer.close()
+        print(f"  Wrote {len(data)} rows to {len(writer.files)} files in {writer.root}")
+        return
     filepath = OUTPUT_DIR / filename
     with open(filepath, "w", newline="", encoding="utf-8") as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
@@ -366,48 +1049,674 @@ def write_csv(filename, data, fieldnames):
     print(f"  Wrote {len(data)} rows to {filepath}")
 
 
-def main():
+def write_telemetry_stream(filename, blocks, fieldnames=TELEMETRY_FIELDS, verbose=True, bulk=None):
+    """Stream telemetry blocks to a CSV file, writing each block as it arrives.
+    
+    With `bulk`, rows go to split compressed files instead of one CSV.
+    
+    Returns the number of rows written.
+    """
+    if bulk is not None:
+        out = bulk.open(Path(filename).stem, fieldnames)
+        filepath = out.root
+    else:
+        filepath = OUTPUT_DIR / filename
+        out = open(filepath, "w", newline="", encoding="utf-8")
+    row_count = 0
+    current_day = None
+    with out:
+        if bulk is not None:
+            writer = out
+        else:
+            writer = csv.writer(out)
+            writer.writerow(fieldnames)
+        for block in blocks:
+            writer.writerows(zip(*(_csv_column(block[name]) for name in fieldnames)))
+            row_count += len(block[fieldnames[0]])
+            
+            # Progress indicator (every 24 hours of data)
+            if verbose and len(block["TIMESTAMP"]):
+                block_day = block["TIMESTAMP"][-1].astype("datetime64[D]")
+                if current_day is not None and block_day != current_day:
+                    print(f"  Generated telemetry through {current_day}...")
+                current_day = block_day
+    if verbose:
+        print(f"  Wrote {row_count} rows to {filepath}")
+    return row_count
+
+
+def _telemetry_arrow_schema():
+    """Typed Arrow schema for SCADA_TELEMETRY (matches sql/02_tables.sql)."""
+    return pa.schema([
+        ("ASSET_ID", pa.string()),
+        ("TIMESTAMP", pa.timestamp("ms")),
+        ("FLOW_RATE_BOPD", pa.float64()),
+        ("GAS_FLOW_MCFD", pa.float64()),
+        ("PRESSURE_PSI", pa.float64()),
+        ("TEMPERATURE_F", pa.float64()),
+        ("SOURCE_SYSTEM", pa.string()),
+    ])
+
+
+class ColumnarTelemetryWriter:
+    """Write telemetry blocks as date-partitioned Parquet or Arrow IPC files.
+    
+    Layout: <root>/date=YYYY-MM-DD/<prefix>-GGGGG.<ext>. Assets are sorted by
+    ID and split into groups sized so one group-day holds about
+    `rows_per_file` rows; each file is one contiguous asset range for one
+    day. Rows are buffered per file and flushed as zstd-compressed row groups
+    sorted by (ASSET_ID, TIMESTAMP), matching CLUSTER BY on SCADA_TELEMETRY.
+    
+    Blocks must arrive in time order (as iter_scada_telemetry_blocks yields
+    them); files for earlier days are closed as soon as a later day starts.
+    """
+    
+    EXTENSIONS = {"parquet": "parquet", "arrow": "arrow"}
+    
+    def __init__(
+        self,
+        root,
+        asset_ids,
+        output_format="parquet",
+        rows_per_file=5_000_000,
+        interval_seconds=INTERVAL_MINUTES * 60,
+        file_prefix="part",
+        row_group_rows=250_000,
+    ):
+        if pa is None:
+            raise RuntimeError("pyarrow is not installed; use --format csv")
+        if output_format not in self.EXTENSIONS:
+            raise ValueError(f"Unknown columnar format: {output_format}")
+        self.root = Path(root)
+        self.output_format = output_format
+        self.file_prefix = file_prefix
+        self.row_group_rows = row_group_rows
+        self.schema = _telemetry_arrow_schema()
+        self.files = []
+        self.row_count = 0
+        
+        rows_per_asset_day = max(1, 86400 // interval_seconds)
+        self._assets_per_file = max(1, rows_per_file // rows_per_asset_day)
+        self._rank_of = {asset_id: rank for rank, asset_id in enumerate(sorted(asset_ids))}
+        self._buffers = {}  # (date, group) -> [pa.Table]
+        self._writers = {}  # (date, group) -> ParquetWriter / RecordBatchFileWriter
+    
+    def write(self, block):
+        """Partition one telemetry block by (date, asset group) and buffer it."""
+        if not len(block["ASSET_ID"]):
+            return
+        unique_ids, inverse = np.unique(block["ASSET_ID"], return_inverse=True)
+        rank = np.array([self._rank_of[a] for a in unique_ids])[inverse]
+        dates = block["TIMESTAMP"].astype("datetime64[D]")
+        order = np.lexsort((block["TIMESTAMP"], rank, dates))
+        
+        # Files for days before this block can never receive more rows
+        first_date = dates[order[0]]
+        for key in [k for k in self._buffers if k[0] < first_date]:
+            self._close(key)
+        
+        sorted_dates = dates[order]
+        sorted_groups = rank[order] // self._assets_per_file
+        boundaries = np.flatnonzero(
+            (sorted_dates[1:] != sorted_dates[:-1]) | (sorted_groups[1:] != sorted_groups[:-1])
+        ) + 1
+        for segment in np.split(order, boundaries):
+            key = (dates[segment[0]], int(rank[segment[0]] // self._assets_per_file))
+            self._buffers.setdefault(key, []).append(self._table(block, segment))
+            if sum(t.num_rows for t in self._buffers[key]) >= self.row_group_rows:
+                self._flush(key)
+    
+    def close(self):
+        """Flush and close every open file. Returns the total rows written."""
+        for key in list(self._buffers):
+            self._close(key)
+        return self.row_count
+    
+    def _table(self, block, rows):
+        return pa.table(
+            {name: block[name][rows] for name in TELEMETRY_FIELDS}, schema=self.schema
+        )
+    
+    def _flush(self, key):
+        tables = self._buffers[key]
+        if not tables:
+            return
+        table = pa.concat_tables(tables).sort_by([("ASSET_ID", "ascending"), ("TIMESTAMP", "ascending")])
+        self._buffers[key] = []
+        
+        writer = self._writers.get(key)
+        if writer is None:
+            date, group = key
+            path = self.root / f"date={date}" / f"{self.file_prefix}-{group:05d}.{self.EXTENSIONS[self.output_format]}"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if self.output_format == "parquet":
+                writer = pq.ParquetWriter(path, self.schema, compression="zstd")
+            else:
+                options = pa.ipc.IpcWriteOptions(compression="zstd")
+                writer = pa.ipc.new_file(path, self.schema, options=options)
+            self._writers[key] = writer
+            self.files.append(path)
+        writer.write_table(table)
+        self.row_count += table.num_rows
+    
+    def _close(self, key):
+        self._flush(key)
+        del self._buffers[key]
+        writer = self._writers.pop(key, None)
+        if writer is not None:
+            writer.close()
+
+
+def write_telemetry_columnar(blocks, assets, output_format, root=None, verbose=True, **writer_options):
+    """Stream telemetry blocks through a ColumnarTelemetryWriter.
+    
+    Returns the number of rows written.
+    """
+    root = Path(root) if root is not None else OUTPUT_DIR / "scada_telemetry"
+    writer = ColumnarTelemetryWriter(
+        root, [a["ASSET_ID"] for a in assets], output_format=output_format, **writer_options
+    )
+    for block in blocks:
+        writer.write(block)
+    row_count = writer.close()
+    if verbose:
+        print(f"  Wrote {row_count} rows to {len(writer.files)} {output_format} files in {root}")
+    return row_count
+
+
+def _reset_output_dir(path):
+    """Remove a previous run's partitioned/sharded output directory."""
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+
+
+# ============================================================================
+# Bulk-Load Output (size-split, compressed CSV + manifest)
+# ============================================================================
+
+BULK_COMPRESSION_EXTENSIONS = {"gzip": "gz", "zstd": "zst"}
+
+
+class _HashingFile:
+    """Binary file wrapper that tracks the sha256 and size of bytes written."""
+    
+    def __init__(self, path):
+        self._file = open(path, "wb")
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+    
+    def tell(self):
+        return self.size
+    
+    def flush(self):
+        self._file.flush()
+    
+    def close(self):
+        self._file.close()
+
+
+class BulkCsvWriter:
+    """csv.writer-like sink that rolls over to a new compressed file by size.
+    
+    Writes <root>/<table>_NNNNN.csv.<gz|zst>, each with its own header row,
+    and starts a new file once the compressed bytes reach `target_bytes`.
+    Rows are written in chunks, so files overshoot the target by at most one
+    chunk plus the compressor's internal buffer; equal-sized files let
+    COPY INTO spread them evenly across warehouse threads.
+    """
+    
+    CHUNK_ROWS = 10_000
+    
+    def __init__(self, root, table, fieldnames, target_bytes, compression="gzip", manifest=None):
+        if compression not in BULK_COMPRESSION_EXTENSIONS:
+            raise ValueError(f"Unknown compression: {compression}")
+        if compression == "zstd" and zstandard is None:
+            raise RuntimeError("zstandard is not installed; use --compression gzip")
+        self.root = Path(root)
+        self.table = table
+        self.fieldnames = list(fieldnames)
+        self.target_bytes = target_bytes
+        self.compression = compression
+        self.files = []
+        self.row_count = 0
+        self._manifest = manifest if manifest is not None else []
+        self._raw = None
+        self.root.mkdir(parents=True, exist_ok=True)
+    
+    def writerow(self, row):
+        self.writerows([row])
+    
+    def writerows(self, rows):
+        rows = iter(rows)
+        while True:
+            chunk = list(itertools.islice(rows, self.CHUNK_ROWS))
+            if not chunk:
+                return
+            if self._raw is None:
+                self._open()
+            self._writer.writerows(chunk)
+            self._file_rows += len(chunk)
+            self.row_count += len(chunk)
+            if self._raw.tell() >= self.target_bytes:
+                self._finish()
+    
+    def close(self):
+        """Close the current file. Returns the total rows written."""
+        if self._raw is not None:
+            self._finish()
+        return self.row_count
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.close()
+    
+    def _open(self):
+        extension = BULK_COMPRESSION_EXTENSIONS[self.compression]
+        self._path = self.root / f"{self.table}_{len(self.files):05d}.csv.{extension}"
+        self._raw = _HashingFile(self._path)
+        if self.compression == "gzip":
+            # mtime=0 keeps the bytes (and checksums) reproducible between runs
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", compresslevel=6, mtime=0)
+        else:
+            self._stream = zstandard.ZstdCompressor(level=3).stream_writer(self._raw, closefd=False)
+        self._text = io.TextIOWrapper(self._stream, encoding="utf-8", newline="")
+        self._writer = csv.writer(self._text)
+        self._writer.writerow(self.fieldnames)
+        self._file_rows = 0
+    
+    def _finish(self):
+        self._text.close()  # flushes and closes the compressor stream
+        self._raw.close()
+        self.files.append(self._path)
+        self._manifest.append({
+            "table": self.table,
+            "file": f"{self.table}/{self._path.name}",
+            "rows": self._file_rows,
+            "bytes": self._raw.size,
+            "sha256": self._raw.sha256.hexdigest(),
+        })
+        self._raw = None
+
+
+class BulkOutput:
+    """Split, compressed CSV output for every table of one generator run.
+    
+    Layout: <root>/<table>/<table>_NNNNN.csv.<ext> plus <root>/manifest.json
+    listing each file's table, name, row count, size and sha256 so a loader
+    can verify the upload and reconcile row counts after COPY INTO.
+    """
+    
+    def __init__(self, root, target_bytes, compression="gzip"):
+        self.root = Path(root)
+        self.target_bytes = target_bytes
+        self.compression = compression
+        self.entries = []
+        _reset_output_dir(self.root)
+    
+    def open(self, table, fieldnames):
+        return BulkCsvWriter(
+            self.root / table, table, fieldnames, self.target_bytes,
+            compression=self.compression, manifest=self.entries,
+        )
+    
+    def write_manifest(self):
+        """Write manifest.json and return its path."""
+        tables = {}
+        for entry in self.entries:
+            totals = tables.setdefault(entry["table"], {"files": 0, "rows": 0, "bytes": 0})
+            totals["files"] += 1
+            totals["rows"] += entry["rows"]
+            totals["bytes"] += entry["bytes"]
+        manifest = {
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "compression": self.compression,
+            "target_bytes": self.target_bytes,
+            "tables": tables,
+            "files": self.entries,
+        }
+        path = self.root / "manifest.json"
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        return path
+
+
+def write_telemetry_shards(
+    assets, n_shards, workers, output_format="csv", writer_options=None, aggregates=True,
+    **block_options
+):
+    """Generate telemetry as `n_shards` shards using a process pool.
+    
+    Assets are split into contiguous shards and every asset is seeded from
+    asset_seed(), so each shard (scada_telemetry/part-NNNNN.csv, or the
+    part-NNNNN-GGGGG files of a columnar format) is byte-identical no matter
+    how many workers run. Each shard is written by one worker, along with
+    its scada_aggregates/part-NNNNN.csv when `aggregates` is set.
+    
+    Returns the total number of rows written.
+    """
+    n_shards = max(1, min(n_shards, len(assets)))
+    shard_dir = OUTPUT_DIR / "scada_telemetry"
+    _reset_output_dir(shard_dir)
+    if aggregates:
+        _reset_output_dir(OUTPUT_DIR / "scada_aggregates")
+    
+    bounds = [len(assets) * i // n_shards for i in range(n_shards + 1)]
+    jobs = [
+        (OUTPUT_DIR, i, assets[bounds[i]:bounds[i + 1]], output_format, writer_options or {},
+         aggregates, block_options)
+        for i in range(n_shards)
+    ]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        row_counts = list(pool.map(_write_telemetry_shard, jobs))
+    
+    print(f"  Wrote {sum(row_counts)} rows to {n_shards} shards in {shard_dir} ({workers} workers)")
+    return sum(row_counts)
+
+
+def _write_telemetry_shard(job):
+    """Process-pool entry point: generate and write one telemetry shard."""
+    global OUTPUT_DIR
+    OUTPUT_DIR, shard_index, shard_assets, output_format, writer_options, aggregates, block_options = job
+    blocks = iter_scada_telemetry_blocks(shard_assets, per_asset_seeds=True, **block_options)
+    if aggregates:
+        aggregator = DailyAggregator(
+            shard_assets, OUTPUT_DIR / "scada_aggregates" / f"part-{shard_index:05d}.csv",
+            interval_seconds=block_options["interval_seconds"],
+        )
+        blocks = aggregator.observe(blocks)
+    if output_format == "csv":
+        row_count = write_telemetry_stream(
+            f"scada_telemetry/part-{shard_index:05d}.csv", blocks, verbose=False
+        )
+    else:
+        row_count = write_telemetry_columnar(
+            blocks, shard_assets, output_format, verbose=False,
+            file_prefix=f"part-{shard_index:05d}", **writer_options,
+        )
+    if aggregates:
+        aggregator.close()
+    return row_count
+
+
+def _csv_column(values):
+    """Convert a column array to Python values formatted like the reference CSV."""
+    if np.issubdtype(values.dtype, np.datetime64):
+        return np.char.replace(np.datetime_as_string(values, unit="s"), "T", " ").tolist()
+    return values.tolist()
+
+
+def parse_args(argv=None):
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Generate SnowCore Permian demo data")
+    parser.add_argument(
+        "--output-dir", type=Path, default=OUTPUT_DIR,
+        help="Directory for generated files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["numpy", "reference"],
+        default=None,
+        help="Telemetry engine (default: reference for a plain demo run, which reproduces the "
+             "committed data; numpy for parametric or numpy-only options when installed)",
+    )
+    parser.add_argument(
+        "--compare-engines", action="store_true",
+        help="Only check that both engines agree statistically on the demo topology; writes nothing",
+    )
+    parser.add_argument(
+        "--start", type=datetime.fromisoformat, default=START_TIME,
+        help=f"First telemetry timestamp (default: {START_TIME.isoformat()})",
+    )
+    parser.add_argument(
+        "--end", type=datetime.fromisoformat, default=END_TIME,
+        help=f"Last telemetry timestamp, inclusive (default: {END_TIME.isoformat()})",
+    )
+    parser.add_argument(
+        "--interval-seconds", type=int, default=INTERVAL_MINUTES * 60,
+        help="Seconds between readings (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--block-seconds", type=int, default=3600,
+        help="Time span generated and written per block (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--topology",
+        choices=["demo", "parametric"],
+        default="demo",
+        help="demo: the fixed 18-asset network; parametric: large generated basin",
+    )
+    parser.add_argument("--pads", type=int, default=20000, help="Parametric well pads")
+    parser.add_argument("--separators", type=int, default=4000, help="Parametric separators")
+    parser.add_argument("--compressors", type=int, default=800, help="Parametric compressors")
+    parser.add_argument("--hubs", type=int, default=40, help="Parametric gathering hubs")
+    parser.add_argument(
+        "--cross-links", type=int, default=2000,
+        help="Parametric loop/cross-network segments",
+    )
+    parser.add_argument(
+        "--shards", type=int, default=0,
+        help="Write telemetry as N per-asset-seeded shard files (default: one file)",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=os.cpu_count() or 1,
+        help="Worker processes for --shards (output does not depend on this)",
+    )
+    parser.add_argument(
+        "--format",
+        choices=["csv", "parquet", "arrow"],
+        default="csv",
+        help="Telemetry output: csv file, or date-partitioned Parquet / Arrow IPC files",
+    )
+    parser.add_argument(
+        "--rows-per-file", type=int, default=5_000_000,
+        help="Target rows per Parquet/Arrow file (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--save-state", action="store_true",
+        help="Use per-asset seeds and save generator state to --state-file for appends",
+    )
+    parser.add_argument(
+        "--append-days", type=float, default=0,
+        help="Only generate N more days of telemetry after --state-file as a delta file",
+    )
+    parser.add_argument(
+        "--state-file", type=Path, default=None,
+        help="Telemetry generator state for --save-state/--append-days "
+             "(default: <output-dir>/telemetry_state.json)",
+    )
+    parser.add_argument(
+        "--no-aggregates", dest="aggregates", action="store_false",
+        help="Skip computing scada_aggregates.csv during telemetry generation",
+    )
+    parser.add_argument(
+        "--split-size-mb", type=float, default=0,
+        help="Write every table as compressed CSV files of about N MB each under "
+             "<output-dir>/bulk/ with a manifest.json, instead of single CSV files",
+    )
+    parser.add_argument(
+        "--compression",
+        choices=sorted(BULK_COMPRESSION_EXTENSIONS),
+        default="gzip",
+        help="Compression for --split-size-mb files (zstd needs the zstandard package)",
+    )
+    args = parser.parse_args(argv)
+    
+    if args.compare_engines and np is None:
+        parser.error("--compare-engines requires NumPy")
+    custom_range = (args.start, args.end, args.interval_seconds) != (
+        START_TIME, END_TIME, INTERVAL_MINUTES * 60
+    )
+    if args.engine is None:
+        # Predictions draw from the global random stream after telemetry, so only the
+        # reference loop reproduces the committed demo files; it is kept for that run alone
+        numpy_only = (
+            custom_range or args.shards or args.format != "csv" or args.save_state or args.append_days
+        )
+        wants_numpy = args.topology == "parametric" or numpy_only
+        args.engine = "numpy" if wants_numpy and np is not None else "reference"
+    if args.engine == "reference" and custom_range:
+        parser.error("--start/--end/--interval-seconds require the numpy engine")
+    if args.interval_seconds <= 0 or args.block_seconds <= 0:
+        parser.error("--interval-seconds and --block-seconds must be positive")
+    if args.shards and args.engine == "reference":
+        parser.error("--shards requires the numpy engine")
+    if args.format != "csv" and args.engine == "reference":
+        parser.error("--format parquet/arrow requires the numpy engine")
+    if args.format != "csv" and pa is None:
+        parser.error("--format parquet/arrow requires pyarrow")
+    if (args.save_state or args.append_days) and (args.engine == "reference" or args.shards):
+        parser.error("--save-state/--append-days require the numpy engine without --shards")
+    if args.state_file is None:
+        args.state_file = args.output_dir / "telemetry_state.json"
+    if args.append_days < 0:
+        parser.error("--append-days must be positive")
+    if args.split_size_mb < 0:
+        parser.error("--split-size-mb must be positive")
+    if args.split_size_mb and (args.format != "csv" or args.shards or args.append_days):
+        parser.error("--split-size-mb requires --format csv without --shards or --append-days")
+    if args.split_size_mb and args.compression == "zstd" and zstandard is None:
+        parser.error("--compression zstd requires the zstandard package")
+    if args.shards < 0 or args.workers <= 0:
+        parser.error("--shards must be >= 0 and --workers positive")
+    return args
+
+
+def main(argv=None):
     """Main entry point."""
+    global OUTPUT_DIR
+    args = parse_args(argv)
+    OUTPUT_DIR = args.output_dir
+    
     print("=" * 60)
     print("SnowCore Permian Demo - Synthetic Data Generator")
     print(f"Random Seed: {RANDOM_SEED}")
+    print(f"Telemetry Engine: {args.engine}")
     print("=" * 60)
     
+    if args.compare_engines:
+        print("\nComparing numpy and reference engines on the demo topology...")
+        failures = compare_engines(generate_asset_master())
+        for asset_id, statistic, value, expected in failures:
+            print(f"  MISMATCH {asset_id} {statistic}: numpy {value:.3f} vs reference {expected:.3f}")
+        print(f"\nEngine check {'failed' if failures else 'passed'}: {len(failures)} statistics out of tolerance")
+        raise SystemExit(1 if failures else 0)
+    
     # Create output directory
     OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
     print(f"\nOutput directory: {OUTPUT_DIR}")
     
+    if args.append_days:
+        print(f"\nAppending {args.append_days} day(s) of SCADA_TELEMETRY from {args.state_file}...")
+        output_path, row_count = append_scada_telemetry(
+            args.state_file, args.append_days, output_format=args.format,
+            block_seconds=args.block_seconds, aggregates=args.aggregates,
+            rows_per_file=args.rows_per_file,
+        )
+        print(f"\nDelta complete: {row_count} rows in {output_path}")
+        return
+    
+    bulk = None
+    if args.split_size_mb:
+        bulk = BulkOutput(
+            OUTPUT_DIR / "bulk", int(args.split_size_mb * 2**20), compression=args.compression
+        )
+        print(f"Bulk-load output: {args.compression} files of ~{args.split_size_mb:g} MB in {bulk.root}")
+    
     # Generate asset master
-    print("\n[1/4] Generating ASSET_MASTER...")
-    assets = generate_asset_master()
+    print(f"\n[1/4] Generating ASSET_MASTER ({args.topology} topology)...")
+    if args.topology == "parametric":
+        assets, edges = generate_large_topology(
+            n_pads=args.pads,
+            n_separators=args.separators,
+            n_compressors=args.compressors,
+            n_hubs=args.hubs,
+            n_cross_links=args.cross_links,
+        )
+    else:
+        assets = generate_asset_master()
+        edges = generate_network_edges()
     write_csv(
         "asset_master.csv",
         assets,
         ["ASSET_ID", "SOURCE_SYSTEM", "ASSET_TYPE", "ASSET_SUBTYPE", 
          "LATITUDE", "LONGITUDE", "MAX_PRESSURE_RATING_PSI", 
-         "MANUFACTURER", "INSTALL_DATE", "ZONE"]
+         "MANUFACTURER", "INSTALL_DATE", "ZONE"],
+        bulk=bulk,
     )
     
     # Generate network edges
-    print("\n[2/4] Generating NETWORK_EDGES...")
-    edges = generate_network_edges()
+    print("\n[2/4] Writing NETWORK_EDGES...")
     write_csv(
         "network_edges.csv",
         edges,
         ["SEGMENT_ID", "SOURCE_ASSET_ID", "TARGET_ASSET_ID", 
          "LINE_DIAMETER_INCHES", "MAX_PRESSURE_RATING_PSI", 
-         "STATUS", "LENGTH_MILES"]
+         "STATUS", "LENGTH_MILES"],
+        bulk=bulk,
     )
     
     # Generate SCADA telemetry
-    print("\n[3/4] Generating SCADA_TELEMETRY (7 days of 1-minute data)...")
-    telemetry = generate_scada_telemetry(assets)
-    write_csv(
-        "scada_telemetry.csv",
-        telemetry,
-        ["ASSET_ID", "TIMESTAMP", "FLOW_RATE_BOPD", "GAS_FLOW_MCFD", "PRESSURE_PSI", 
-         "TEMPERATURE_F", "SOURCE_SYSTEM"]
+    print(
+        f"\n[3/4] Generating SCADA_TELEMETRY ({args.start} to {args.end}, "
+        f"{args.interval_seconds}s interval)..."
     )
+    block_options = {
+        "start": args.start,
+        "end": args.end,
+        "interval_seconds": args.interval_seconds,
+        "block_seconds": args.block_seconds,
+    }
+    writer_options = {
+        "rows_per_file": args.rows_per_file,
+        "interval_seconds": args.interval_seconds,
+    }
+    if args.shards:
+        telemetry_count = write_telemetry_shards(
+            assets, args.shards, args.workers,
+            output_format=args.format, writer_options=writer_options,
+            aggregates=args.aggregates, **block_options,
+        )
+    elif args.engine == "numpy":
+        model = build_telemetry_model(assets, per_asset_seeds=args.save_state)
+        blocks = iter_scada_telemetry_blocks(assets, model=model, **block_options)
+        if args.aggregates:
+            aggregator = DailyAggregator(
+                assets, OUTPUT_DIR / "scada_aggregates.csv",
+                interval_seconds=args.interval_seconds, bulk=bulk,
+            )
+            blocks = aggregator.observe(blocks)
+        if args.format != "csv":
+            _reset_output_dir(OUTPUT_DIR / "scada_telemetry")
+            telemetry_count = write_telemetry_columnar(blocks, assets, args.format, **writer_options)
+        else:
+            telemetry_count = write_telemetry_stream("scada_telemetry.csv", blocks, bulk=bulk)
+        if args.aggregates:
+            print(f"  Wrote {aggregator.close()} rows to {aggregator.filepath}")
+        if args.save_state:
+            last_timestamp = last_grid_timestamp(args.start, args.end, args.interval_seconds)
+            save_telemetry_state(args.state_file, model, last_timestamp, args.interval_seconds)
+            print(f"  Saved generator state to {args.state_file}")
+    else:
+        telemetry = generate_scada_telemetry(assets, engine="reference")
+        write_csv("scada_telemetry.csv", telemetry, TELEMETRY_FIELDS, bulk=bulk)
+        telemetry_count = len(telemetry)
+        if args.aggregates and np is None:
+            print("  Skipped scada_aggregates.csv: NumPy is not installed")
+        elif args.aggregates:
+            aggregator = DailyAggregator(
+                assets, OUTPUT_DIR / "scada_aggregates.csv",
+                interval_seconds=args.interval_seconds, bulk=bulk,
+            )
+            aggregator.update(reference_rows_to_block(telemetry))
+            print(f"  Wrote {aggregator.close()} rows to {aggregator.filepath}")
     
     # Generate graph predictions
     print("\n[4/4] Generating GRAPH_PREDICTIONS (pre-computed ML results)...")
@@ -416,14 +1725,17 @@ def main():
         "graph_predictions.csv",
         predictions,
         ["PREDICTION_TYPE", "ENTITY_ID", "RELATED_ENTITY_ID", 
-         "SCORE", "CONFIDENCE", "EXPLANATION", "PREDICTION_TIMESTAMP"]
+         "SCORE", "CONFIDENCE", "EXPLANATION", "PREDICTION_TIMESTAMP"],
+        bulk=bulk,
     )
+    if bulk is not None:
+        print(f"  Wrote manifest of {len(bulk.entries)} files to {bulk.write_manifest()}")
     
     print("\n" + "=" * 60)
     print("Data generation complete!")
     print(f"  Assets: {len(assets)}")
     print(f"  Edges: {len(edges)}")
-    print(f"  Telemetry records: {len(telemetry)}")
+    print(f"  Telemetry records: {telemetry_count}")
     print(f"  Predictions: {len(predictions)}")
     print("\nHidden Demo Pattern:")
     print("  - SC-PAD-42 -> PIPE-88 -> TF-V-204")
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+replay_telemetry.py - Real-time SCADA Telemetry Replay for SnowCore Permian Demo
+
+Emits readings from the synthetic telemetry model (generate_synthetic_data.py)
+as newline-delimited JSON at wall-clock speed or an accelerated multiplier,
+to drive ingest and alert-latency tests of anything that consumes SCADA data.
+
+A producer thread generates telemetry blocks into a bounded queue; the emitter
+paces each timestamp's readings against the wall clock and writes them to the
+sink. A slow sink fills the queue, which blocks the producer (backpressure)
+instead of growing memory.
+
+Usage:
+    python utils/replay_telemetry.py --sink file:/tmp/scada.ndjson --speed 60
+    python utils/replay_telemetry.py --sink unix:/tmp/scada.sock --speed 3600
+    python utils/replay_telemetry.py --sink fifo:/tmp/scada.pipe
+    python utils/replay_telemetry.py --sink http://localhost:9000/ingest --speed max
+
+Sinks:
+    file:PATH   Append to a file
+    fifo:PATH   Write to an existing named pipe (blocks until a reader opens it)
+    unix:PATH   Connect to a Unix domain stream socket
+    http(s)://  POST each batch as application/x-ndjson
+    -           Standard output
+"""
+
+import argparse
+import csv
+import json
+import queue
+import socket
+import sys
+import threading
+import time
+import urllib.request
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+from generate_synthetic_data import (
+    END_TIME,
+    INTERVAL_MINUTES,
+    OUTPUT_DIR,
+    START_TIME,
+    TELEMETRY_FIELDS,
+    _csv_column,
+    iter_scada_telemetry_blocks,
+)
+
+_END_OF_STREAM = object()
+
+
+# ============================================================================
+# Sinks
+# ============================================================================
+
+class FileSink:
+    """Append-only file or named pipe."""
+
+    def __init__(self, path):
+        self._file = open(path, "ab")
+
+    def send(self, payload):
+        self._file.write(payload)
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class StdoutSink(FileSink):
+    def __init__(self):
+        self._file = sys.stdout.buffer
+
+    def close(self):
+        self._file.flush()
+
+
+class UnixSocketSink:
+    """Unix domain stream socket; sendall() blocks while the reader is behind."""
+
+    def __init__(self, path):
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._socket.connect(path)
+
+    def send(self, payload):
+        self._socket.sendall(payload)
+
+    def close(self):
+        self._socket.close()
+
+
+class HttpSink:
+    """POST each batch of readings to a local HTTP endpoint."""
+
+    def __init__(self, url, timeout=10):
+        self._url = url
+        self._timeout = timeout
+
+    def send(self, payload):
+        request = urllib.request.Request(
+            self._url,
+            data=payload,
+            headers={"Content-Type": "application/x-ndjson"},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self._timeout) as response:
+            response.read()
+
+    def close(self):
+        pass
+
+
+def open_sink(spec):
+    """Create a sink from a --sink specification."""
+    if spec == "-":
+        return StdoutSink()
+    if spec.startswith(("http://", "https://")):
+        return HttpSink(spec)
+    kind, _, path = spec.partition(":")
+    if kind in ("file", "fifo") and path:
+        return FileSink(path)
+    if kind == "unix" and path:
+        return UnixSocketSink(path)
+    raise ValueError(f"Unsupported sink: {spec}")
+
+
+# ============================================================================
+# Replay
+# ============================================================================
+
+def load_assets(path):
+    """Read ASSET_MASTER rows (as written by generate_synthetic_data.py)."""
+    with open(path, newline="", encoding="utf-8") as f:
+        assets = list(csv.DictReader(f))
+    for asset in assets:
+        asset["MAX_PRESSURE_RATING_PSI"] = float(asset["MAX_PRESSURE_RATING_PSI"])
+    return assets
+
+
+def produce_batches(assets, out_queue, stop_event, **block_options):
+    """Producer thread: split telemetry blocks into per-timestamp NDJSON batches.
+
+    Blocks on out_queue.put() when the emitter falls behind.
+    """
+    try:
+        for block in iter_scada_telemetry_blocks(assets, **block_options):
+            columns = [_csv_column(block[name]) for name in TELEMETRY_FIELDS]
+            lines = [json.dumps(dict(zip(TELEMETRY_FIELDS, row))) for row in zip(*columns)]
+            timestamps = block["TIMESTAMP"]
+            boundaries = (np.flatnonzero(timestamps[1:] != timestamps[:-1]) + 1).tolist()
+            for begin, end in zip([0, *boundaries], [*boundaries, len(lines)]):
+                payload = ("\n".join(lines[begin:end]) + "\n").encode("utf-8")
+                batch = (timestamps[begin].astype(datetime), end - begin, payload)
+                while not stop_event.is_set():
+                    try:
+                        out_queue.put(batch, timeout=0.5)
+                        break
+                    except queue.Full:
+                        continue
+                if stop_event.is_set():
+                    return
+    finally:
+        out_queue.put(_END_OF_STREAM)
+
+
+def replay(assets, sink, speed, start, end, interval_seconds, buffer_batches=256, report_every=5.0):
+    """Emit telemetry to `sink`, pacing simulated time at `speed` x wall clock.
+
+    speed=None replays as fast as the sink accepts data.
+
+    Returns:
+        dict with rows, elapsed_s, rows_per_sec and max_lag_s
+    """
+    batches = queue.Queue(maxsize=buffer_batches)
+    stop_event = threading.Event()
+    producer = threading.Thread(
+        target=produce_batches,
+        args=(assets, batches, stop_event),
+        kwargs={"start": start, "end": end, "interval_seconds": interval_seconds,
+                "block_seconds": max(interval_seconds, 600)},
+        daemon=True,
+    )
+    producer.start()
+
+    wall_start = time.monotonic()
+    last_report = wall_start
+    rows_since_report = 0
+    total_rows = 0
+    max_lag = 0.0
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _END_OF_STREAM:
+                break
+            sim_time, row_count, payload = batch
+
+            if speed is not None:
+                due = wall_start + (sim_time - start).total_seconds() / speed
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                else:
+                    max_lag = max(max_lag, -delay)
+
+            sink.send(payload)
+            total_rows += row_count
+            rows_since_report += row_count
+
+            now = time.monotonic()
+            if now - last_report >= report_every:
+                print(
+                    f"  {sim_time}  {rows_since_report / (now - last_report):,.0f} rows/s  "
+                    f"queue {batches.qsize()}/{buffer_batches}  lag {max_lag:.2f}s",
+                    file=sys.stderr,
+                )
+                last_report = now
+                rows_since_report = 0
+    finally:
+        stop_event.set()
+        sink.close()
+
+    elapsed = time.monotonic() - wall_start
+    return {
+        "rows": total_rows,
+        "elapsed_s": round(elapsed, 3),
+        "rows_per_sec": round(total_rows / elapsed, 1) if elapsed > 0 else None,
+        "max_lag_s": round(max_lag, 3),
+    }
+
+
+def parse_speed(value):
+    return None if value == "max" else float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay synthetic SCADA telemetry in real time")
+    parser.add_argument("--sink", required=True, help="file:PATH, fifo:PATH, unix:PATH, http://URL or -")
+    parser.add_argument(
+        "--speed", type=parse_speed, default=1.0,
+        help="Simulated seconds per wall-clock second, or 'max' (default: 1)",
+    )
+    parser.add_argument("--start", type=datetime.fromisoformat, default=START_TIME)
+    parser.add_argument("--end", type=datetime.fromisoformat, default=END_TIME)
+    parser.add_argument("--interval-seconds", type=int, default=INTERVAL_MINUTES * 60)
+    parser.add_argument(
+        "--assets", type=Path, default=OUTPUT_DIR / "asset_master.csv",
+        help="ASSET_MASTER CSV to replay (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--buffer", type=int, default=256,
+        help="Max timestamps buffered ahead of the sink (default: %(default)s)",
+    )
+    args = parser.parse_args(argv)
+    if args.speed is not None and args.speed <= 0:
+        parser.error("--speed must be positive or 'max'")
+
+    assets = load_assets(args.assets)
+    print(
+        f"Replaying {len(assets)} assets from {args.start} to {args.end} "
+        f"at {'max' if args.speed is None else f'{args.speed:g}x'} speed -> {args.sink}",
+        file=sys.stderr,
+    )
+    try:
+        stats = replay(
+            assets, open_sink(args.sink), args.speed, args.start, args.end,
+            args.interval_seconds, buffer_batches=args.buffer,
+        )
+    except KeyboardInterrupt:
+        print("Replay interrupted", file=sys.stderr)
+        return
+    print(json.dumps(stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()